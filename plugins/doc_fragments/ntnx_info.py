@@ -41,4 +41,10 @@ options:
     description:
       - The filter in FIQL syntax used for the results
     type: str
+  list_concurrency:
+    description:
+      - Number of pages to fetch in parallel when results are spread over multiple pages
+      - Remaining pages are fetched concurrently once total matches are known from first page
+    type: int
+    default: 1
 """
@@ -38,4 +38,54 @@ options:
             - C(validate_certs). If not set then the value of the C(VALIDATE_CERTS), environment variable is used.
         type: bool
         default: true
+    max_retries:
+        description:
+            - Maximum number of retries of a request failed with connection error or
+              with 429, 502, 503 or 504 status code
+            - Only idempotent requests i.e. GET and list calls are retried, with exponential backoff
+              and jitter or as per C(Retry-After) header
+            - Retries made are returned in C(retry_stats)
+            - C(max_retries). If not set then the value of the C(NUTANIX_MAX_RETRIES), environment variable is used.
+        type: int
+        default: 3
+    rate_limit:
+        description:
+            - Maximum number of API requests per second sent to C(nutanix_host)
+            - Limit is shared by all module processes running on this host e.g. ansible forks,
+              using a token bucket kept in a locked state file in C(~/.ansible/nutanix/rate_limits)
+            - C(rate_limit). If not set then the value of the C(NUTANIX_RATE_LIMIT), environment variable is used.
+        type: float
+    max_concurrent_requests:
+        description:
+            - Maximum number of API requests in flight to C(nutanix_host) at a time,
+              shared by all module processes running on this host
+            - C(max_concurrent_requests). If not set then the value of the C(NUTANIX_MAX_CONCURRENT_REQUESTS), environment variable is used.
+        type: int
+    perf_trace:
+        description:
+            - Set value to C(True) to record timing and byte counts of each API call
+            - Summary of calls, total and p95 latency, bytes sent and received, statuses
+              and retries per endpoint is returned in C(perf_trace)
+            - Polls made while waiting for tasks to complete are summarized in C(perf_trace.waits)
+            - C(perf_trace). If not set then the value of the C(NUTANIX_PERF_TRACE), environment variable is used.
+        type: bool
+        default: false
+    session_cache:
+        description:
+            - Session cookie returned by first authenticated API call is used for further calls instead of credentials.
+            - Set value to C(True) to also cache session cookie on disk in C(~/.ansible/nutanix/sessions),
+              with permissions 0600, so that it is reused by further module runs till session expires.
+            - Credentials are used again if session is rejected by server.
+            - C(session_cache). If not set then the value of the C(NUTANIX_SESSION_CACHE), environment variable is used.
+        type: bool
+        default: false
+    bypass_cache:
+        description:
+            - Uuids resolved for names of entities are cached in C(~/.ansible/nutanix/uuid_cache.json)
+              for 5 minutes and reused by further lookups, across module runs.
+            - Cached entries of entities are removed when entities are created, updated or deleted by modules.
+            - Set value to C(True) to skip cached entries and always lookup uuids from API.
+            - C(bypass_cache). If not set then the value of the C(NUTANIX_BYPASS_CACHE), environment variable is used.
+        type: bool
+        default: false
 """
@@ -15,6 +15,8 @@ DOCUMENTATION = r"""
     version_added: "1.0.0"
     notes:
         - User needs to have API View access for resources for this inventory module to work.
+        - With C(cache) enabled, host data of VMs is cached as per C(cache_plugin) and C(cache_timeout),
+          and is listed again from Prism central once cache expires or with C(--flush-cache).
     author:
         - "Balu George (@balugeorge)"
         - "Prem Karat (@premkarat)"
@@ -27,20 +29,26 @@ DOCUMENTATION = r"""
             required: true
             choices: ['ntnx_prism_vm_inventory', 'nutanix.ncp.ntnx_prism_vm_inventory']
         nutanix_hostname:
-            description: Prism central hostname or IP address
-            required: true
+            description:
+                - Prism central hostname or IP address
+                - Required unless C(prism_centrals) is given
+            required: false
             type: str
             env:
                 - name: NUTANIX_HOSTNAME
         nutanix_username:
-            description: Prism central username
-            required: true
+            description:
+                - Prism central username
+                - Default username of C(prism_centrals)
+            required: false
             type: str
             env:
                 - name: NUTANIX_USERNAME
         nutanix_password:
-            description: Prism central password
-            required: true
+            description:
+                - Prism central password
+                - Default password of C(prism_centrals)
+            required: false
             type: str
             env:
                 - name: NUTANIX_PASSWORD
@@ -54,8 +62,17 @@ DOCUMENTATION = r"""
             description:
                 - Pagination support for listing VMs
                 - Default length(number of records to retrieve) has been set to 500
+                - With C(backend=groups), only C(offset) and C(length) are used, as offset and number of VMs
+                  listed through C(/groups)
             default: {"offset": 0, "length": 500}
             type: dict
+        list_concurrency:
+            description:
+                - Number of VM list pages to fetch in parallel when C(data.length) is more than 500
+                - With default value, pages are fetched serially and VMs are decoded from response
+                  stream one at a time to keep memory usage low
+            default: 1
+            type: int
         validate_certs:
             description:
                 - Set value to C(False) to skip validation for self signed certificates
@@ -64,20 +81,90 @@ DOCUMENTATION = r"""
             type: boolean
             env:
                 - name: VALIDATE_CERTS
+        compression:
+            description:
+                - Set value to C(True) to request gzip/deflate compressed VM list responses
+            default: False
+            type: boolean
+            env:
+                - name: NUTANIX_COMPRESSION
+        incremental_refresh:
+            description:
+                - Keep listed hosts and high-water mark of C(metadata.last_update_time) of VMs in
+                  C(~/.ansible/nutanix/inventory), to refresh inventory from VMs modified since then
+                - VMs are listed sorted by C(last_update_time) till older ones are reached, deleted VMs are
+                  detected from listing of VM uuids through groups API
+                - Full listing is done on first run, with C(--flush-cache) or if VMs are not listed in order
+                - C(data) applies to full listing only
+                - Applies to C(backend=vms) only
+            default: False
+            type: boolean
+        backend:
+            description:
+                - API from which VMs are listed
+                - C(vms) lists complete VM documents through C(/vms/list) and strips the unused parts
+                - C(groups) lists only C(group_member_attributes) of VMs through C(/groups), which cuts
+                  payload size and load on Prism central for large number of VMs
+            default: vms
+            type: str
+            choices: [vms, groups]
+        group_member_attributes:
+            description:
+                - Attributes of C(mh_vm) entities listed with C(backend=groups), set as hostvars
+                  and used as variables for C(compose), C(groups) and C(keyed_groups)
+                - C(vm_name), C(cluster_name) and C(ip_addresses) are always listed, for host name,
+                  cluster group and C(ansible_host) respectively
+                - C(ip_addresses) is a list, other attributes are lists only if they have many values
+            default: [vm_name, cluster_name, ip_addresses, power_state, num_vcpus, memory_size_bytes]
+            type: list
+            elements: str
+        prism_centrals:
+            description:
+                - Prism centrals whose VMs are listed concurrently into this inventory, instead of C(nutanix_hostname)
+                - Each item has C(nutanix_hostname) and optionally C(name), C(nutanix_port), C(nutanix_username),
+                  C(nutanix_password) and C(validate_certs), which default to options of same name
+                - C(name), which defaults to C(nutanix_hostname), is made a group of VMs of the Prism central
+                  and is set as C(prism_central) hostvar
+                - VM names found in more than one Prism central are prefixed with the group of their Prism central
+                  and an underscore, e.g. C(pc1_vm1)
+            type: list
+            elements: dict
     extends_documentation_fragment:
         - constructed
+        - inventory_cache
 """
 
 import json  # noqa: E402
 import tempfile  # noqa: E402
+from collections import Counter  # noqa: E402
+from concurrent.futures import ThreadPoolExecutor  # noqa: E402
+from datetime import datetime  # noqa: E402
 
-from ansible.plugins.inventory import BaseInventoryPlugin, Constructable  # noqa: E402
+from ansible.errors import AnsibleError  # noqa: E402
+from ansible.inventory.group import to_safe_group_name  # noqa: E402
+from ansible.module_utils.common.text.converters import to_native  # noqa: E402
+from ansible.plugins.inventory import (  # noqa: E402
+    BaseInventoryPlugin,
+    Cacheable,
+    Constructable,
+)
 
 from ..module_utils.prism import vms  # noqa: E402
+from ..module_utils.prism.groups import Groups  # noqa: E402
+from ..module_utils.state_file import StateFile, get_state_path  # noqa: E402
 
 
 class Mock_Module:
-    def __init__(self, host, port, username, password, validate_certs=False):
+    def __init__(
+        self,
+        host,
+        port,
+        username,
+        password,
+        validate_certs=False,
+        list_concurrency=1,
+        compression=False,
+    ):
         self.tmpdir = tempfile.gettempdir()
         self.params = {
             "nutanix_host": host,
@@ -86,16 +173,24 @@ class Mock_Module:
             "nutanix_password": password,
             "validate_certs": validate_certs,
             "load_params_without_defaults": False,
+            "list_concurrency": list_concurrency,
+            "compression": compression,
         }
 
     def jsonify(self, data):
         return json.dumps(data)
 
 
-class InventoryModule(BaseInventoryPlugin, Constructable):
+class InventoryModule(BaseInventoryPlugin, Constructable, Cacheable):
     """Nutanix VM dynamic invetory module for ansible"""
 
     NAME = "nutanix.ncp.ntnx_prism_vm_inventory"
+    # page lengths of listings of modified VMs and of VM uuids
+    changes_page_length = 100
+    groups_page_length = 500
+    # group member attributes needed for host, cluster group and ansible_host
+    required_group_member_attributes = ["vm_name", "cluster_name", "ip_addresses"]
+    list_group_member_attributes = ["ip_addresses"]
 
     def verify_file(self, path):
         """Verify inventory configuration file"""
@@ -114,25 +209,287 @@ class InventoryModule(BaseInventoryPlugin, Constructable):
         super().parse(inventory, loader, path, cache=cache)
         self._read_config_data(path)
 
-        self.nutanix_hostname = self.get_option("nutanix_hostname")
-        self.nutanix_username = self.get_option("nutanix_username")
-        self.nutanix_password = self.get_option("nutanix_password")
-        self.nutanix_port = self.get_option("nutanix_port")
         self.data = self.get_option("data")
-        self.validate_certs = self.get_option("validate_certs")
-        # Determines if composed variables or groups using nonexistent variables is an error
-        strict = self.get_option("strict")
+        self.list_concurrency = self.get_option("list_concurrency")
+        self.compression = self.get_option("compression")
+        prism_centrals = self._get_prism_centrals()
+
+        # hosts are cached as pruned host data, not as API responses
+        cache_key = self.get_cache_key(path)
+        use_cache = self.get_option("cache")
+        update_cache = use_cache and not cache  # e.g. with --flush-cache
+        hosts = None
+        if use_cache and cache:
+            try:
+                hosts = self._cache[cache_key]
+            except KeyError:
+                update_cache = True
+        if hosts is None:
+            hosts = self._fetch_all_hosts(prism_centrals, cache_key, full=not cache)
+        if update_cache:
+            self._cache[cache_key] = hosts
+
+        self._populate(hosts)
+
+    def _get_prism_centrals(self):
+        """
+        Returns endpoint and credentials of each prism central, 'name' is None
+        if only nutanix_hostname is given
+        """
+        defaults = dict(
+            (option, self.get_option(option))
+            for option in (
+                "nutanix_hostname",
+                "nutanix_port",
+                "nutanix_username",
+                "nutanix_password",
+                "validate_certs",
+            )
+        )
+        configured = self.get_option("prism_centrals")
+        if not configured:
+            configured = [dict(defaults, name=None)]
+            if not defaults["nutanix_hostname"]:
+                raise AnsibleError("nutanix_hostname or prism_centrals is required")
+
+        prism_centrals = []
+        for config in configured:
+            pc = dict(defaults)
+            pc.update(config)
+            if not pc.get("nutanix_hostname"):
+                raise AnsibleError("nutanix_hostname is required in prism_centrals")
+            for option in ("nutanix_username", "nutanix_password"):
+                if not pc.get(option):
+                    raise AnsibleError(
+                        "{0} is required for {1}".format(option, pc["nutanix_hostname"])
+                    )
+            if "name" not in pc:
+                pc["name"] = pc["nutanix_hostname"]
+            prism_centrals.append(pc)
+        return prism_centrals
+
+    def _fetch_all_hosts(self, prism_centrals, cache_key, full=False):
+        """
+        Fetch hosts of all prism centrals concurrently. Hosts of each prism
+        central get its group, and are renamed if other prism centrals have
+        hosts of the same name.
+        """
+
+        def fetch(pc):
+            state_name = cache_key
+            if pc["name"] is not None:
+                state_name += "_" + to_safe_group_name(pc["name"])
+            try:
+                return self._fetch_pc_hosts(pc, state_name, full=full)
+            except Exception as e:
+                raise AnsibleError(
+                    "Failed listing VMs of {0}: {1}".format(
+                        pc["nutanix_hostname"], to_native(e)
+                    )
+                )
+
+        with ThreadPoolExecutor(max_workers=len(prism_centrals)) as executor:
+            results = list(executor.map(fetch, prism_centrals))
+        if len(prism_centrals) == 1 and prism_centrals[0]["name"] is None:
+            return results[0]
+
+        name_counts = Counter(
+            name for hosts in results for name in set(h["name"] for h in hosts)
+        )
+        all_hosts = []
+        for pc, hosts in zip(prism_centrals, results):
+            group = to_safe_group_name(pc["name"])
+            for host in hosts:
+                host["prism_central"] = pc["name"]
+                host["prism_central_group"] = group
+                if name_counts[host["name"]] > 1:
+                    host["vm_name"] = host["name"]
+                    host["name"] = "{0}_{1}".format(group, host["name"])
+            all_hosts.extend(hosts)
+        return all_hosts
+
+    def _fetch_pc_hosts(self, pc, state_name, full=False):
+        if self.get_option("backend") == "groups":
+            return self._fetch_group_hosts(pc)
+        if self.get_option("incremental_refresh"):
+            return self._refresh_hosts(pc, state_name, full=full)
+        return self._fetch_hosts(pc)
 
-        module = Mock_Module(
-            self.nutanix_hostname,
-            self.nutanix_port,
-            self.nutanix_username,
-            self.nutanix_password,
-            self.validate_certs,
+    def _get_module(self, pc):
+        return Mock_Module(
+            pc["nutanix_hostname"],
+            pc["nutanix_port"],
+            pc["nutanix_username"],
+            pc["nutanix_password"],
+            pc["validate_certs"],
+            self.list_concurrency,
+            self.compression,
         )
-        vm = vms.VM(module)
-        self.data["offset"] = self.data.get("offset", 0)
-        resp = vm.list(self.data)
+
+    def _list_vms(self, pc):
+        vm = vms.VM(self._get_module(pc))
+        data = dict(self.data)
+        data["offset"] = data.get("offset", 0)
+        if self.list_concurrency > 1:
+            return vm.list(data)["entities"]
+        # entities are decoded from response stream one at a time
+        return vm.list_entities(data)
+
+    def _fetch_hosts(self, pc):
+        """
+        List VMs and returns host data of each VM, with only the fields
+        used for inventory
+        """
+        return [self._get_host(entity) for entity in self._list_vms(pc)]
+
+    def _fetch_group_hosts(self, pc):
+        """
+        List configured attributes of VMs through groups API and returns
+        host data of each VM, skipping VMs listed without name
+        """
+        attributes = list(self.required_group_member_attributes)
+        for attribute in self.get_option("group_member_attributes") or []:
+            if attribute not in attributes:
+                attributes.append(attribute)
+        entities = self._list_groups(
+            pc,
+            attributes,
+            offset=self.data.get("offset") or 0,
+            length=self.data.get("length"),
+        )
+        hosts = [self._get_group_host(entity) for entity in entities]
+        return [host for host in hosts if host["name"]]
+
+    def _get_group_host(self, entity):
+        resources = {}
+        for attribute in entity.get("data") or []:
+            values = []
+            for value in attribute.get("values") or []:
+                values.extend(value.get("values") or [])
+            name = attribute["name"]
+            if len(values) == 1 and name not in self.list_group_member_attributes:
+                values = values[0]
+            elif not values and name not in self.list_group_member_attributes:
+                values = None
+            resources[name] = values
+        ips = resources.get("ip_addresses") or []
+        return {
+            "name": resources.get("vm_name"),
+            "cluster": resources.get("cluster_name"),
+            "uuid": entity["entity_id"],
+            "ansible_host": ips[0] if ips else None,
+            "resources": resources,
+        }
+
+    def _refresh_hosts(self, pc, state_name, full=False):
+        """
+        Refresh hosts kept from last run with VMs modified since then and
+        drop deleted VMs, or list all VMs if there are no hosts to refresh
+        """
+        path = get_state_path("inventory", "{0}.json".format(state_name))
+        source = "{0}:{1}:{2}".format(
+            pc["nutanix_hostname"], pc["nutanix_port"], pc["nutanix_username"]
+        )
+        with StateFile(path, {}) as state:
+            modified = None
+            mark = state.get("last_update_time")
+            if not full and state.get("source") == source and mark is not None:
+                modified = self._list_modified_vms(pc, mark)
+            if modified is None:
+                hosts, mark = {}, 0
+                entities = self._list_vms(pc)
+            else:
+                uuids = self._list_vm_uuids(pc)
+                hosts = dict(
+                    (uuid, host)
+                    for uuid, host in state["hosts"].items()
+                    if uuid in uuids
+                )
+                entities = modified
+            for entity in entities:
+                host = self._get_host(entity)
+                hosts[host["uuid"]] = host
+                mark = max(mark, self._get_update_time(entity) or 0)
+            state.clear()
+            state.update({"source": source, "last_update_time": mark, "hosts": hosts})
+        return list(hosts.values())
+
+    def _list_modified_vms(self, pc, mark):
+        """
+        Returns VMs modified since 'mark', None if VMs are not listed in
+        order of modification
+        """
+        vm = vms.VM(self._get_module(pc))
+        spec = {"sort_attribute": "last_update_time", "sort_order": "DESCENDING"}
+        modified = []
+        last = None
+        for entity in vm.list_entities(spec, page_length=self.changes_page_length):
+            update_time = self._get_update_time(entity)
+            if update_time is None or (last is not None and update_time > last):
+                return None
+            # VMs modified within the second of mark are listed again
+            if update_time < mark:
+                break
+            last = update_time
+            modified.append(entity)
+        return modified
+
+    def _list_vm_uuids(self, pc):
+        """
+        Returns uuids of all VMs, listed without any of their attributes
+        """
+        return set(e["entity_id"] for e in self._list_groups(pc, ["vm_name"]))
+
+    def _list_groups(self, pc, attributes, offset=0, length=None):
+        """
+        Returns entity results of user VMs with given attributes, listed in
+        pages through groups API, starting at 'offset' and at most 'length'
+        VMs if given
+        """
+        groups = Groups(self._get_module(pc))
+        page_length = self.groups_page_length
+        if length:
+            page_length = min(page_length, length)
+        spec = {
+            "entity_type": "mh_vm",
+            # controller VMs are not listed by VMs API either
+            "filter_criteria": "is_cvm==0",
+            "group_member_attributes": [{"attribute": a} for a in attributes],
+            "group_member_count": page_length,
+        }
+
+        def list_page(offset):
+            resp = groups.list(
+                dict(spec, group_member_offset=offset), use_base_url=True
+            )
+            results = resp.get("group_results") or [{}]
+            return resp, results[0].get("entity_results") or []
+
+        resp, entities = list_page(offset)
+        end = resp.get("filtered_entity_count", 0)
+        if length:
+            end = min(end, offset + length)
+        offsets = range(offset + page_length, end, page_length)
+        for _, page in groups.run_concurrently(list_page, offsets):
+            entities.extend(page)
+        return entities[:length] if length else entities
+
+    @staticmethod
+    def _get_update_time(entity):
+        value = entity.get("metadata", {}).get("last_update_time")
+        if not value:
+            return None
+        # e.g. 2023-06-12T09:39:20Z or 2023-06-12T09:39:20.123456Z
+        try:
+            return (
+                datetime.strptime(value[:19], "%Y-%m-%dT%H:%M:%S")
+                - datetime(1970, 1, 1)
+            ).total_seconds()
+        except ValueError:
+            return None
+
+    @staticmethod
+    def _get_host(entity):
         keys_to_strip_from_resp = [
             "disk_list",
             "vnuma_config",
@@ -146,49 +503,73 @@ class InventoryModule(BaseInventoryPlugin, Constructable):
             "guest_customization",
         ]
 
-        for entity in resp["entities"]:
-            cluster = entity["status"]["cluster_reference"]["name"]
-            vm_name = entity["status"]["name"]
-            vm_uuid = entity["metadata"]["uuid"]
-            vm_ip = None
-
-            # Get VM IP
-            nic_count = 0
-            for nics in entity["status"]["resources"]["nic_list"]:
-                if nics["nic_type"] == "NORMAL_NIC" and nic_count == 0:
-                    for endpoint in nics["ip_endpoint_list"]:
-                        if endpoint["type"] in ["ASSIGNED", "LEARNED"]:
-                            vm_ip = endpoint["ip"]
-                            nic_count += 1
-                            continue
+        vm_ip = None
+
+        # Get VM IP
+        nic_count = 0
+        for nics in entity["status"]["resources"]["nic_list"]:
+            if nics["nic_type"] == "NORMAL_NIC" and nic_count == 0:
+                for endpoint in nics["ip_endpoint_list"]:
+                    if endpoint["type"] in ["ASSIGNED", "LEARNED"]:
+                        vm_ip = endpoint["ip"]
+                        nic_count += 1
+                        continue
+
+        resources = dict(
+            (key, value)
+            for key, value in entity["status"]["resources"].items()
+            if key not in keys_to_strip_from_resp
+        )
+
+        host = {
+            "name": entity["status"]["name"],
+            "cluster": entity["status"]["cluster_reference"]["name"],
+            "uuid": entity["metadata"]["uuid"],
+            "ansible_host": vm_ip,
+            "resources": resources,
+        }
+        if "categories" in entity["metadata"]:
+            host["categories"] = entity["metadata"]["categories"]
+        return host
+
+    def _populate(self, hosts):
+        # Determines if composed variables or groups using nonexistent variables is an error
+        strict = self.get_option("strict")
+
+        for host in hosts:
+            cluster = host["cluster"]
+            vm_name = host["name"]
 
             # Add inventory groups and hosts to inventory groups
-            self.inventory.add_group(cluster)
-            self.inventory.add_child("all", cluster)
+            if cluster:
+                self.inventory.add_group(cluster)
+                self.inventory.add_child("all", cluster)
             self.inventory.add_host(vm_name, group=cluster)
-            self.inventory.set_variable(vm_name, "ansible_host", vm_ip)
-            self.inventory.set_variable(vm_name, "uuid", vm_uuid)
-            self.inventory.set_variable(vm_name, "name", vm_name)
+            self.inventory.set_variable(vm_name, "ansible_host", host["ansible_host"])
+            self.inventory.set_variable(vm_name, "uuid", host["uuid"])
+            self.inventory.set_variable(vm_name, "name", host.get("vm_name", vm_name))
+            if "prism_central" in host:
+                pc_group = host["prism_central_group"]
+                self.inventory.add_group(pc_group)
+                self.inventory.add_child("all", pc_group)
+                self.inventory.add_host(vm_name, group=pc_group)
+                self.inventory.set_variable(
+                    vm_name, "prism_central", host["prism_central"]
+                )
 
             # Add hostvars
-            for key in keys_to_strip_from_resp:
-                try:
-                    del entity["status"]["resources"][key]
-                except KeyError:
-                    pass
-
-            for key, value in entity["status"]["resources"].items():
+            for key, value in host["resources"].items():
                 self.inventory.set_variable(vm_name, key, value)
 
-            if "metadata" in entity and "categories" in entity["metadata"]:
+            if "categories" in host:
                 self.inventory.set_variable(
-                    vm_name, "ntnx_categories", entity["metadata"]["categories"]
+                    vm_name, "ntnx_categories", host["categories"]
                 )
 
             # Add variables created by the user's Jinja2 expressions to the host
             self._set_composite_vars(
                 self.get_option("compose"),
-                entity["status"]["resources"],
+                host["resources"],
                 vm_name,
                 strict=strict,
             )
@@ -197,13 +578,13 @@ class InventoryModule(BaseInventoryPlugin, Constructable):
             # Using these methods after _set_composite_vars() allows groups to be created with the composed variables
             self._add_host_to_composed_groups(
                 self.get_option("groups"),
-                entity["status"]["resources"],
+                host["resources"],
                 vm_name,
                 strict=strict,
             )
             self._add_host_to_keyed_groups(
                 self.get_option("keyed_groups"),
-                entity["status"]["resources"],
+                host["resources"],
                 vm_name,
                 strict=strict,
             )
@@ -16,6 +16,7 @@ class BaseInfoModule(BaseModule):
         filter=dict(type="dict"),
         custom_filter=dict(type="dict"),
         filter_string=dict(type="str"),
+        list_concurrency=dict(type="int", default=1),
     )
 
     info_args_mutually_exclusive = [
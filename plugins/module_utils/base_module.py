@@ -6,6 +6,8 @@ from copy import deepcopy
 
 from ansible.module_utils.basic import AnsibleModule, env_fallback
 
+from ..module_utils.perf_trace import add_request_stats
+
 __metaclass__ = type
 
 
@@ -31,6 +33,29 @@ class BaseModule(AnsibleModule):
         validate_certs=dict(
             type="bool", default=True, fallback=(env_fallback, ["VALIDATE_CERTS"])
         ),
+        compression=dict(
+            type="bool", default=False, fallback=(env_fallback, ["NUTANIX_COMPRESSION"])
+        ),
+        max_retries=dict(
+            type="int", default=3, fallback=(env_fallback, ["NUTANIX_MAX_RETRIES"])
+        ),
+        rate_limit=dict(type="float", fallback=(env_fallback, ["NUTANIX_RATE_LIMIT"])),
+        max_concurrent_requests=dict(
+            type="int", fallback=(env_fallback, ["NUTANIX_MAX_CONCURRENT_REQUESTS"])
+        ),
+        perf_trace=dict(
+            type="bool", default=False, fallback=(env_fallback, ["NUTANIX_PERF_TRACE"])
+        ),
+        session_cache=dict(
+            type="bool",
+            default=False,
+            fallback=(env_fallback, ["NUTANIX_SESSION_CACHE"]),
+        ),
+        bypass_cache=dict(
+            type="bool",
+            default=False,
+            fallback=(env_fallback, ["NUTANIX_BYPASS_CACHE"]),
+        ),
         state=dict(type="str", choices=["present", "absent"], default="present"),
         wait=dict(type="bool", default=True),
     )
@@ -45,3 +70,10 @@ class BaseModule(AnsibleModule):
             kwargs["supports_check_mode"] = True
 
         super(BaseModule, self).__init__(**kwargs)
+
+    def exit_json(self, **kwargs):
+        super(BaseModule, self).exit_json(**add_request_stats(self.params, kwargs))
+
+    def fail_json(self, msg, **kwargs):
+        params = getattr(self, "params", None) or {}
+        super(BaseModule, self).fail_json(msg, **add_request_stats(params, kwargs))
@@ -0,0 +1,308 @@
+# This file is part of Ansible
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import errno
+import select
+import socket
+import ssl
+import threading
+import zlib
+
+from ansible.module_utils._text import to_bytes, to_native
+from ansible.module_utils.six import binary_type, string_types
+from ansible.module_utils.six.moves import http_client
+from ansible.module_utils.six.moves.urllib.parse import urlparse
+from ansible.module_utils.six.moves.urllib.request import (
+    Request,
+    getproxies,
+    proxy_bypass,
+)
+
+# errors raised when a kept-alive connection was closed by the server in between requests
+STALE_CONNECTION_ERRORS = (
+    http_client.BadStatusLine,
+    http_client.CannotSendRequest,
+    http_client.ResponseNotReady,
+)
+STALE_CONNECTION_ERRNOS = (errno.ECONNRESET, errno.ECONNABORTED, errno.EPIPE)
+
+
+class DecompressingResponse(object):
+    """
+    Wraps gzip/deflate encoded response and decompresses body incrementally
+    as it is read in chunks. Compressed and decompressed byte counts are
+    added to given stats.
+    """
+
+    def __init__(self, resp, encoding, stats):
+        self.resp = resp
+        self.encoding = encoding
+        self.stats = stats
+        self._decompressor = None
+        self._eof = False
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            chunks = []
+            while True:
+                chunk = self.read(65536)
+                if not chunk:
+                    return b"".join(chunks)
+                chunks.append(chunk)
+
+        while not self._eof:
+            tail = self._decompressor.unconsumed_tail if self._decompressor else b""
+            if tail:
+                data = self._decompressor.decompress(tail, size)
+            else:
+                raw = self.resp.read(size)
+                if not raw:
+                    self._eof = True
+                    data = self._decompressor.flush() if self._decompressor else b""
+                else:
+                    self.stats["compressed_bytes"] += len(raw)
+                    if not self._decompressor:
+                        self._decompressor = self._get_decompressor(raw)
+                    data = self._decompressor.decompress(raw, size)
+            if data:
+                self.stats["decompressed_bytes"] += len(data)
+                return data
+        return b""
+
+    def __getattr__(self, name):
+        return getattr(self.resp, name)
+
+    def _get_decompressor(self, data):
+        if self.encoding == "gzip":
+            return zlib.decompressobj(16 + zlib.MAX_WBITS)
+        # deflate is expected to be zlib wrapped, but some servers send raw deflate
+        header = bytearray(data[:2])
+        if (
+            len(header) == 2
+            and header[0] & 0x0F == 8
+            and (header[0] * 256 + header[1]) % 31 == 0
+        ):
+            return zlib.decompressobj(zlib.MAX_WBITS)
+        return zlib.decompressobj(-zlib.MAX_WBITS)
+
+
+class PooledConnection(object):
+    def __init__(self, conn):
+        self.conn = conn
+        self.response = None
+        self.in_use = True
+
+    def is_idle(self):
+        # connection can be reused only once previous response is consumed
+        return not self.in_use and (self.response is None or self.response.isclosed())
+
+
+class ConnectionPool(object):
+    """
+    Keep-alive HTTP(S) connections, reused per (scheme, host, port, validate_certs)
+    for the lifetime of the process i.e. for the whole module run.
+    Connections are checked out per request, so pool is safe to use across threads.
+    """
+
+    user_agent = "ansible-httpget"
+    supported_encodings = ("gzip", "deflate")
+
+    def __init__(self):
+        self._connections = {}
+        self._lock = threading.Lock()
+        self.stats = {"compressed_bytes": 0, "decompressed_bytes": 0}
+
+    def request(
+        self,
+        url,
+        method="GET",
+        data=None,
+        headers=None,
+        cookies=None,
+        timeout=30,
+        validate_certs=True,
+        compression=False,
+    ):
+        """
+        Send request over pooled connection. Returns (response, info) in
+        the same format as ansible.module_utils.urls.fetch_url
+        """
+        parsed_url = urlparse(url)
+        path = parsed_url.path or "/"
+        if parsed_url.query:
+            path += "?" + parsed_url.query
+
+        headers = dict(headers or {})
+        headers.setdefault("User-Agent", self.user_agent)
+        if compression:
+            headers["Accept-Encoding"] = ", ".join(self.supported_encodings)
+        if cookies is not None:
+            headers.update(self._get_cookie_headers(cookies, url, method, headers))
+        if data is None or isinstance(data, string_types + (binary_type,)):
+            body = to_bytes(data) if data is not None else None
+            replayable = True
+        else:
+            # file like objects can be read only once
+            body = data
+            replayable = False
+
+        info = {"url": url, "status": -1}
+        key = (
+            parsed_url.scheme,
+            parsed_url.hostname,
+            parsed_url.port,
+            bool(validate_certs),
+        )
+        for attempt in range(2):
+            pooled_conn, reused = self._checkout(key, timeout)
+            try:
+                self._send(pooled_conn.conn, method, path, body, headers)
+                resp = pooled_conn.conn.getresponse()
+                break
+            except Exception as e:
+                self._discard(key, pooled_conn)
+                if reused and replayable and attempt == 0 and self._is_stale(e):
+                    continue
+                info["msg"] = "Request failed: {0}".format(to_native(e))
+                return None, info
+
+        with self._lock:
+            pooled_conn.response = resp
+            pooled_conn.in_use = False
+
+        if cookies is not None:
+            cookies.extract_cookies(resp, Request(url, headers=headers))
+
+        info.update(dict((k.lower(), v) for k, v in resp.getheaders()))
+        info["status"] = status = resp.status
+        reason = resp.reason
+        content_length = resp.getheader("Content-Length", "unknown")
+        encoding = (resp.getheader("Content-Encoding") or "").strip().lower()
+        if encoding in self.supported_encodings:
+            resp = DecompressingResponse(resp, encoding, self.stats)
+
+        if status >= 400:
+            # error body is served in info, same as fetch_url does for HTTPError
+            info["msg"] = "HTTP Error {0}: {1}".format(status, reason)
+            info["body"] = resp.read()
+            resp.close()
+            return None, info
+
+        info["msg"] = "OK ({0} bytes)".format(content_length)
+        return resp, info
+
+    def close(self):
+        with self._lock:
+            for pooled_conns in self._connections.values():
+                for pooled_conn in pooled_conns:
+                    pooled_conn.conn.close()
+            self._connections = {}
+
+    @staticmethod
+    def is_proxied(url):
+        """
+        Pooled connections are direct, requests via proxy are left to fetch_url
+        """
+        parsed_url = urlparse(url)
+        proxies = getproxies()
+        return parsed_url.scheme in proxies and not proxy_bypass(parsed_url.hostname)
+
+    def _checkout(self, key, timeout):
+        with self._lock:
+            pooled_conns = self._connections.setdefault(key, [])
+            for pooled_conn in list(pooled_conns):
+                if not pooled_conn.is_idle():
+                    continue
+                # server might have closed idle connection meanwhile
+                if self._is_dropped(pooled_conn.conn):
+                    pooled_conn.conn.close()
+                    pooled_conns.remove(pooled_conn)
+                    continue
+                pooled_conn.in_use = True
+                pooled_conn.conn.timeout = timeout
+                if pooled_conn.conn.sock:
+                    pooled_conn.conn.sock.settimeout(timeout)
+                return pooled_conn, True
+
+            pooled_conn = PooledConnection(self._new_connection(key, timeout))
+            pooled_conns.append(pooled_conn)
+            return pooled_conn, False
+
+    def _discard(self, key, pooled_conn):
+        pooled_conn.conn.close()
+        with self._lock:
+            pooled_conns = self._connections.get(key, [])
+            if pooled_conn in pooled_conns:
+                pooled_conns.remove(pooled_conn)
+
+    def _new_connection(self, key, timeout):
+        scheme, host, port, validate_certs = key
+        if scheme == "https":
+            return http_client.HTTPSConnection(
+                host,
+                port=port,
+                timeout=timeout,
+                context=self._get_ssl_context(validate_certs),
+            )
+        return http_client.HTTPConnection(host, port=port, timeout=timeout)
+
+    @staticmethod
+    def _send(conn, method, path, body, headers):
+        if not hasattr(body, "send_to"):
+            conn.request(method, path, body=body, headers=headers)
+            return
+        # body sends itself to socket i.e. file uploads, content length is set by caller
+        header_names = set(name.lower() for name in headers)
+        conn.putrequest(
+            method,
+            path,
+            skip_host="host" in header_names,
+            skip_accept_encoding="accept-encoding" in header_names,
+        )
+        for name, value in headers.items():
+            conn.putheader(name, value)
+        conn.endheaders()
+        body.send_to(conn.sock)
+
+    @staticmethod
+    def _is_stale(error):
+        if isinstance(error, STALE_CONNECTION_ERRORS):
+            return True
+        return (
+            isinstance(error, socket.error)
+            and getattr(error, "errno", None) in STALE_CONNECTION_ERRNOS
+        )
+
+    @staticmethod
+    def _is_dropped(conn):
+        if conn.sock is None:
+            return False
+        try:
+            readable, _, _ = select.select([conn.sock], [], [], 0.0)
+        except (ValueError, socket.error):
+            return True
+        # idle keep-alive socket is readable only if server sent EOF
+        return bool(readable)
+
+    @staticmethod
+    def _get_ssl_context(validate_certs):
+        context = ssl.create_default_context()
+        if not validate_certs:
+            context.check_hostname = False
+            context.verify_mode = ssl.CERT_NONE
+        return context
+
+    @staticmethod
+    def _get_cookie_headers(cookies, url, method, headers):
+        req = Request(url, headers=headers)
+        req.get_method = lambda: method
+        cookies.add_cookie_header(req)
+        cookie = req.get_header("Cookie")
+        return {"Cookie": cookie} if cookie else {}
+
+
+# shared across all entities of a module run
+connection_pool = ConnectionPool()
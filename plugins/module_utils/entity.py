@@ -6,22 +6,44 @@ __metaclass__ = type
 
 import copy
 import json
-import os
+import threading
+import time
 from base64 import b64encode
 
 from ansible.module_utils._text import to_text
 from ansible.module_utils.urls import fetch_url
 
 from ..module_utils import utils
+from ..module_utils.connection_pool import connection_pool
+from ..module_utils.json_stream import JSONStreamDecoder
+from ..module_utils.pagination import get_page_sizer
+from ..module_utils.perf_trace import perf_tracer
+from ..module_utils.rate_limiter import get_rate_limiter
+from ..module_utils.retry import RetryPolicy
+from ..module_utils.session import get_session
+from ..module_utils.upload import FileUpload, MiB
+from ..module_utils.uuid_cache import get_uuid_cache
 
 try:
     from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
 except ImportError:
     from urlparse import urlparse  # python2
 
+try:
+    from concurrent.futures import ThreadPoolExecutor
+except ImportError:
+    ThreadPoolExecutor = None  # python2, pages are fetched serially
+
+# status code and error of last request of each thread, for callers of
+# _fetch_url with raise_error=False which get response body only
+last_fetch = threading.local()
+
 
 class Entity(object):
     entities_limitation = 20
+    max_entities_limitation = 500
+    # max names OR-ed in one list filter, to keep filter expression short
+    uuid_batch_size = 50
     entity_type = "entities"
 
     def __init__(
@@ -35,7 +57,14 @@ class Entity(object):
         self.module = module
         self.base_url = self._build_url(module, scheme, resource_type)
         self.headers = self._build_headers(module, additional_headers)
-        self.cookies = cookies
+        # reuse session cookie of authenticated calls, unless cookies are managed by caller
+        self.session = get_session(module) if cookies is None else None
+        self.cookies = self.session.jar if self.session else cookies
+        self.retry_policy = RetryPolicy(module.params.get("max_retries"))
+        self.rate_limiter = get_rate_limiter(module)
+        # report and digest of contents of last file upload
+        self.upload_stats = None
+        self.upload_digest = None
 
     def create(
         self,
@@ -50,7 +79,7 @@ class Entity(object):
         url = self.base_url + "/{0}".format(endpoint) if endpoint else self.base_url
         if query:
             url = self._build_url_with_query(url, query)
-        return self._fetch_url(
+        resp = self._fetch_url(
             url,
             method=method,
             data=data,
@@ -58,6 +87,9 @@ class Entity(object):
             no_response=no_response,
             timeout=timeout,
         )
+        # names can resolve differently once new entity exists
+        self.invalidate_cached_uuids()
+        return resp
 
     def read(
         self,
@@ -97,7 +129,7 @@ class Entity(object):
             url = url + "/{0}".format(endpoint)
         if query:
             url = self._build_url_with_query(url, query)
-        return self._fetch_url(
+        resp = self._fetch_url(
             url,
             method=method,
             data=data,
@@ -105,6 +137,10 @@ class Entity(object):
             no_response=no_response,
             timeout=timeout,
         )
+        # entity might be renamed
+        if uuid:
+            self.invalidate_cached_uuids(uuid=uuid)
+        return resp
 
     # source is the file path of resource where ansible yaml runs
     def upload(
@@ -116,6 +152,11 @@ class Entity(object):
         raise_error=True,
         no_response=False,
         timeout=30,
+        offset=0,
+        length=None,
+        headers=None,
+        hash_algorithm=None,
+        reader=None,
     ):
         url = self.base_url + "/{0}".format(endpoint) if endpoint else self.base_url
         if query:
@@ -127,6 +168,11 @@ class Entity(object):
             raise_error=raise_error,
             no_response=no_response,
             timeout=timeout,
+            offset=offset,
+            length=length,
+            headers=headers,
+            hash_algorithm=hash_algorithm,
+            reader=reader,
         )
 
     def delete(
@@ -144,7 +190,7 @@ class Entity(object):
             url = url + "/{0}".format(endpoint)
         if query:
             url = self._build_url_with_query(url, query)
-        return self._fetch_url(
+        resp = self._fetch_url(
             url,
             method="DELETE",
             data=data,
@@ -152,6 +198,11 @@ class Entity(object):
             no_response=no_response,
             timeout=timeout,
         )
+        if uuid:
+            self.invalidate_cached_uuids(uuid=uuid)
+        else:
+            self.invalidate_cached_uuids()
+        return resp
 
     def list(
         self,
@@ -188,28 +239,62 @@ class Entity(object):
 
             return resp
         entities_list = []
+        entities_count = 0
         main_length = data.get("length")
         main_offset = data.get("offset", 0)
-        data["length"] = self.entities_limitation
+        page_sizer = get_page_sizer(
+            self.base_url,
+            initial=self.max_entities_limitation,
+            minimum=self.entities_limitation,
+            maximum=self.max_entities_limitation,
+        )
         while True:
-            resp = self._fetch_url(
+            data["length"] = page_sizer.size
+            if main_length:
+                data["length"] = min(data["length"], main_length - entities_count)
+            resp = self._fetch_page(
                 url,
-                method="POST",
-                data=data,
+                data,
+                page_sizer,
                 raise_error=raise_error,
                 no_response=no_response,
                 timeout=timeout,
             )
-            if self.entity_type not in resp:
+            if not resp or self.entity_type not in resp:
                 return resp
+            page_count = len(resp[self.entity_type])
             entities_list.extend(resp[self.entity_type])
             entities_count = len(entities_list)
             data["offset"] = main_offset + entities_count
-            if (
-                len(resp[self.entity_type]) != self.entities_limitation
-                or entities_count == main_length
+            total_matches = resp.get("metadata", {}).get("total_matches")
+            if entities_count == main_length or (
+                total_matches is not None and data["offset"] >= total_matches
             ):
                 break
+            if not page_count:
+                break
+            if page_count < data["length"] and total_matches is not None:
+                # more entities exist, page length is limited at server side
+                page_sizer.record_capped(page_count)
+                data["length"] = page_count
+
+            # once total matches are known, fetch rest of the pages concurrently
+            # with length of page which succeeded
+            if self.list_concurrency > 1 and total_matches is not None:
+                end = main_offset + main_length if main_length else total_matches
+                offsets = range(data["offset"], min(end, total_matches), data["length"])
+                pages = self._fetch_pages(
+                    url, data, offsets, raise_error=raise_error, timeout=timeout
+                )
+                for page in pages:
+                    if not page or self.entity_type not in page:
+                        return page
+                    entities_list.extend(page[self.entity_type])
+                if main_length:
+                    entities_list = entities_list[:main_length]
+                entities_count = len(entities_list)
+                break
+
         custom_filters = self.module.params.get("custom_filter")
         if custom_filters:
             entities_list = self._filter_entities(entities_list, custom_filters)
@@ -221,6 +306,146 @@ class Entity(object):
 
         return resp
 
+    def list_entities(
+        self,
+        data=None,
+        endpoint=None,
+        use_base_url=False,
+        raise_error=True,
+        timeout=30,
+        page_length=None,
+    ):
+        """
+        Generator version of list(). Entities are decoded from response stream
+        and yielded one at a time, so that memory holds a single entity
+        instead of complete list. Pages of 'page_length' entities are requested
+        till 'length' given in data or total matches are reached.
+        """
+        url = self.base_url if use_base_url else self.base_url + "/list"
+        if endpoint:
+            url = url + "/{0}".format(endpoint)
+
+        spec = copy.deepcopy(data) if data else {}
+        main_length = spec.get("length")
+        page_length = page_length or self.entities_limitation
+        offset = spec.get("offset", 0)
+        custom_filters = self.module.params.get("custom_filter")
+        entities_count = 0
+        while True:
+            spec["offset"] = offset
+            spec["length"] = page_length
+            if main_length:
+                spec["length"] = min(page_length, main_length - entities_count)
+            decoder = self._fetch_url(
+                url,
+                method="POST",
+                data=spec,
+                raise_error=raise_error,
+                timeout=timeout,
+                stream=True,
+            )
+            if not isinstance(decoder, JSONStreamDecoder):
+                return
+
+            page_count = 0
+            for entity in decoder:
+                page_count += 1
+                if custom_filters and not self._filter_entities(
+                    [entity], custom_filters
+                ):
+                    continue
+                yield entity
+
+            entities_count += page_count
+            offset += page_count
+            total_matches = (
+                (decoder.envelope or {}).get("metadata", {}).get("total_matches")
+            )
+            if (
+                page_count < spec["length"]
+                or entities_count == main_length
+                or (total_matches is not None and offset >= total_matches)
+            ):
+                break
+
+    def _fetch_page(
+        self, url, data, page_sizer, raise_error=True, no_response=False, timeout=30
+    ):
+        """
+        Fetch list page, shrinking page length on failures which may be caused
+        by it. Error of first failed request is reported once failure is of
+        other cause or page length can't be shrinked any more.
+        """
+        first = None
+        while True:
+            start = time.time()
+            last_fetch.status_code = last_fetch.error = None
+            resp = self._fetch_url(
+                url,
+                method="POST",
+                data=data,
+                raise_error=False,
+                no_response=no_response,
+                timeout=timeout,
+            )
+            if resp and self.entity_type in resp:
+                page_sizer.record_success(data["length"], time.time() - start)
+                return resp
+            status_code, error = last_fetch.status_code, last_fetch.error
+            if first is None:
+                first = (resp, status_code, error)
+            if not page_sizer.is_page_failure(
+                status_code, json.dumps(resp) if resp else error
+            ) or not page_sizer.record_failure(data["length"]):
+                break
+            data["length"] = page_sizer.size
+
+        resp, status_code, error = first
+        if raise_error and (status_code is None or not 200 <= status_code < 300):
+            self._fail_fetch(url, status_code, resp, error)
+        return resp
+
+    @property
+    def list_concurrency(self):
+        return self.module.params.get("list_concurrency") or 1
+
+    def _fetch_pages(self, url, data, offsets, raise_error=True, timeout=30):
+        """
+        Fetch list pages for given offsets through a bounded pool of workers.
+        Pages are returned in order of offsets. Failed pages are fetched
+        again serially so that errors are reported from main thread.
+        """
+
+        def fetch_page(offset, raise_page_error=False):
+            spec = copy.deepcopy(data)
+            spec["offset"] = offset
+            return self._fetch_url(
+                url,
+                method="POST",
+                data=spec,
+                raise_error=raise_page_error,
+                timeout=timeout,
+            )
+
+        offsets = list(offsets)
+        pages = self.run_concurrently(fetch_page, offsets)
+        for i, page in enumerate(pages):
+            if not page or self.entity_type not in page:
+                pages[i] = fetch_page(offsets[i], raise_page_error=raise_error)
+        return pages
+
+    def run_concurrently(self, func, items, workers=None):
+        """
+        Call func for each item using at most 'workers' (default list_concurrency)
+        threads, results are returned in order of items
+        """
+        items = list(items)
+        workers = min(workers or self.list_concurrency, len(items))
+        if workers <= 1 or ThreadPoolExecutor is None:
+            return [func(item) for item in items]
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(func, items))
+
     # "params" can be used to override module.params to create spec by other modules backened
     def get_spec(self, old_spec=None, params=None, **kwargs):
         spec = copy.deepcopy(old_spec) or self._get_default_spec()
@@ -248,6 +473,10 @@ class Entity(object):
         raise_error=True,
         no_response=False,
     ):
+        if not data:
+            uuid = self.get_cached_uuid(value, key=key)
+            if uuid:
+                return uuid
         filter_spec = (
             data if data else {"filter": "{0}=={1}".format(key, value), "length": 1}
         )
@@ -268,9 +497,90 @@ class Entity(object):
                     continue
 
                 if name == value:
+                    if not data:
+                        self.cache_uuid(entity["metadata"]["uuid"], value, key=key)
                     return entity["metadata"]["uuid"]
         return None
 
+    def get_uuids(self, names, raise_error=True):
+        """
+        Resolve uuids of entities with given names, using OR-ed name filters in as few
+        list calls as possible. Returns map of name to uuid and list of names not found.
+        """
+        name_uuid_map = {}
+        pending = []
+        for name in names:
+            if name in name_uuid_map or name in pending:
+                continue
+            uuid = self.get_cached_uuid(name)
+            if uuid:
+                name_uuid_map[name] = uuid
+            elif "," in name or ";" in name:
+                # can't be part of FIQL expression, lookup individually
+                uuid = self.get_uuid(name, raise_error=raise_error)
+                if uuid:
+                    name_uuid_map[name] = uuid
+            else:
+                pending.append(name)
+
+        for i in range(0, len(pending), self.uuid_batch_size):
+            batch = pending[i : i + self.uuid_batch_size]
+            spec = {"filter": ",".join("name=={0}".format(name) for name in batch)}
+            if getattr(self, "kind", None):
+                spec["kind"] = self.kind
+            entities = self.list_entities(
+                spec,
+                raise_error=raise_error,
+                page_length=self.max_entities_limitation,
+            )
+            for entity in entities:
+                name = self._get_entity_name(entity)
+                if name in batch and name not in name_uuid_map:
+                    name_uuid_map[name] = entity["metadata"]["uuid"]
+                    self.cache_uuid(name_uuid_map[name], name)
+
+        missing = []
+        for name in names:
+            if name not in name_uuid_map and name not in missing:
+                missing.append(name)
+        return name_uuid_map, missing
+
+    @staticmethod
+    def _get_entity_name(entity):
+        if entity.get("spec", {}).get("name"):
+            return entity["spec"]["name"]
+        return entity.get("status", {}).get("name")
+
+    def get_cached_uuid(self, value, key="name", kind=None):
+        """
+        Returns uuid resolved for given key & value of this kind of entities by previous
+        lookups, None if not cached or if module is run with bypass_cache
+        """
+        if self.module.params.get("bypass_cache"):
+            return None
+        host, default_kind = self._get_cache_scope()
+        return get_uuid_cache().get(host, kind or default_kind, key, value)
+
+    def cache_uuid(self, uuid, value, key="name", kind=None):
+        if not uuid:
+            return
+        host, default_kind = self._get_cache_scope()
+        get_uuid_cache().set(host, kind or default_kind, key, value, uuid)
+
+    def invalidate_cached_uuids(self, uuid=None):
+        """
+        Remove cached resolutions to given uuid, or of this kind of entities if uuid is not given
+        """
+        host, kind = self._get_cache_scope()
+        if uuid:
+            get_uuid_cache().invalidate(host, uuid=uuid)
+        else:
+            get_uuid_cache().invalidate(host, kind=kind)
+
+    def _get_cache_scope(self):
+        url = urlparse(self.base_url)
+        return url.netloc, url.path
+
     @staticmethod
     def update_entity_spec_version(spec):
         spec["metadata"]["entity_version"] = str(
@@ -342,70 +652,84 @@ class Entity(object):
         return urlunparse(url)
 
     def _fetch_url(
-        self, url, method, data=None, raise_error=True, no_response=False, timeout=30
+        self,
+        url,
+        method,
+        data=None,
+        raise_error=True,
+        no_response=False,
+        timeout=30,
+        stream=False,
     ):
         # only jsonify if content-type supports, added to avoid incase of form-url-encodeded type data
         if self.headers["Content-Type"] == "application/json" and data is not None:
             data = self.module.jsonify(data)
 
-        resp, info = fetch_url(
-            self.module,
-            url,
-            data=data,
-            method=method,
-            headers=self.headers,
-            cookies=self.cookies,
-            timeout=timeout,
-        )
+        trace = self._start_trace(method, url, data)
+
+        # retry transient failures of idempotent requests as per retry policy
+        attempt = 0
+        while True:
+            resp, info = self._send_authenticated_request(
+                url, method, data=data, timeout=timeout
+            )
+            delay = self.retry_policy.get_delay(method, url, attempt, info)
+            if delay is None:
+                break
+            time.sleep(delay)
+            attempt += 1
 
         status_code = info.get("status")
+        last_fetch.status_code = status_code
+        last_fetch.error = info.get("msg")
 
         body = None
 
         # buffer size with ref. to max read size of http.client.HTTPResponse.read() defination
         buffer_size = 65536
 
+        resp_json = None
+
         # From ansible-core>=2.13, incase of http error, urllib.HTTPError object is returned in resp
         # as per the docs of ansible we need to use body in that case.
         if not resp or status_code >= 400:
             # get body containing error
             body = info.get("body")
+            bytes_received = len(body or "")
+            try:
+                resp_json = json.loads(to_text(body)) if body else None
+            except ValueError:
+                resp_json = None
         else:
             # For case when response body size is > 65536, read() will fail due to http.client.IncompleteRead exception
             # This eventually closes connection and can't read response further.
-            # So here we read all content in chunks (of size < 65536) and combine data at last to get final response.
-            resp_chunk = None
-            resp_chunks = []
-            while True:
-                resp_chunk = resp.read(buffer_size)
-                if resp_chunk:
-                    resp_chunks.append(to_text(resp_chunk.decode("utf-8")))
-                else:
-                    break
-
-            body = "".join(resp_chunks)
+            # So here we read content in chunks (of size < 65536) and decode json incrementally
+            # while reading, to avoid holding raw, text and parsed response together in memory.
+            decoder = JSONStreamDecoder(
+                resp, key=self.entity_type, chunk_size=buffer_size
+            )
+            if stream and status_code < 300:
+                # entities are decoded by caller while iterating over decoder
+                if trace:
+                    decoder.on_complete = lambda bytes_read: perf_tracer.finish(
+                        trace, status_code, bytes_read, attempt
+                    )
+                return decoder
+            try:
+                resp_json = decoder.decode()
+            except ValueError:
+                body = decoder.unparsed_text()
+                resp_json = None
+            bytes_received = decoder.bytes_read
 
-        try:
-            resp_json = json.loads(to_text(body)) if body else None
-        except ValueError:
-            resp_json = None
+        if trace:
+            perf_tracer.finish(trace, status_code, bytes_received, attempt)
 
         if not raise_error:
             return resp_json
 
         if status_code >= 300:
-            if resp_json and resp_json.get("message"):  # for ndb apis
-                err = resp_json["message"]
-            elif info.get("msg"):
-                err = info["msg"]
-            else:
-                err = "Status code != 2xx"
-            self.module.fail_json(
-                msg="Failed fetching URL: {0}".format(url),
-                status_code=status_code,
-                error=err,
-                response=resp_json,
-            )
+            self._fail_fetch(url, status_code, resp_json, info.get("msg"))
 
         if no_response:
             return {"status_code": status_code}
@@ -420,25 +744,125 @@ class Entity(object):
 
         return resp_json
 
-    # upload file in chunks to the given url
+    def _fail_fetch(self, url, status_code, resp_json, msg):
+        if resp_json and resp_json.get("message"):  # for ndb apis
+            err = resp_json["message"]
+        elif msg:
+            err = msg
+        else:
+            err = "Status code != 2xx"
+        self.module.fail_json(
+            msg="Failed fetching URL: {0}".format(url),
+            status_code=status_code,
+            error=err,
+            response=resp_json,
+        )
+
+    # authenticate with session cookie if any, fallback to credentials if session is rejected
+    def _send_authenticated_request(self, url, method, data=None, timeout=30):
+        if self.session is None:
+            return self._send_request(
+                url, method, data=data, headers=self.headers, timeout=timeout
+            )
+
+        if self.session.is_active():
+            # credentials are not sent while session cookie is used
+            headers = dict(self.headers)
+            headers.pop("Authorization", None)
+            resp, info = self._send_request(
+                url, method, data=data, headers=headers, timeout=timeout
+            )
+            if info.get("status") != 401:
+                if 0 < info.get("status", -1) < 400:
+                    self.session.refresh()
+                return resp, info
+            self.session.invalidate()
+
+        resp, info = self._send_request(
+            url, method, data=data, headers=self.headers, timeout=timeout
+        )
+        if 0 < info.get("status", -1) < 400:
+            self.session.refresh()
+        return resp, info
+
+    def _start_trace(self, method, url, data=None):
+        if not self.module.params.get("perf_trace"):
+            return None
+        bytes_sent = len(data) if isinstance(data, (str, bytes)) else 0
+        return perf_tracer.start(method, url, bytes_sent)
+
+    # send request over kept-alive pooled connection, fallback to fetch_url for proxies
+    def _send_request(self, url, method, data=None, headers=None, timeout=30):
+        # wait for rate limits shared by all module processes of this endpoint
+        slot = self.rate_limiter.acquire(timeout) if self.rate_limiter else None
+        try:
+            if connection_pool.is_proxied(url):
+                return fetch_url(
+                    self.module,
+                    url,
+                    data=data,
+                    method=method,
+                    headers=headers,
+                    cookies=self.cookies,
+                    timeout=timeout,
+                )
+            return connection_pool.request(
+                url,
+                method=method,
+                data=data,
+                headers=headers,
+                cookies=self.cookies,
+                timeout=timeout,
+                validate_certs=self.module.params.get("validate_certs", True),
+                compression=self.module.params.get("compression", False),
+            )
+        finally:
+            if slot:
+                self.rate_limiter.release(slot)
+
+    # upload file, or 'length' bytes of it from 'offset', in chunks to the given url
     def _upload_file(
-        self, url, source, method, raise_error=True, no_response=False, timeout=30
+        self,
+        url,
+        source,
+        method,
+        raise_error=True,
+        no_response=False,
+        timeout=30,
+        offset=0,
+        length=None,
+        headers=None,
+        hash_algorithm=None,
+        reader=None,
     ):
-        file_chunks_iterator = FileChunksIterator(source)
-        headers = copy.deepcopy(self.headers)
-        headers["Content-Length"] = file_chunks_iterator.length
-        resp, info = fetch_url(
-            self.module,
-            url,
-            data=file_chunks_iterator,
-            method=method,
-            headers=headers,
-            cookies=self.cookies,
-            timeout=timeout,
+        upload = FileUpload(
+            source,
+            chunk_size=self._get_upload_chunk_size(),
+            on_progress=self._log_upload_progress,
+            offset=offset,
+            length=length,
+            hash_algorithm=hash_algorithm,
+            reader=reader,
         )
+        request_headers = copy.deepcopy(self.headers)
+        request_headers.update(headers or {})
+        request_headers["Content-Length"] = upload.length
+        trace = self._start_trace(method, url)
+        if trace:
+            trace["bytes_sent"] = upload.length
+        try:
+            resp, info = self._send_request(
+                url, method, data=upload, headers=request_headers, timeout=timeout
+            )
+        finally:
+            upload.close()
+            self.upload_stats = upload.report()
+            self.upload_digest = upload.hexdigest()
 
         status_code = info.get("status")
         body = resp.read() if resp else info.get("body")
+        if trace:
+            perf_tracer.finish(trace, status_code, len(body or ""))
         try:
             resp_json = json.loads(to_text(body)) if body else None
         except ValueError:
@@ -450,10 +874,13 @@ class Entity(object):
                 resp_json = {}
             if status_code >= 300:
                 resp_json["error"] = body
+            elif status_code < 0:
+                # request did not reach server e.g. connection failure
+                resp_json["error"] = info.get("msg")
             resp_json["status_code"] = status_code
             return resp_json
 
-        if status_code >= 300:
+        if status_code >= 300 or status_code < 0:
             err = info.get("msg", "Status code != 2xx")
             self.module.fail_json(
                 msg="Failed fetching URL: {0}".format(url),
@@ -475,6 +902,29 @@ class Entity(object):
 
         return resp_json
 
+    def _get_upload_chunk_size(self):
+        chunk_size = self.module.params.get("upload_chunk_size")
+        if chunk_size is None:
+            return None
+        if not 1 <= chunk_size <= 64:
+            self.module.fail_json(
+                msg="upload_chunk_size should be between 1 and 64 MiB, got {0}".format(
+                    chunk_size
+                )
+            )
+        return chunk_size * MiB
+
+    def _log_upload_progress(self, report):
+        if hasattr(self.module, "log"):
+            self.module.log(
+                "Uploaded {0} of {1} bytes at {2} MiB/s, {3} seconds remaining".format(
+                    report["bytes_sent"],
+                    report["total_bytes"],
+                    report["throughput_mib_per_sec"],
+                    report["eta_seconds"],
+                )
+            )
+
     def unify_spec(self, spec1, spec2):
         """
         This routine return intersection of two specs(dict) as per
@@ -498,37 +948,3 @@ class Entity(object):
             if utils.intersection(entity, custom_filters.copy()):
                 filtered_entities.append(entity)
         return filtered_entities
-
-
-# Read files in chunks and yeild it
-class CreateChunks(object):
-    def __init__(self, filename, chunk_size=1 << 13):
-        self.filename = filename
-        self.chunk_size = chunk_size
-        self.total_size = os.path.getsize(filename)
-
-    def __iter__(self):
-        with open(self.filename, "rb") as file:
-            while True:
-                data = file.read(self.chunk_size)
-                if not data:
-                    break
-                yield data
-
-    def __len__(self):
-        return self.total_size
-
-
-# to iterate over chunks of file
-class FileChunksIterator(object):
-    def __init__(self, filename, chunk_size=1 << 13):
-        iterable = CreateChunks(filename, chunk_size)
-        self.iterator = iter(iterable)
-        self.length = len(iterable)
-
-    # request lib checks for read func in iterable object
-    def read(self, size=None):
-        return next(self.iterator, b"")
-
-    def __len__(self):
-        return self.length
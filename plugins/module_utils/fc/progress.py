@@ -0,0 +1,156 @@
+from __future__ import absolute_import, division, print_function
+
+import time
+
+from .imaged_clusters import ImagedCluster
+from .imaged_nodes import ImagedNode
+
+__metaclass__ = type
+
+
+class ImagingProgress(object):
+    """
+    Tracks availability of nodes and imaging progress of an imaged cluster in
+    foundation central. Polls begin right away and back off while progress
+    stays put, so failures of pre-checks are detected by the next poll.
+    """
+
+    min_poll_interval = 5
+    max_poll_interval = 60
+    poll_backoff = 1.5
+    # max nodes read concurrently in a poll
+    max_poll_workers = 8
+    node_timeout = 30 * 60
+    imaging_timeout = 3 * 60 * 60
+
+    def __init__(self, module):
+        self.module = module
+        self.imaged_cluster = ImagedCluster(module)
+        self.imaged_node = ImagedNode(module)
+        # intermediate progress, recorded whenever it changes
+        self.history = []
+        self.polls = 0
+
+    def wait_for_nodes_available(self, node_uuids):
+        """
+        Wait till all given nodes are available, reading pending nodes
+        concurrently in each poll. Returns state of each node and error if any.
+        """
+        deadline = time.time() + self.node_timeout
+        pending = list(dict.fromkeys(node_uuids))
+        states = {}
+        delay = self.min_poll_interval
+        while True:
+            # fc modules have no list_concurrency, pending nodes are read in a
+            # bounded pool
+            nodes = self.imaged_node.run_concurrently(
+                self.imaged_node.read,
+                pending,
+                workers=min(len(pending), self.max_poll_workers),
+            )
+            for uuid, node in zip(list(pending), nodes):
+                states[uuid] = node["node_state"]
+                if node["node_state"] == "STATE_AVAILABLE":
+                    pending.remove(uuid)
+            if not pending:
+                return states, None
+            if time.time() > deadline:
+                return (
+                    states,
+                    "Timeout. Nodes are in {0}\n".format(
+                        ", ".join(
+                            "{0}: {1}".format(uuid, states[uuid]) for uuid in pending
+                        )
+                    ),
+                )
+            time.sleep(delay)
+            delay = min(self.max_poll_interval, delay * self.poll_backoff)
+
+    def wait_for_completion(self, uuid):
+        """
+        Poll imaged cluster till imaging stops. Returns last response and
+        error if imaging stopped before completion, any node stopped imaging
+        midway or on timeout.
+        """
+        deadline = time.time() + self.imaging_timeout
+        delay = self.min_poll_interval
+        self.polls = 0
+        while True:
+            response = self.imaged_cluster.read(uuid)
+            self.polls += 1
+            # status is not there till imaging starts
+            status = response.get("cluster_status") or {}
+            changed = self._record(status)
+
+            if status.get("imaging_stopped"):
+                if status.get("aggregate_percent_complete", 0) < 100:
+                    return response, self._get_progress_error_status(response)
+                return response, None
+            # node failures, e.g. of pre-checks, fail the imaging as whole
+            if self._get_failed_nodes(status):
+                return response, self._get_progress_error_status(response)
+            if time.time() > deadline:
+                return (
+                    None,
+                    "Failed to poll on image node progress. Reason: Timeout",
+                )
+
+            if changed:
+                delay = max(self.min_poll_interval, delay / self.poll_backoff)
+            else:
+                delay = min(self.max_poll_interval, delay * self.poll_backoff)
+            time.sleep(delay)
+
+    def _record(self, status):
+        nodes = status.get("node_progress_details") or []
+        snapshot = {
+            "aggregate_percent_complete": status.get("aggregate_percent_complete"),
+            "cluster_creation_started": status.get("cluster_creation_started"),
+            "nodes": dict(
+                (node.get("imaged_node_uuid"), node.get("status")) for node in nodes
+            ),
+        }
+        if self.history and self.history[-1]["progress"] == snapshot:
+            return False
+        self.history.append({"time": time.time(), "progress": snapshot})
+        return True
+
+    @staticmethod
+    def _get_failed_nodes(status):
+        return [
+            node.get("imaged_node_uuid")
+            for node in status.get("node_progress_details") or []
+            if node.get("imaging_stopped") and node.get("percent_complete", 0) < 100
+        ]
+
+    def _get_progress_error_status(self, progress):
+        return "Imaging stopped before completion.\nClusters: {0}\nNodes: {1}".format(
+            self._get_cluster_progress_messages(
+                progress, "cluster_progress_details", "cluster_name"
+            ),
+            self._get_node_progress_messages(
+                progress, "node_progress_details", "imaged_node_uuid"
+            ),
+        )
+
+    @staticmethod
+    def _get_cluster_progress_messages(progress, entity_type, entity_name):
+        res = ""
+        cluster = (progress.get("cluster_status") or {}).get(entity_type)
+        if cluster is not None:
+            if cluster.get(entity_name):
+                res += "cluster_name: {0}\n".format(cluster[entity_name])
+            if cluster.get("status"):
+                res += "status:\n{0}\n".format(cluster["status"])
+
+        return res
+
+    @staticmethod
+    def _get_node_progress_messages(progress, entity_type, entity_name):
+        res = ""
+        nodes = (progress.get("cluster_status") or {}).get(entity_type)
+        if nodes:
+            for c in nodes:
+                res += "node_uuid: {0}\n".format(c[entity_name])
+                res += "status:\n{0}\n".format(c["status"])
+        return res
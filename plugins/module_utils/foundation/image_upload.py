@@ -1,12 +1,27 @@
 from __future__ import absolute_import, division, print_function
 
+import os
+import threading
+
+from ..upload import (
+    SharedFileReader,
+    cache_checksum,
+    compute_checksum,
+    get_cached_checksum,
+    get_upload_state,
+)
+from .enumerate_aos_packages import EnumerateAOSPackages
+from .enumerate_hypervisor_isos import EnumerateHypervisorIsos
 from .foundation import Foundation
 
 __metaclass__ = type
 
 
 class Image(Foundation):
-    def __init__(self, module, delete_image=False):
+    # algorithm of digests identifying contents of uploaded files
+    hash_algorithm = "sha256"
+
+    def __init__(self, module, delete_image=False, host=None):
         if delete_image:
             resource_type = "/delete"
             additional_headers = {
@@ -20,17 +35,186 @@ class Image(Foundation):
                 "Accept": "application/json",
             }
 
+        if host:
+            module = HostModule(module, host)
         super(Image, self).__init__(
             module, resource_type=resource_type, additional_headers=additional_headers
         )
 
-    def upload_image(self, filename, installer_type, source, timeout=600):
+    def upload_image(
+        self,
+        filename,
+        installer_type,
+        source,
+        timeout=600,
+        raise_error=True,
+        hash_algorithm=None,
+        reader=None,
+    ):
         query = {"filename": filename, "installer_type": installer_type}
-        return self.upload(source=source, query=query, timeout=timeout)
+        return self.upload(
+            source=source,
+            query=query,
+            timeout=timeout,
+            raise_error=raise_error,
+            hash_algorithm=hash_algorithm,
+            reader=reader,
+        )
 
     def delete_image(self, filename, installer_type):
         data = "installer_type={0}&filename={1}".format(installer_type, filename)
         return self.create(data=data, no_response=True)
 
+    def get_existing_file(self, filename, installer_type):
+        """
+        Returns entry of file in installers of type listed by foundation, if any
+        """
+        if installer_type == "nos":
+            files = EnumerateAOSPackages(self.module).list() or []
+        else:
+            isos = EnumerateHypervisorIsos(self.module).read() or {}
+            files = isos.get(installer_type) or []
+        for entry in files:
+            if not isinstance(entry, dict):
+                entry = {"filename": entry}
+            if entry.get("filename") == filename:
+                return entry
+        return None
+
+    def get_upload_record(self, filename, installer_type, size):
+        """
+        Returns record of earlier upload of file of given size to this foundation,
+        if file is still listed by foundation with same size, where reported
+        """
+        entry = self.get_existing_file(filename, installer_type)
+        if not entry or entry.get("size", size) != size:
+            return None
+        record = get_upload_state().get(self._get_record_key(filename, installer_type))
+        if not record or record.get("size") != size:
+            return None
+        return record
+
+    def record_upload(self, filename, installer_type, source, digest):
+        get_upload_state().save(
+            self._get_record_key(filename, installer_type),
+            source,
+            size=os.path.getsize(source),
+            digest=digest,
+        )
+
+    def _get_record_key(self, filename, installer_type):
+        return "foundation|{0}|{1}|{2}".format(
+            self.base_url.split("/")[2], installer_type, filename
+        )
+
     def _get_default_spec(self):
         raise NotImplementedError
+
+
+class HostModule(object):
+    """
+    Module with nutanix_host param replaced by given host, for calls to other
+    hosts of same kind within a module run
+    """
+
+    def __init__(self, module, host):
+        self._module = module
+        self.params = dict(module.params)
+        self.params["nutanix_host"] = host
+
+    def __getattr__(self, name):
+        return getattr(self._module, name)
+
+
+def upload_image_to_hosts(
+    module, hosts, filename, installer_type, source, timeout=600, skip_existing=False
+):
+    """
+    Upload installer file to foundation of each host. With 'skip_existing',
+    hosts already having file of same name, size and digest, as recorded by
+    earlier uploads within UploadState ttl (7 days), are skipped, and file is
+    hashed while uploading to record it. Pending hosts are uploaded to
+    concurrently, reading file from disk once. Returns result of each host.
+    """
+    images = [Image(module, host=host) for host in hosts]
+    results = [
+        {"host": host, "skipped": False, "upload": None, "error": None}
+        for host in hosts
+    ]
+    size = os.path.getsize(source)
+    # contents are hashed and uploads recorded only for skipping them later
+    hash_algorithm = Image.hash_algorithm if skip_existing else None
+    digest = None
+
+    if skip_existing:
+        digest = get_cached_checksum(source, hash_algorithm)
+        records = images[0].run_concurrently(
+            lambda image: image.get_upload_record(filename, installer_type, size),
+            images,
+            workers=len(images),
+        )
+        if any(records) and not digest:
+            digest = compute_checksum(source, hash_algorithm)
+        for result, record in zip(results, records):
+            result["skipped"] = bool(record) and record.get("digest") == digest
+
+    pending = [i for i, result in enumerate(results) if not result["skipped"]]
+    # with skip_existing, contents are hashed while uploading unless digest is known
+    reader = None
+    if len(pending) > 1:
+        reader = SharedFileReader(
+            source,
+            chunk_size=images[0]._get_upload_chunk_size(),
+            hash_algorithm=None if digest else hash_algorithm,
+        )
+    consumers = dict((i, reader.consumer() if reader else None) for i in pending)
+
+    def upload(index):
+        image = images[index]
+        # until response is received, e.g. if thread ends with exception
+        results[index]["error"] = "Upload did not complete"
+        try:
+            resp = image.upload_image(
+                filename,
+                installer_type,
+                source,
+                timeout=timeout,
+                raise_error=False,
+                hash_algorithm=None if digest or reader else hash_algorithm,
+                reader=consumers[index],
+            )
+        finally:
+            if consumers[index]:
+                consumers[index].close()
+        status_code = resp.pop("status_code", None)
+        results[index]["upload"] = image.upload_stats
+        results[index]["response"] = resp
+        if status_code and 200 <= status_code < 300:
+            results[index]["error"] = None
+        else:
+            results[index]["error"] = resp.get("error") or "Status code {0}".format(
+                status_code
+            )
+
+    # each consumer of shared reader needs its own thread, so none of them waits
+    # for chunks to be taken by one which has not started
+    threads = [threading.Thread(target=upload, args=(i,)) for i in pending[1:]]
+    for thread in threads:
+        thread.daemon = True
+        thread.start()
+    if pending:
+        upload(pending[0])
+    for thread in threads:
+        thread.join()
+
+    uploaded = [i for i in pending if not results[i]["error"]]
+    if not skip_existing:
+        return results
+    if uploaded and not digest:
+        digest = reader.hexdigest() if reader else images[uploaded[0]].upload_digest
+        if digest:
+            cache_checksum(source, hash_algorithm, digest)
+    for i in uploaded:
+        if digest:
+            images[i].record_upload(filename, installer_type, source, digest)
+    return results
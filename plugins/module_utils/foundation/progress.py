@@ -2,6 +2,7 @@
 # GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
 from __future__ import absolute_import, division, print_function
 
+import json
 import time
 
 from ansible_collections.nutanix.ncp.plugins.module_utils.foundation.foundation import (
@@ -12,9 +13,15 @@ __metaclass__ = type
 
 
 class Progress(Foundation):
+
+    min_poll_interval = 5
+    max_poll_interval = 60
+    poll_backoff = 1.5
+
     def __init__(self, module):
         resource_type = "/progress"
         super(Progress, self).__init__(module, resource_type=resource_type)
+        self.polls = 0
 
     def get(self, uuid):
         query = {"session_id": uuid}
@@ -22,27 +29,55 @@ class Progress(Foundation):
         return resp
 
     def wait_for_completion(self, uuid):
-        state = ""
-        delay = 30
-        timeout = time.time() + (max(3600, self.module.params["timeout"]))
-        while state != "COMPLETED":
+        """
+        Monitor imaging session till it stops. Polls are frequent while
+        aggregate progress moves and back off while it does not. Snapshots of
+        progress are appended to 'progress_log' file if given. Wait returns
+        early if 'fail_fast' is set and a node fails, or if a node makes no
+        progress for 'stall_timeout' seconds while it lags behind other nodes.
+        """
+        params = self.module.params
+        timeout = time.time() + (max(3600, params["timeout"]))
+        monitor = ImagingMonitor(
+            params.get("progress_log"), params.get("stall_timeout")
+        )
+        delay = self.min_poll_interval
+        self.polls = 0
+        while True:
             response = self.get(uuid)
-            stopped = response.get("imaging_stopped", False)
-            aggregate_percent_complete = response.get("aggregate_percent_complete", -1)
-            if stopped:
-                if aggregate_percent_complete < 100:
-                    status = self._get_progress_error_status(response)
-                    return response, status
-                state = "COMPLETED"
+            self.polls += 1
+            now = time.time()
+            delta = monitor.update(response, now)
+
+            if response.get("imaging_stopped", False):
+                if response.get("aggregate_percent_complete", -1) < 100:
+                    return response, self._get_progress_error_status(response)
+                return response, None
+
+            failed = monitor.failed_nodes
+            if failed and params.get("fail_fast"):
+                return response, "Imaging failed for nodes {0}.\n{1}".format(
+                    ", ".join(failed), self._get_progress_error_status(response)
+                )
+            stalled = monitor.get_stalled_nodes(now)
+            if stalled:
+                return (
+                    response,
+                    "Imaging stalled for nodes {0}, no progress in {1} seconds".format(
+                        ", ".join(stalled), monitor.stall_timeout
+                    ),
+                )
+            if now > timeout:
+                return (
+                    None,
+                    "Failed to poll on image node progress. Reason: Timeout",
+                )
+
+            if delta > 0:
+                delay = max(self.min_poll_interval, delay / self.poll_backoff)
             else:
-                state = "PENDING"
-                if time.time() > timeout:
-                    return (
-                        None,
-                        "Failed to poll on image node progress. Reason: Timeout",
-                    )
-                time.sleep(delay)
-        return response, None
+                delay = min(self.max_poll_interval, delay * self.poll_backoff)
+            time.sleep(delay)
 
     def _get_progress_error_status(self, progress):
         return "Imaging stopped before completion.\nClusters: {0}\nNodes: {1}".format(
@@ -58,3 +93,99 @@ class Progress(Foundation):
                 res += "cluster: {0}\n".format(c.get(entity_name))
                 res += "messages:\n{0}\n".join(c.get("messages", []))
         return res
+
+
+class ImagingMonitor(object):
+    """
+    Tracks progress of nodes and clusters of an imaging session across polls
+    """
+
+    def __init__(self, log_file=None, stall_timeout=None):
+        self.log_file = log_file
+        self.stall_timeout = stall_timeout
+        self.aggregate = None
+        # node name to its last progress and time it last changed
+        self.nodes = {}
+        self.failed_nodes = []
+        self.messages_logged = {}
+
+    def update(self, response, now):
+        """
+        Record progress of response, returns change in aggregate progress
+        """
+        aggregate = response.get("aggregate_percent_complete", 0)
+        delta = aggregate - self.aggregate if self.aggregate is not None else 0
+        self.aggregate = aggregate
+
+        for node in response.get("nodes") or []:
+            name = self._get_node_name(node)
+            percent = node.get("percent_complete", 0)
+            last = self.nodes.get(name)
+            if last is None or last[0] != percent:
+                self.nodes[name] = (percent, now)
+            if self._is_failed(node) and name not in self.failed_nodes:
+                self.failed_nodes.append(name)
+
+        if self.log_file:
+            self._write_snapshot(response, now)
+        return delta
+
+    def get_stalled_nodes(self, now):
+        """
+        Nodes without progress for stall_timeout seconds, that are behind
+        the most progressed node or are the only node being imaged
+        """
+        if not self.stall_timeout or not self.nodes:
+            return []
+        lead = max(percent for percent, _ in self.nodes.values())
+        stalled = []
+        for name, (percent, changed) in self.nodes.items():
+            if percent >= 100 or name in self.failed_nodes:
+                continue
+            if now - changed < self.stall_timeout:
+                continue
+            if len(self.nodes) == 1 or percent < lead:
+                stalled.append(name)
+        return sorted(stalled)
+
+    def _write_snapshot(self, response, now):
+        # messages are logged incrementally, only ones new since last snapshot
+        snapshot = {
+            "time": now,
+            "aggregate_percent_complete": response.get("aggregate_percent_complete"),
+            "imaging_stopped": response.get("imaging_stopped", False),
+            "nodes": [
+                self._get_snapshot_entry("node", self._get_node_name(node), node)
+                for node in response.get("nodes") or []
+            ],
+            "clusters": [
+                self._get_snapshot_entry(
+                    "cluster", cluster.get("cluster_name"), cluster
+                )
+                for cluster in response.get("clusters") or []
+            ],
+        }
+        with open(self.log_file, "a") as f:
+            f.write(json.dumps(snapshot, sort_keys=True) + "\n")
+
+    def _get_snapshot_entry(self, kind, name, progress):
+        messages = progress.get("messages") or []
+        logged = self.messages_logged.get((kind, name), 0)
+        self.messages_logged[(kind, name)] = len(messages)
+        return {
+            "name": name,
+            "percent_complete": progress.get("percent_complete"),
+            "status": progress.get("status"),
+            "messages": messages[logged:],
+        }
+
+    @staticmethod
+    def _get_node_name(node):
+        return node.get("cvm_ip") or node.get("hypervisor_ip") or node.get("ipmi_ip")
+
+    @staticmethod
+    def _is_failed(node):
+        if node.get("percent_complete", 0) < 0:
+            return True
+        status = (node.get("status") or "").lower()
+        return "fail" in status or "fatal" in status
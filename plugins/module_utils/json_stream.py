@@ -0,0 +1,157 @@
+# This file is part of Ansible
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import codecs
+import json
+
+WHITESPACE = " \t\n\r"
+
+
+class JSONStreamDecoder(object):
+    """
+    Incrementally decode JSON document read from file like object.
+    Items of array under 'key' of top level object (or items of top level array)
+    are decoded and yielded one at a time while reading, so only one item
+    and a bounded read buffer are held in memory instead of complete response.
+    Rest of the top level object is available in 'envelope' after iterating.
+    """
+
+    def __init__(self, fp, key="entities", chunk_size=65536):
+        self.fp = fp
+        self.key = key
+        self.chunk_size = chunk_size
+        self.envelope = None
+        self.bytes_read = 0
+        # called with bytes read, once complete response is read
+        self.on_complete = None
+        self._decoder = json.JSONDecoder()
+        self._text_decoder = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+
+    def __iter__(self):
+        return self._iter_items()
+
+    def decode(self):
+        """
+        Decode complete document
+        """
+        items = list(self)
+        if isinstance(self.envelope, dict) and self.key in self.envelope:
+            self.envelope[self.key] = items
+        elif isinstance(self.envelope, list):
+            self.envelope = items
+        return self.envelope
+
+    def unparsed_text(self):
+        return self._buffer[self._pos :]
+
+    def _iter_items(self):
+        for item in self._iter_document():
+            yield item
+        # read till end of data, so that response is complete and connection can be reused
+        while self._read_more():
+            self._pos = len(self._buffer)
+
+    def _iter_document(self):
+        char = self._peek()
+        if char == "[":
+            self._pos += 1
+            self.envelope = []
+            for item in self._iter_array():
+                yield item
+            return
+
+        if char != "{":
+            self.envelope = self._decode_value()
+            return
+
+        self._pos += 1
+        self.envelope = {}
+        if self._peek() == "}":
+            self._pos += 1
+            return
+        while True:
+            key = self._decode_value()
+            if self._next_char() != ":":
+                raise ValueError("Expecting ':' delimiter after key {0}".format(key))
+            if key == self.key and self._peek() == "[":
+                self._pos += 1
+                self.envelope[key] = []
+                for item in self._iter_array():
+                    yield item
+            else:
+                self.envelope[key] = self._decode_value()
+
+            char = self._next_char()
+            if char == "}":
+                return
+            if char != ",":
+                raise ValueError("Expecting ',' delimiter, got {0}".format(char))
+
+    def _iter_array(self):
+        if self._peek() == "]":
+            self._pos += 1
+            return
+        while True:
+            yield self._decode_value()
+            char = self._next_char()
+            if char == "]":
+                return
+            if char != ",":
+                raise ValueError("Expecting ',' delimiter, got {0}".format(char))
+
+    def _decode_value(self):
+        self._peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except ValueError:
+                # value is not complete in buffer yet
+                if not self._read_more():
+                    raise
+                continue
+            # a number at the end of buffer might continue in next chunk
+            if end == len(self._buffer) and self._read_more():
+                continue
+            self._pos = end
+            return value
+
+    def _peek(self):
+        while True:
+            while self._pos < len(self._buffer):
+                if self._buffer[self._pos] not in WHITESPACE:
+                    return self._buffer[self._pos]
+                self._pos += 1
+            if not self._read_more():
+                raise ValueError("Unexpected end of JSON data")
+
+    def _next_char(self):
+        char = self._peek()
+        self._pos += 1
+        return char
+
+    def _read_more(self):
+        """
+        Read next chunk into buffer. Read size grows with pending text so that
+        re-decoding large values stays linear. Returns False at end of data.
+        """
+        if self._eof:
+            return False
+        pending = len(self._buffer) - self._pos
+        data = self.fp.read(max(self.chunk_size, pending))
+        if not data:
+            self._eof = True
+            text = self._text_decoder.decode(b"", final=True)
+            if self.on_complete:
+                self.on_complete(self.bytes_read)
+        else:
+            self.bytes_read += len(data)
+            text = self._text_decoder.decode(data)
+        self._buffer = self._buffer[self._pos :] + text
+        self._pos = 0
+        return bool(data) or bool(text)
@@ -4,6 +4,8 @@ from __future__ import absolute_import, division, print_function
 
 from ansible.module_utils.basic import AnsibleModule, env_fallback
 
+from ..perf_trace import add_request_stats
+
 __metaclass__ = type
 
 
@@ -27,6 +29,26 @@ class NdbBaseModule(AnsibleModule):
         state=dict(type="str", choices=["present", "absent"], default="present"),
         timeout=dict(type="int", required=False, default=35 * 60),
         wait=dict(type="bool", default=True),
+        max_retries=dict(
+            type="int", default=3, fallback=(env_fallback, ["NUTANIX_MAX_RETRIES"])
+        ),
+        rate_limit=dict(type="float", fallback=(env_fallback, ["NUTANIX_RATE_LIMIT"])),
+        max_concurrent_requests=dict(
+            type="int", fallback=(env_fallback, ["NUTANIX_MAX_CONCURRENT_REQUESTS"])
+        ),
+        perf_trace=dict(
+            type="bool", default=False, fallback=(env_fallback, ["NUTANIX_PERF_TRACE"])
+        ),
+        session_cache=dict(
+            type="bool",
+            default=False,
+            fallback=(env_fallback, ["NUTANIX_SESSION_CACHE"]),
+        ),
+        bypass_cache=dict(
+            type="bool",
+            default=False,
+            fallback=(env_fallback, ["NUTANIX_BYPASS_CACHE"]),
+        ),
     )
 
     def __init__(self, **kwargs):
@@ -39,3 +61,10 @@ class NdbBaseModule(AnsibleModule):
             kwargs["supports_check_mode"] = True
 
         super(NdbBaseModule, self).__init__(**kwargs)
+
+    def exit_json(self, **kwargs):
+        super(NdbBaseModule, self).exit_json(**add_request_stats(self.params, kwargs))
+
+    def fail_json(self, msg, **kwargs):
+        params = getattr(self, "params", None) or {}
+        super(NdbBaseModule, self).fail_json(msg, **add_request_stats(params, kwargs))
@@ -77,8 +77,12 @@ class Cluster(NutanixDatabase):
         raise_error=True,
         no_response=False,
     ):
+        uuid = self.get_cached_uuid(value, key=key)
+        if uuid:
+            return uuid
         endpoint = "{0}/{1}".format(key, value)
         resp = self.read(uuid=None, endpoint=endpoint)
+        self.cache_uuid(resp.get("id"), value, key=key)
         return resp.get("id")
 
     def get_cluster(self, uuid=None, name=None):
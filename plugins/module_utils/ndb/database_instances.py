@@ -82,6 +82,9 @@ class DatabaseInstance(NutanixDatabase):
         raise_error=True,
         no_response=False,
     ):
+        uuid = self.get_cached_uuid(value, key=key)
+        if uuid:
+            return uuid, None
         query = {"value-type": key, "value": value}
         resp = self.read(query=query)
 
@@ -89,6 +92,7 @@ class DatabaseInstance(NutanixDatabase):
             return None, "Database instance with name {0} not found.".format(value)
 
         uuid = resp[0].get("id")
+        self.cache_uuid(uuid, value, key=key)
         return uuid, None
 
     @staticmethod
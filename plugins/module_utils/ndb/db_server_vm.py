@@ -59,6 +59,9 @@ class DBServerVM(NutanixDatabase):
         raise_error=True,
         no_response=False,
     ):
+        uuid = self.get_cached_uuid(value, key=key)
+        if uuid:
+            return uuid, None
         query = {"value-type": key, "value": value}
         resp = self.read(query=query)
 
@@ -66,6 +69,7 @@ class DBServerVM(NutanixDatabase):
             return None, "DB server vm with name {0} not found.".format(value)
 
         uuid = resp[0].get("id")
+        self.cache_uuid(uuid, value, key=key)
         return uuid, None
 
     def get_all_db_servers_name_uuid_map(self):
@@ -50,9 +50,13 @@ class MaintenanceWindow(NutanixDatabase):
         raise_error=True,
         no_response=False,
     ):
+        uuid = self.get_cached_uuid(value, key=key)
+        if uuid:
+            return uuid, None
         resp = self.read()
         for entity in resp:
             if entity.get(key) == value:
+                self.cache_uuid(entity.get("id"), value, key=key)
                 return entity.get("id"), None
 
         return None, "Maintenance window with name {0} not found.".format(value)
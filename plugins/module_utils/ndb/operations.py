@@ -8,32 +8,49 @@ __metaclass__ = type
 
 
 from ..constants import NDB
+from ..perf_trace import perf_tracer
 from .nutanix_database import NutanixDatabase
 
 
 class Operation(NutanixDatabase):
+
+    # operations take a while to be readable after they are triggered
+    lookup_timeout = 60
+    min_poll_interval = 1
+    poll_backoff = 1.5
+    # max operations read concurrently in a poll of wait_for_all
+    max_poll_workers = 8
+
     def __init__(self, module):
         resource_type = "/operations"
         super(Operation, self).__init__(module, resource_type=resource_type)
+        self.polls = 0
 
     def wait_for_completion(
         self, uuid, raise_error=True, delay=NDB.OPERATIONS_POLLING_DELAY
     ):
-        timeout = time.time() + self.module.params["timeout"]
-        resp = None
+        """
+        Poll operation till it completes. Operation is read as soon as it exists,
+        polls then back off towards 'delay' seconds, but are scheduled earlier if
+        progress of its percentage or steps suggests that operation completes sooner.
+        """
+        start = time.time()
+        timeout = start + self.module.params["timeout"]
+        resp = self._wait_till_exists(uuid)
+        interval = self.min_poll_interval
+        first_progress = None
         while True:
-            resp = self.read(uuid)
             status = resp.get("status")
             if (
                 status == NDB.StatusCodes.SUCCESS
                 or status == NDB.StatusCodes.COMPLETED_WITH_WARNING
             ):
-                return resp
+                break
             elif status == NDB.StatusCodes.FAILURE:
                 if not raise_error:
                     break
                 self.module.fail_json(
-                    msg=resp["message"],
+                    msg=resp.get("message"),
                     response=resp,
                 )
             else:
@@ -42,5 +59,128 @@ class Operation(NutanixDatabase):
                         msg="Failed to poll on provision database instance operations. Reason: Timeout",
                         response=resp,
                     )
-            time.sleep(delay)
+
+            interval = min(delay, interval * self.poll_backoff)
+            now = time.time()
+            percentage = self._get_progress(resp)
+            if percentage is not None:
+                if first_progress is None:
+                    first_progress = (now, percentage)
+                remaining = self._estimate_remaining(first_progress, now, percentage)
+                if remaining is not None:
+                    # poll at half of the expected remaining time
+                    interval = max(
+                        self.min_poll_interval, min(interval, remaining / 2.0)
+                    )
+
+            time.sleep(interval)
+            resp = self.read(uuid)
+            self.polls += 1
+
+        if self.module.params.get("perf_trace"):
+            perf_tracer.record_wait(uuid, self.polls, time.time() - start)
         return resp
+
+    def wait_for_all(self, uuids, raise_error=True, delay=NDB.OPERATIONS_POLLING_DELAY):
+        """
+        Wait for multiple operations, reading all pending operations together in
+        every poll. Returns map of operation uuid to its last response. Fails once all
+        operations are complete if any of them failed, or on timeout.
+        """
+        start = time.time()
+        timeout = start + self.module.params["timeout"]
+        pending = list(dict.fromkeys(uuids))
+        total = len(pending)
+        responses = {}
+        interval = self.min_poll_interval
+        self.polls = 0
+        while pending:
+            time.sleep(interval)
+            resps = self.run_concurrently(
+                lambda uuid: self.read(uuid, raise_error=False),
+                pending,
+                workers=min(len(pending), self.max_poll_workers),
+            )
+            self.polls += 1
+            for uuid, resp in zip(list(pending), resps):
+                # operations not yet readable are polled again
+                if not resp or not resp.get("status"):
+                    continue
+                responses[uuid] = resp
+                if resp["status"] in (
+                    NDB.StatusCodes.SUCCESS,
+                    NDB.StatusCodes.COMPLETED_WITH_WARNING,
+                    NDB.StatusCodes.FAILURE,
+                ):
+                    pending.remove(uuid)
+
+            if pending and time.time() > timeout:
+                break
+            interval = min(delay, interval * self.poll_backoff)
+
+        if self.module.params.get("perf_trace"):
+            perf_tracer.record_wait(",".join(uuids), self.polls, time.time() - start)
+
+        failed = [
+            r for r in responses.values() if r["status"] == NDB.StatusCodes.FAILURE
+        ]
+        if raise_error and pending:
+            self.module.fail_json(
+                msg="Failed to poll on operations {0}. Reason: Timeout".format(
+                    ", ".join(pending)
+                ),
+                response=responses,
+            )
+        if raise_error and failed:
+            self.module.fail_json(
+                msg="{0} of {1} operations failed".format(len(failed), total),
+                error=failed[0].get("message"),
+                response=responses,
+            )
+        return responses
+
+    def _wait_till_exists(self, uuid):
+        """
+        Read operation retrying till it is found, instead of sleeping for
+        fixed time after triggering it
+        """
+        deadline = time.time() + self.lookup_timeout
+        interval = self.min_poll_interval / 2.0
+        self.polls = 0
+        while True:
+            resp = self.read(uuid, raise_error=False)
+            self.polls += 1
+            if resp and resp.get("status"):
+                return resp
+            if time.time() >= deadline:
+                # read again to surface error of api
+                return self.read(uuid)
+            time.sleep(interval)
+            interval = min(self.min_poll_interval * 2, interval * self.poll_backoff)
+
+    @staticmethod
+    def _get_progress(resp):
+        """
+        Returns percentage of operation completed, as per count of
+        completed steps if percentage is not reported
+        """
+        try:
+            return int(resp.get("percentageComplete"))
+        except (TypeError, ValueError):
+            pass
+        steps = [step for step in resp.get("steps") or [] if isinstance(step, dict)]
+        if not steps:
+            return None
+        completed = [s for s in steps if s.get("status") == NDB.StatusCodes.SUCCESS]
+        return len(completed) * 100 // len(steps)
+
+    @staticmethod
+    def _estimate_remaining(first_progress, now, percentage):
+        """
+        Estimate seconds for operation to complete from rate of its progress
+        """
+        start, start_percentage = first_progress
+        if now <= start or percentage <= start_percentage:
+            return None
+        rate = (percentage - start_percentage) / float(now - start)
+        return (100 - percentage) / rate
@@ -29,8 +29,12 @@ class SLA(NutanixDatabase):
         raise_error=True,
         no_response=False,
     ):
+        uuid = self.get_cached_uuid(value, key=key)
+        if uuid:
+            return uuid
         endpoint = "{0}/{1}".format(key, value)
         resp = self.read(uuid=None, endpoint=endpoint, raise_error=raise_error)
+        self.cache_uuid(resp.get("id"), value, key=key)
         return resp.get("id")
 
     def get_sla(self, uuid=None, name=None):
@@ -43,11 +43,15 @@ class VLAN(NutanixDatabase):
         raise_error=True,
         no_response=False,
     ):
+        uuid = self.get_cached_uuid(value, key=key)
+        if uuid:
+            return uuid, None
         query = {key: value}
         resp = self.read(query=query, raise_error=False)
         if resp is None:
             return None, "vlan with name {0} not found.".format(value)
         uuid = resp.get("id")
+        self.cache_uuid(uuid, value, key=key)
         return uuid, None
 
     def get_vlan(self, name=None, uuid=None, detailed=True):
@@ -0,0 +1,75 @@
+# This file is part of Ansible
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+
+class AdaptivePageSizer(object):
+    """
+    Page length for list calls which starts large, shrinks on errors caused by
+    length, timeouts or slow pages and grows back while pages are fast. Length
+    which failed is never tried again.
+    """
+
+    # pages served within this many seconds are considered fast
+    fast_page_seconds = 2
+    # pages slower than this many seconds are considered slow
+    slow_page_seconds = 10
+
+    def __init__(self, initial=500, minimum=20, maximum=500):
+        self.minimum = minimum
+        self.ceiling = maximum
+        self.size = max(minimum, min(initial, maximum))
+        self.last_good = None
+
+    def record_success(self, length, latency):
+        self.last_good = max(self.last_good or 0, length)
+        if latency > self.slow_page_seconds:
+            self.size = max(self.minimum, self.size // 2)
+        elif latency < self.fast_page_seconds:
+            self.size = min(self.size * 2, self.ceiling)
+
+    @staticmethod
+    def is_page_failure(status_code, error=None):
+        """
+        Returns True if failure may be caused by page length i.e. timeouts and
+        connection failures (status -1), server errors and client errors telling
+        of length e.g. length above limit of API. Unknown status is considered
+        page failure.
+        """
+        if status_code is None or status_code < 0 or status_code >= 500:
+            return True
+        return 400 <= status_code < 500 and "length" in (error or "").lower()
+
+    def record_failure(self, length):
+        """
+        Shrink page length after failed page. Returns False if page length
+        can't be shrinked any more.
+        """
+        if length <= self.minimum:
+            return False
+        if self.last_good and self.last_good < length:
+            self.ceiling = self.last_good
+        else:
+            self.ceiling = max(self.minimum, length - 1)
+        self.size = max(self.minimum, min(length // 2, self.ceiling))
+        return True
+
+    def record_capped(self, length):
+        """
+        Server returned less entities than requested though more matches exist,
+        so page length is capped at server side.
+        """
+        self.ceiling = max(self.minimum, length)
+        self.size = min(self.size, self.ceiling)
+
+
+# page sizers per resource, remembered for the rest of the module run
+page_sizers = {}
+
+
+def get_page_sizer(resource, **kwargs):
+    if resource not in page_sizers:
+        page_sizers[resource] = AdaptivePageSizer(**kwargs)
+    return page_sizers[resource]
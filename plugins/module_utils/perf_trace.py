@@ -0,0 +1,139 @@
+# This file is part of Ansible
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import math
+import re
+import threading
+import time
+
+from ansible.module_utils.six.moves.urllib.parse import urlparse
+
+from ..module_utils.connection_pool import connection_pool
+from ..module_utils.retry import retry_stats
+
+UUID_REGEX = re.compile(
+    r"^[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}$"
+)
+
+
+class PerfTracer(object):
+    """
+    Records method, url template, status, latency, bytes sent & received
+    and retries of each API call, to summarize them per endpoint.
+    """
+
+    def __init__(self):
+        self.records = []
+        self.waits = []
+        self._lock = threading.Lock()
+
+    def start(self, method, url, bytes_sent=0):
+        record = {
+            "method": method,
+            "endpoint": self.get_url_template(url),
+            "start": time.time(),
+            "bytes_sent": bytes_sent or 0,
+        }
+        with self._lock:
+            self.records.append(record)
+        return record
+
+    @staticmethod
+    def finish(record, status, bytes_received=0, retries=0):
+        record["latency"] = time.time() - record["start"]
+        record["status"] = status
+        record["bytes_received"] = bytes_received or 0
+        record["retries"] = retries
+
+    def record_wait(self, uuid, polls, duration):
+        """
+        Record polls made while waiting for a task or operation to complete
+        """
+        with self._lock:
+            self.waits.append({"uuid": uuid, "polls": polls, "duration": duration})
+
+    @staticmethod
+    def get_url_template(url):
+        """
+        Replace uuids and numeric ids in url path with placeholders,
+        so that calls to same api are grouped together
+        """
+        segments = []
+        for segment in urlparse(url).path.split("/"):
+            if UUID_REGEX.match(segment):
+                segment = "{uuid}"
+            elif segment.isdigit():
+                segment = "{id}"
+            segments.append(segment)
+        return "/".join(segments)
+
+    def summary(self):
+        with self._lock:
+            records = [r for r in self.records if "latency" in r]
+
+        endpoints = {}
+        for record in records:
+            key = "{0} {1}".format(record["method"], record["endpoint"])
+            endpoints.setdefault(key, []).append(record)
+
+        rows = []
+        for key, calls in sorted(endpoints.items()):
+            latencies = sorted(r["latency"] for r in calls)
+            statuses = {}
+            for r in calls:
+                statuses[str(r["status"])] = statuses.get(str(r["status"]), 0) + 1
+            rows.append(
+                {
+                    "endpoint": key,
+                    "calls": len(calls),
+                    "total_latency": round(sum(latencies), 3),
+                    "p95_latency": round(self._percentile(latencies, 95), 3),
+                    "bytes_sent": sum(r["bytes_sent"] for r in calls),
+                    "bytes_received": sum(r["bytes_received"] for r in calls),
+                    "retries": sum(r["retries"] for r in calls),
+                    "statuses": statuses,
+                }
+            )
+
+        latencies = sorted(r["latency"] for r in records)
+        summary = {
+            "calls": len(records),
+            "total_latency": round(sum(latencies), 3),
+            "p95_latency": round(self._percentile(latencies, 95), 3),
+            "bytes_sent": sum(r["bytes_sent"] for r in records),
+            "bytes_received": sum(r["bytes_received"] for r in records),
+            "endpoints": rows,
+        }
+        if self.waits:
+            summary["waits"] = {
+                "count": len(self.waits),
+                "polls": sum(w["polls"] for w in self.waits),
+                "total_duration": round(sum(w["duration"] for w in self.waits), 3),
+            }
+        return summary
+
+    @staticmethod
+    def _percentile(values, percent):
+        if not values:
+            return 0
+        return values[max(0, int(math.ceil(percent / 100.0 * len(values))) - 1)]
+
+
+# api calls of the module run
+perf_tracer = PerfTracer()
+
+
+def add_request_stats(params, result):
+    """
+    Add stats of API requests made in module run to module result
+    """
+    if params.get("compression"):
+        result["compression_stats"] = dict(connection_pool.stats)
+    if retry_stats["retries"]:
+        result["retry_stats"] = dict(retry_stats)
+    if params.get("perf_trace"):
+        result["perf_trace"] = perf_tracer.summary()
+    return result
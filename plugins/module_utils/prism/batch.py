@@ -0,0 +1,126 @@
+# This file is part of Ansible
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import json
+
+from ansible.module_utils.six import string_types
+
+from .prism import Prism
+
+try:
+    from urllib.parse import urlparse
+except ImportError:
+    from urlparse import urlparse  # python2
+
+
+class Batch(Prism):
+    """
+    Collects create, update and delete calls of entities and sends them
+    together in chunks through v3 batch api. Responses are mapped back
+    to calls in the order they were added.
+    """
+
+    # max sub requests accepted by batch api in one call
+    max_requests = 60
+
+    def __init__(self, module, action_on_failure="CONTINUE"):
+        resource_type = "/batch"
+        super(Batch, self).__init__(module, resource_type=resource_type)
+        self.action_on_failure = action_on_failure
+        self.requests = []
+
+    def add_create(self, entity, data=None, endpoint=None, method="POST"):
+        return self._add(entity, method, data=data, endpoint=endpoint)
+
+    def add_update(self, entity, data=None, uuid=None, endpoint=None, method="PUT"):
+        return self._add(entity, method, data=data, uuid=uuid, endpoint=endpoint)
+
+    def add_delete(self, entity, uuid=None, endpoint=None):
+        return self._add(entity, "DELETE", uuid=uuid, endpoint=endpoint)
+
+    def execute(self, raise_error=True):
+        """
+        Send collected calls and returns their results, each having 'status_code',
+        'response' and 'task_uuid' of api response of the call.
+        """
+        results = []
+        invalidated = set()
+        for i in range(0, len(self.requests), self.max_requests):
+            chunk = self.requests[i : i + self.max_requests]
+            data = {
+                "action_on_failure": self.action_on_failure,
+                "execution_order": "NON_SEQUENTIAL",
+                "api_version": "3.0",
+                "api_request_list": [request["api_request"] for request in chunk],
+            }
+            resp = self._fetch_url(self.base_url, method="POST", data=data)
+            api_responses = resp.get("api_response_list", [])
+            for j, request in enumerate(chunk):
+                result = self._get_result(
+                    api_responses[j] if j < len(api_responses) else {}
+                )
+                results.append(result)
+                if result["status_code"] < 300:
+                    self._invalidate_cached_uuids(request, invalidated)
+        self.requests = []
+
+        failed = [r for r in results if r["status_code"] >= 300]
+        if failed and raise_error:
+            self.module.fail_json(
+                msg="{0} of {1} batch requests failed".format(
+                    len(failed), len(results)
+                ),
+                status_code=failed[0]["status_code"],
+                error=failed[0]["response"],
+                response=results,
+            )
+        return results
+
+    def _add(self, entity, method, data=None, uuid=None, endpoint=None):
+        path = urlparse(entity.base_url).path
+        if uuid:
+            path += "/{0}".format(uuid)
+        if endpoint:
+            path += "/{0}".format(endpoint)
+        api_request = {"operation": method, "path_and_params": path}
+        if data is not None:
+            api_request["body"] = data
+        self.requests.append(
+            {"entity": entity, "uuid": uuid, "api_request": api_request}
+        )
+        return len(self.requests) - 1
+
+    @staticmethod
+    def _get_result(api_response):
+        try:
+            status_code = int(api_response.get("status", -1))
+        except ValueError:
+            status_code = -1
+        response = api_response.get("api_response")
+        # api response is served as json string by some versions
+        if isinstance(response, string_types):
+            try:
+                response = json.loads(response)
+            except ValueError:
+                pass
+        task_uuid = None
+        if isinstance(response, dict) and isinstance(response.get("status"), dict):
+            task_uuid = response["status"].get("execution_context", {}).get("task_uuid")
+        return {
+            "status_code": status_code,
+            "response": response,
+            "task_uuid": task_uuid,
+        }
+
+    @staticmethod
+    def _invalidate_cached_uuids(request, invalidated):
+        # same as done by create, update and delete calls of entity
+        entity, uuid = request["entity"], request["uuid"]
+        key = (entity.base_url, uuid)
+        if key in invalidated:
+            return
+        invalidated.add(key)
+        entity.invalidate_cached_uuids(uuid=uuid)
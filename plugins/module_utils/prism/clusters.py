@@ -45,7 +45,13 @@ def get_cluster_uuid(config, module):
     if "name" in config:
         cluster = Cluster(module)
         name = config["name"]
+        uuid = cluster.get_cached_uuid(name)
+        if uuid:
+            return uuid, None
         clusters_name_uuid_map = cluster.get_all_clusters_name_uuid_map()
+        # all clusters are listed anyway, so cache all of them
+        for cluster_name, cluster_uuid in clusters_name_uuid_map.items():
+            cluster.cache_uuid(cluster_uuid, cluster_name)
         if clusters_name_uuid_map.get(name):
             return clusters_name_uuid_map.get(name), None
         else:
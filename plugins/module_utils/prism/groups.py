@@ -21,7 +21,11 @@ class Groups(Prism):
         raise_error=True,
         no_response=False,
     ):
-        if not data:
+        cacheable = not data
+        if cacheable:
+            uuid = self.get_cached_uuid(value, key=key, kind=entity_type)
+            if uuid:
+                return uuid
             data = {
                 "entity_type": entity_type,
                 "filter_criteria": "{0}=={1}".format(key, value),
@@ -31,7 +35,10 @@ class Groups(Prism):
             data, use_base_url=True, raise_error=raise_error, no_response=no_response
         )
         if resp.get("group_results"):
-            return resp["group_results"][0]["entity_results"][0]["entity_id"]
+            uuid = resp["group_results"][0]["entity_results"][0]["entity_id"]
+            if cacheable:
+                self.cache_uuid(uuid, value, key=key, kind=entity_type)
+            return uuid
         return None
 
 
@@ -2,16 +2,27 @@
 # GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
 from __future__ import absolute_import, division, print_function
 
+import os
+import time
 from copy import deepcopy
 
+from ..upload import MiB, cache_checksum, get_cached_checksum, get_upload_state
 from .clusters import Cluster
 from .prism import Prism
 from .spec.categories_mapping import CategoriesMapping
 
+try:
+    from urllib.parse import urlparse
+except ImportError:
+    from urlparse import urlparse  # python2
+
 __metaclass__ = type
 
 
 class Image(Prism):
+    # checksum algorithms of prism to hashlib names
+    hash_algorithms = {"SHA_1": "sha1", "SHA_256": "sha256"}
+
     def __init__(self, module, upload_image=False):
         additional_headers = None
         if upload_image:
@@ -29,11 +40,23 @@ class Image(Prism):
                 additional_headers["X-Nutanix-Checksum-Bytes"] = checksum[
                     "checksum_value"
                 ]
+            # digest cached by earlier upload of same file lets prism verify contents
+            elif module.params.get("compute_checksum") and module.params.get(
+                "source_path"
+            ):
+                algorithm = module.params["compute_checksum"]
+                digest = get_cached_checksum(
+                    module.params["source_path"], self.hash_algorithms[algorithm]
+                )
+                if digest:
+                    additional_headers["X-Nutanix-Checksum-Type"] = algorithm
+                    additional_headers["X-Nutanix-Checksum-Bytes"] = digest
 
         resource_type = "/images"
         super(Image, self).__init__(
             module, resource_type=resource_type, additional_headers=additional_headers
         )
+        self.upload_checksum = None
         self.build_spec_methods = {
             "name": self._build_spec_name,
             "desc": self._build_spec_desc,
@@ -46,15 +69,215 @@ class Image(Prism):
             "version": self._build_spec_version,
         }
 
+    # error status codes of servers not supporting ranged writes to image file
+    ranged_upload_unsupported = (400, 405, 411, 416, 501)
+
     def upload_image(self, image_uuid, source_path, timeout=600, raise_error=True):
-        endpoint = "{0}/file".format(image_uuid)
-        return self.upload(
-            source_path,
-            endpoint=endpoint,
-            method="PUT",
-            timeout=timeout,
-            no_response=True,
-            raise_error=raise_error,
+        """
+        Upload image contents. With 'upload_parts' > 1, byte ranges of file are
+        sent in parallel with Content-Range headers, falling back to whole file
+        if server rejects or ignores ranged writes. With 'resumable_upload',
+        acknowledged parts are recorded in upload state, so that a failed upload
+        continues with pending parts. With 'compute_checksum', whole file is
+        hashed while it is sent and digest is verified against checksum
+        reported by prism.
+        """
+        state = get_upload_state()
+        key = None
+        entry = {"parts": []}
+        if self.module.params.get("resumable_upload"):
+            key = self._get_upload_state_key(source_path)
+            entry = state.get(key, source_path)
+            if not entry or entry.get("image_uuid") != image_uuid:
+                state.remove(key)
+                entry = state.save(key, source_path, image_uuid=image_uuid)
+
+        # contents are hashed while they are sent, unless digest is cached
+        algorithm = self.module.params.get("compute_checksum")
+        hash_algorithm = self.hash_algorithms.get(algorithm)
+        cached_digest = None
+        if hash_algorithm:
+            cached_digest = get_cached_checksum(source_path, hash_algorithm)
+
+        resp = None
+        parts = self.module.params.get("upload_parts") or 1
+        # checksum headers are for whole file, which is also needed for hashing.
+        # Upload resumed with pending parts continues in parts, whatever their number
+        if (
+            (parts > 1 or entry["parts"])
+            and not hash_algorithm
+            and "X-Nutanix-Checksum-Type" not in self.headers
+        ):
+            resp = self._upload_parts(
+                image_uuid, source_path, parts, key, entry, timeout
+            )
+        if resp is None:
+            resp = self.upload(
+                source_path,
+                endpoint="{0}/file".format(image_uuid),
+                method="PUT",
+                timeout=timeout,
+                no_response=True,
+                raise_error=raise_error,
+                hash_algorithm=None if cached_digest else hash_algorithm,
+            )
+        if hash_algorithm and 200 <= resp.get("status_code", 0) < 300:
+            digest = cached_digest or self.upload_digest
+            # prism verifies contents sent along with checksum headers
+            sent = self.headers.get("X-Nutanix-Checksum-Bytes") or ""
+            resp = self._verify_checksum(
+                image_uuid, source_path, algorithm, digest, sent.lower() == digest
+            )
+        if 200 <= resp.get("status_code", 0) < 300:
+            if key:
+                state.remove(key)
+        elif raise_error:
+            self.module.fail_json(
+                msg="Failed uploading image contents",
+                status_code=resp.get("status_code"),
+                error=resp.get("error"),
+            )
+        return resp
+
+    def get_resumable_upload(self, source_path):
+        """
+        Returns uuid of image of unfinished upload of source_path, if any
+        """
+        entry = get_upload_state().get(
+            self._get_upload_state_key(source_path), source_path
+        )
+        return entry.get("image_uuid") if entry else None
+
+    def _upload_parts(self, image_uuid, source_path, parts, key, entry, timeout):
+        """
+        Upload byte ranges of file in parallel, recording acknowledged parts in
+        upload state under key, if any. Returns None if whole file is to be
+        uploaded instead, as server rejects or ignores ranged writes.
+        """
+        size = os.path.getsize(source_path)
+        part_size = entry.get("part_size")
+        if not part_size:
+            part_size = max(MiB, -(-size // parts))
+            part_size = -(-part_size // MiB) * MiB
+            entry["part_size"] = part_size
+            if key:
+                get_upload_state().save(key, source_path, part_size=part_size)
+        offsets = [o for o in range(0, size, part_size) if o not in entry["parts"]]
+        if not offsets:
+            return {"status_code": 200}
+
+        def upload_part(offset):
+            length = min(part_size, size - offset)
+            resp = self.upload(
+                source_path,
+                endpoint="{0}/file".format(image_uuid),
+                method="PUT",
+                timeout=timeout,
+                no_response=True,
+                raise_error=False,
+                offset=offset,
+                length=length,
+                headers={
+                    "Content-Range": "bytes {0}-{1}/{2}".format(
+                        offset, offset + length - 1, size
+                    )
+                },
+            )
+            # parts not reached server have negative status code
+            if key and 200 <= resp["status_code"] < 300:
+                get_upload_state().add_part(key, offset)
+            return resp
+
+        start = time.time()
+        # first part tells whether server supports ranged writes
+        first = upload_part(offsets[0])
+        if not 200 <= first["status_code"] < 300:
+            if not entry["parts"] and (
+                first["status_code"] in self.ranged_upload_unsupported
+            ):
+                return None
+            return first
+        if not entry["parts"] and not self._is_range_honored(image_uuid, size):
+            # part was taken as whole image, so it is overwritten by whole file
+            if key:
+                get_upload_state().save(key, source_path, parts=[], part_size=None)
+            return None
+        resps = self.run_concurrently(upload_part, offsets[1:], workers=max(parts, 1))
+        failed = [r for r in resps if not 200 <= r["status_code"] < 300]
+        self._set_parts_upload_stats(
+            start,
+            size,
+            [
+                min(part_size, size - offset)
+                for offset, resp in zip(offsets, [first] + resps)
+                if 200 <= resp["status_code"] < 300
+            ],
+            complete=not failed,
+        )
+        if failed:
+            return failed[0]
+        return first
+
+    def _is_range_honored(self, image_uuid, size):
+        """
+        Returns False if server ignored Content-Range of uploaded part and took
+        it as whole image, as told by image size not matching file size
+        """
+        image = self.read(image_uuid, raise_error=False) or {}
+        uploaded_size = image.get("status", {}).get("resources", {}).get("size_bytes")
+        return uploaded_size is None or uploaded_size == size
+
+    def _verify_checksum(self, image_uuid, source_path, algorithm, digest, verified):
+        """
+        Compare digest computed while uploading with checksum reported by prism
+        """
+        if not verified:
+            image = self.read(image_uuid, raise_error=False) or {}
+            resources = image.get("status", {}).get("resources", {})
+            checksum = resources.get("checksum") or {}
+            if checksum.get("checksum_algorithm") == algorithm:
+                verified = checksum.get("checksum_value", "").lower() == digest
+                if not verified:
+                    return {
+                        "status_code": 409,
+                        "error": "Checksum {0} of uploaded file does not match "
+                        "{1} reported for image".format(
+                            digest, checksum.get("checksum_value")
+                        ),
+                    }
+            else:
+                verified = None  # not reported by prism
+        cache_checksum(source_path, self.hash_algorithms[algorithm], digest)
+        self.upload_checksum = {
+            "checksum_algorithm": algorithm,
+            "checksum_value": digest,
+            "verified": verified,
+        }
+        return {"status_code": 200}
+
+    def _set_parts_upload_stats(self, start, size, part_lengths, complete):
+        # report of whole upload instead of its last part
+        duration = time.time() - start
+        bytes_sent = sum(part_lengths)
+        self.upload_stats = dict(
+            self.upload_stats or {},
+            bytes_sent=bytes_sent,
+            total_bytes=size,
+            duration=round(duration, 3),
+            throughput_mib_per_sec=(
+                round(bytes_sent / duration / MiB, 2) if duration > 0 else None
+            ),
+            eta_seconds=0 if complete else None,
+            parts=len(part_lengths),
+        )
+
+    def _get_upload_state_key(self, source_path):
+        return "|".join(
+            [
+                urlparse(self.base_url).netloc,
+                self.module.params.get("name") or "",
+                os.path.abspath(source_path),
+            ]
         )
 
     def _get_default_spec(self):
@@ -95,15 +318,16 @@ class Image(Prism):
         return payload, None
 
     def _build_spec_clusters(self, payload, clusters):
+        # resolve all cluster names together
+        names = [c["name"] for c in clusters if "name" in c]
+        name_uuid_map, missing = Cluster(self.module).get_uuids(names)
+        if missing:
+            return None, "Cluster {0} not found.".format(missing[0])
+
         cluster_references = []
         for cluster_ref in clusters:
             if "name" in cluster_ref:
-                cluster = Cluster(self.module)
-                name = cluster_ref["name"]
-                uuid = cluster.get_uuid(name)
-                if not uuid:
-                    error = "Cluster {0} not found.".format(name)
-                    return None, error
+                uuid = name_uuid_map[cluster_ref["name"]]
 
             elif "uuid" in cluster_ref:
                 uuid = cluster_ref["uuid"]
@@ -15,6 +15,9 @@ class Permission(Prism):
         super(Permission, self).__init__(module, resource_type=resource_type)
 
     def get_uuid(self, value, key="name", raise_error=True, no_response=False):
+        uuid = self.get_cached_uuid(value, key=key)
+        if uuid:
+            return uuid
         filter_spec = {
             "filter": "{0}=={1}".format(key, value),
             "length": self.entities_limitation,
@@ -26,6 +29,7 @@ class Permission(Prism):
         )
         for entity in resp["entities"]:
             if entity["spec"]["name"] == value:
+                self.cache_uuid(entity["metadata"]["uuid"], value, key=key)
                 return entity["metadata"]["uuid"]
 
         # Incase there are more entities to check
@@ -37,6 +41,7 @@ class Permission(Prism):
             )
             for entity in resp["entities"]:
                 if entity["spec"]["name"] == value:
+                    self.cache_uuid(entity["metadata"]["uuid"], value, key=key)
                     return entity["metadata"]["uuid"]
         return None
 
@@ -37,11 +37,20 @@ class Role(Prism):
         return payload, None
 
     def _build_spec_permissions(self, payload, permissions):
+        # resolve all permission names together
+        names = [p["name"] for p in permissions if "name" in p]
+        name_uuid_map, missing = Permission(self.module).get_uuids(names)
+        if missing:
+            return None, "Permission {0} not found.".format(missing[0])
+
         permission_ref_specs = []
         for permission in permissions:
-            uuid, err = get_permission_uuid(permission, self.module)
-            if err:
-                return None, err
+            if "name" in permission:
+                uuid = name_uuid_map[permission["name"]]
+            else:
+                uuid, err = get_permission_uuid(permission, self.module)
+                if err:
+                    return None, err
             permission_ref_specs.append(
                 Permission.build_permission_reference_spec(uuid)
             )
@@ -20,12 +20,16 @@ class ServiceGroup(Prism):
         }
 
     def get_uuid(self, value, key="name", raise_error=True, no_response=False):
+        uuid = self.get_cached_uuid(value, key=key)
+        if uuid:
+            return uuid
         data = {"filter": "{0}=={1}".format(key, value)}
         resp = self.list(data, raise_error=raise_error, no_response=no_response)
         entities = resp.get("entities") if resp else None
         if entities:
             for entity in entities:
                 if entity["service_group"]["name"] == value:
+                    self.cache_uuid(entity["uuid"], value, key=key)
                     return entity["uuid"]
         return None
 
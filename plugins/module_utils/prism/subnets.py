@@ -161,8 +161,11 @@ def get_subnet_uuid(config, module):
 
         # incase subnet of particular cluster is needed
         if config.get("cluster_uuid"):
+            # subnet names are unique per cluster
+            value = "{0}/{1}".format(config["cluster_uuid"], name)
+            uuid = subnet.get_cached_uuid(value, key="cluster_uuid/name")
             filter_spec = {"filter": "{0}=={1}".format("name", name)}
-            resp = subnet.list(data=filter_spec)
+            resp = subnet.list(data=filter_spec) if not uuid else None
             entities = resp.get("entities") if resp else None
             if entities:
                 for entity in entities:
@@ -171,6 +174,7 @@ def get_subnet_uuid(config, module):
                         == config["cluster_uuid"]
                     ):
                         uuid = entity["metadata"]["uuid"]
+                        subnet.cache_uuid(uuid, value, key="cluster_uuid/name")
                         break
         else:
             uuid = subnet.get_uuid(name)
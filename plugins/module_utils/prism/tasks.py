@@ -6,13 +6,23 @@ __metaclass__ = type
 
 import time
 
+from ..perf_trace import perf_tracer
 from .prism import Prism
 
 
 class Task(Prism):
+    # delay before first poll, its growth per poll and max delay between polls
+    min_poll_interval = 0.25
+    poll_backoff = 1.5
+    max_poll_interval = 15
+    # max task uuids OR-ed in one list filter
+    list_batch_size = 100
+
     def __init__(self, module):
         resource_type = "/tasks"
         super(Task, self).__init__(module, resource_type=resource_type)
+        # polls made by last wait_for_completion
+        self.polls = 0
 
     def create(self, data=None, endpoint=None, query=None, timeout=30):
         raise NotImplementedError("Create not permitted")
@@ -29,20 +39,142 @@ class Task(Prism):
     def get_uuid(self, name):
         raise NotImplementedError("get_uuid not permitted")
 
-    def wait_for_completion(self, uuid, raise_error=True):
-        state = ""
-        while state != "SUCCEEDED":
-            time.sleep(2)
+    def wait_for_completion(self, uuid, raise_error=True, timeout=None):
+        """
+        Poll task till it succeeds. Polls are frequent at first and back off towards
+        max_poll_interval, but are scheduled earlier if progress of task suggests
+        that it completes sooner. Wait fails once task fails or 'timeout' seconds
+        elapse, last response is returned instead if raise_error is False.
+        """
+        start = time.time()
+        deadline = start + timeout if timeout else None
+        delay = self.min_poll_interval
+        first_progress = None
+        self.polls = 0
+        while True:
+            if deadline is not None:
+                delay = max(0, min(delay, deadline - time.time()))
+            time.sleep(delay)
             response = self.read(uuid, raise_error=raise_error)
+            self.polls += 1
+            if not response:
+                break
             state = response.get("status")
-            if state == "FAILED":
+            if state == "SUCCEEDED":
+                break
+            if state in ("FAILED", "ABORTED"):
                 if not raise_error:
                     break
                 self.module.fail_json(
-                    msg=response["error_detail"],
+                    msg=response.get("error_detail"),
                     status_code=response.get("error_code"),
-                    error=response["error_detail"],
+                    error=response.get("error_detail"),
+                    response=response,
+                )
+
+            now = time.time()
+            if deadline is not None and now >= deadline:
+                if not raise_error:
+                    break
+                self.module.fail_json(
+                    msg="Timed out waiting for task {0} to complete".format(uuid),
+                    error="Task is still {0} after {1} seconds".format(state, timeout),
                     response=response,
                 )
 
+            delay = min(self.max_poll_interval, delay * self.poll_backoff)
+            percentage = response.get("percentage_complete")
+            if percentage is not None:
+                if first_progress is None:
+                    first_progress = (now, percentage)
+                remaining = self._estimate_remaining(first_progress, now, percentage)
+                if remaining is not None:
+                    # poll at half of the expected remaining time
+                    delay = max(self.min_poll_interval, min(delay, remaining / 2.0))
+
+        if self.module.params.get("perf_trace"):
+            perf_tracer.record_wait(uuid, self.polls, time.time() - start)
         return response
+
+    def wait_for_all(self, task_uuids, raise_error=True, timeout=None):
+        """
+        Wait for multiple tasks, polling all pending tasks with list calls filtered
+        on their uuids. Returns map of task uuid to its last response. Fails once all
+        tasks are complete if any of them failed, or after 'timeout' seconds.
+        """
+        start = time.time()
+        deadline = start + timeout if timeout else None
+        delay = self.min_poll_interval
+        pending = list(dict.fromkeys(task_uuids))
+        total = len(pending)
+        responses = {}
+        self.polls = 0
+        while pending:
+            if deadline is not None:
+                delay = max(0, min(delay, deadline - time.time()))
+            time.sleep(delay)
+            for task in self._list_tasks(pending):
+                responses[task["uuid"]] = task
+                if task.get("status") in ("SUCCEEDED", "FAILED", "ABORTED"):
+                    pending.remove(task["uuid"])
+            self.polls += 1
+            if pending and deadline is not None and time.time() >= deadline:
+                break
+            delay = min(self.max_poll_interval, delay * self.poll_backoff)
+
+        if self.module.params.get("perf_trace"):
+            perf_tracer.record_wait(
+                ",".join(task_uuids), self.polls, time.time() - start
+            )
+
+        failed = [r for r in responses.values() if r.get("status") != "SUCCEEDED"]
+        if raise_error and pending:
+            self.module.fail_json(
+                msg="Timed out waiting for {0} of {1} tasks to complete".format(
+                    len(pending), total
+                ),
+                error="Tasks {0} are not complete after {1} seconds".format(
+                    ", ".join(pending), timeout
+                ),
+                response=responses,
+            )
+        if raise_error and failed:
+            self.module.fail_json(
+                msg="{0} of {1} tasks failed".format(len(failed), total),
+                status_code=failed[0].get("error_code"),
+                error=failed[0].get("error_detail"),
+                response=responses,
+            )
+        return responses
+
+    def _list_tasks(self, uuids):
+        tasks = []
+        for i in range(0, len(uuids), self.list_batch_size):
+            batch = uuids[i : i + self.list_batch_size]
+            spec = {
+                "kind": "task",
+                "filter": ",".join("uuid=={0}".format(uuid) for uuid in batch),
+                "length": len(batch),
+            }
+            resp = super(Task, self).list(data=spec)
+            found = [t for t in resp.get("entities", []) if t.get("uuid") in batch]
+            tasks.extend(found)
+            # read tasks missed by list individually
+            listed = set(t["uuid"] for t in found)
+            for uuid in batch:
+                if uuid not in listed:
+                    task = self.read(uuid)
+                    task.setdefault("uuid", uuid)
+                    tasks.append(task)
+        return tasks
+
+    @staticmethod
+    def _estimate_remaining(first_progress, now, percentage):
+        """
+        Estimate seconds for task to complete from rate of its progress
+        """
+        start, start_percentage = first_progress
+        if now <= start or percentage <= start_percentage:
+            return None
+        rate = (percentage - start_percentage) / float(now - start)
+        return (100 - percentage) / rate
@@ -12,11 +12,11 @@ from ansible.module_utils.basic import _load_params
 
 from .clusters import Cluster, get_cluster_uuid
 from .groups import get_entity_uuid
-from .images import get_image_uuid
+from .images import Image, get_image_uuid
 from .prism import Prism
 from .projects import Project
 from .spec.categories_mapping import CategoriesMapping
-from .subnets import get_subnet_uuid
+from .subnets import Subnet, get_subnet_uuid
 from .users import User
 
 
@@ -29,6 +29,8 @@ class VM(Prism):
         else:
             self.params_without_defaults = self.module.params
         self.require_vm_restart = False
+        # uuids of image names used by disks, resolved together for all disks
+        self.image_name_uuid_map = {}
         self.build_spec_methods = {
             "name": self._build_spec_name,
             "desc": self._build_spec_desc,
@@ -71,10 +73,28 @@ class VM(Prism):
                 total_length -= max_length
                 if total_length <= 0:
                     break
+                spec["offset"] += max_length
+
+                # fetch remaining slices concurrently as total matches are known now
+                if self.list_concurrency > 1 and total_matches is not None:
+                    end = min(spec["offset"] + total_length, total_matches)
+                    specs = []
+                    for offset in range(spec["offset"], end, max_length):
+                        slice_spec = deepcopy(spec)
+                        slice_spec["offset"] = offset
+                        slice_spec["length"] = min(max_length, end - offset)
+                        specs.append(slice_spec)
+                    sub_resps = self.run_concurrently(self._list_slice, specs)
+                    for slice_spec, sub_resp in zip(specs, sub_resps):
+                        # report errors of failed slices from main thread
+                        if not sub_resp or "entities" not in sub_resp:
+                            sub_resp = super(VM, self).list(slice_spec)
+                        resp["entities"].extend(sub_resp["entities"])
+                    break
+
                 spec["length"] = (
                     total_length if total_length < max_length else max_length
                 )
-                spec["offset"] += max_length
 
             resp["metadata"] = data
             resp["metadata"]["total_matches"] = total_matches
@@ -83,6 +103,12 @@ class VM(Prism):
             resp = super(VM, self).list(data)
         return resp
 
+    def list_entities(self, data=None, page_length=500, **kwargs):
+        return super(VM, self).list_entities(data, page_length=page_length, **kwargs)
+
+    def _list_slice(self, spec):
+        return super(VM, self).list(spec, raise_error=False)
+
     @staticmethod
     def is_on(payload):
         return True if payload["spec"]["resources"]["power_state"] == "ON" else False
@@ -273,6 +299,18 @@ class VM(Prism):
     def _build_spec_networks(self, payload, networks):
         cluster_name_uuid_map = {}
 
+        # resolve names of subnets, which are not filtered by cluster, together
+        subnet_names = [
+            network["subnet"]["name"]
+            for network in networks
+            if (network.get("subnet") or {}).get("name")
+            and not network["subnet"].get("uuid")
+            and not network["subnet"].get("cluster")
+        ]
+        subnet_name_uuid_map = {}
+        if subnet_names:
+            subnet_name_uuid_map, _ = Subnet(self.module).get_uuids(subnet_names)
+
         nics = []
         for network in networks:
             if network.get("uuid"):
@@ -328,9 +366,12 @@ class VM(Prism):
                                 )
                         config["cluster_uuid"] = cluster_uuid
 
-                    uuid, err = get_subnet_uuid(config, self.module)
-                    if err:
-                        return None, err
+                    if not cluster_uuid and config["name"] in subnet_name_uuid_map:
+                        uuid = subnet_name_uuid_map[config["name"]]
+                    else:
+                        uuid, err = get_subnet_uuid(config, self.module)
+                        if err:
+                            return None, err
 
                 nic["subnet_reference"]["uuid"] = uuid
 
@@ -351,6 +392,15 @@ class VM(Prism):
             )
         )
 
+        # resolve names of images to clone disks from together
+        image_names = [
+            vdisk["clone_image"]["name"]
+            for vdisk in vdisks
+            if (vdisk.get("clone_image") or {}).get("name")
+        ]
+        if image_names:
+            self.image_name_uuid_map, _ = Image(self.module).get_uuids(image_names)
+
         for vdisk in vdisks:
 
             if vdisk.get("uuid"):
@@ -493,7 +543,7 @@ class VM(Prism):
                     )
 
             elif vdisk.get("clone_image"):
-                uuid, error = get_image_uuid(vdisk["clone_image"], self.module)
+                uuid, error = self._get_image_uuid(vdisk["clone_image"])
                 if error:
                     return None, error
 
@@ -510,6 +560,11 @@ class VM(Prism):
             disk.pop("data_source_reference", None)
         return disk
 
+    def _get_image_uuid(self, config):
+        if config.get("name") in self.image_name_uuid_map:
+            return self.image_name_uuid_map[config["name"]], None
+        return get_image_uuid(config, self.module)
+
     def _add_disk(self, vdisk, device_indexes, existing_devise_indexes):
         disk = self._get_default_disk_spec()
 
@@ -0,0 +1,100 @@
+# This file is part of Ansible
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import hashlib
+import os
+import time
+import uuid
+
+from ..module_utils.state_file import StateFile, get_state_path
+
+
+class RateLimiter(object):
+    """
+    Token bucket rate limiter with a cap on concurrent in-flight requests.
+    Bucket state is kept in a locked state file per API endpoint, in a
+    directory of the user, so that limits are shared by all module processes
+    (ansible forks) of the user on this host.
+    """
+
+    # idle wait when all in-flight slots are taken
+    poll_interval = 0.05
+
+    def __init__(self, endpoint, rate=None, max_in_flight=None, state_dir=None):
+        self.rate = rate
+        self.burst = max(1.0, rate or 0)
+        self.max_in_flight = max_in_flight
+        name = hashlib.sha1(endpoint.encode("utf-8")).hexdigest()
+        filename = "{0}.json".format(name)
+        if state_dir:
+            self.state_file = os.path.join(state_dir, filename)
+        else:
+            self.state_file = get_state_path("rate_limits", filename)
+        self._local_state = {}
+
+    def acquire(self, timeout=30):
+        """
+        Wait for a token and a free in-flight slot. Returns slot id which
+        should be released once request is served. In-flight slots of
+        crashed processes expire after 'timeout' seconds.
+        """
+        slot = uuid.uuid4().hex
+        while True:
+            with StateFile(self.state_file, self._local_state) as state:
+                now = time.time()
+                self._refill(state, now)
+                in_flight = dict(
+                    (k, v) for k, v in state.get("in_flight", {}).items() if v > now
+                )
+                state["in_flight"] = in_flight
+                wait = 0
+                if self.rate and state["tokens"] < 1:
+                    wait = (1 - state["tokens"]) / self.rate
+                elif self.max_in_flight and len(in_flight) >= self.max_in_flight:
+                    wait = self.poll_interval
+                else:
+                    if self.rate:
+                        state["tokens"] -= 1
+                    if self.max_in_flight:
+                        in_flight[slot] = now + timeout
+                    return slot
+            time.sleep(wait)
+
+    def release(self, slot):
+        if not self.max_in_flight:
+            return
+        with StateFile(self.state_file, self._local_state) as state:
+            state.get("in_flight", {}).pop(slot, None)
+
+    def _refill(self, state, now):
+        tokens = state.get("tokens", self.burst)
+        updated = state.get("updated", now)
+        if self.rate:
+            tokens = min(self.burst, tokens + (now - updated) * self.rate)
+        state["tokens"] = tokens
+        state["updated"] = now
+
+
+# rate limiters per API endpoint for the module run
+rate_limiters = {}
+
+
+def get_rate_limiter(module):
+    """
+    Returns rate limiter for nutanix_host of module, None if
+    neither rate_limit nor max_concurrent_requests is set
+    """
+    rate = module.params.get("rate_limit")
+    max_in_flight = module.params.get("max_concurrent_requests")
+    if not rate and not max_in_flight:
+        return None
+    endpoint = "{0}:{1}".format(
+        module.params.get("nutanix_host"), module.params.get("nutanix_port")
+    )
+    key = (endpoint, rate, max_in_flight)
+    if key not in rate_limiters:
+        rate_limiters[key] = RateLimiter(endpoint, rate, max_in_flight)
+    return rate_limiters[key]
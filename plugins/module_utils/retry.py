@@ -0,0 +1,92 @@
+# This file is part of Ansible
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import random
+import threading
+import time
+from email.utils import mktime_tz, parsedate_tz
+
+from ansible.module_utils.six.moves.urllib.parse import urlparse
+
+# retries done in a module run, shared by all entities
+retry_stats = {"retries": 0, "statuses": {}, "budget_exhausted": False}
+_retry_stats_lock = threading.Lock()
+
+
+class RetryPolicy(object):
+    """
+    Decides if failed request can be retried and after how long.
+    Only idempotent requests (GET and list POST calls by default) failed with
+    throttling, gateway or connection errors are retried, with exponential
+    backoff and full jitter or as per Retry-After header sent by server.
+    Total retries of a module run are limited by 'budget'.
+    """
+
+    # status -1 is used for connection failures
+    retry_statuses = (-1, 429, 502, 503, 504)
+    retry_methods = ("GET", "HEAD", "OPTIONS")
+    # POST calls to these endpoints only read data
+    retry_post_endpoints = ("/list", "/groups")
+    max_retries = 3
+    backoff_base = 1
+    backoff_max = 30
+    budget = 50
+
+    def __init__(self, max_retries=None):
+        if max_retries is not None:
+            self.max_retries = max_retries
+
+    def is_retryable(self, method, url):
+        if method in self.retry_methods:
+            return True
+        if method == "POST":
+            return urlparse(url).path.rstrip("/").endswith(self.retry_post_endpoints)
+        return False
+
+    def get_delay(self, method, url, attempt, info):
+        """
+        Returns seconds to wait before retrying request, None if request
+        should not be retried.
+        """
+        status = info.get("status")
+        if (
+            status not in self.retry_statuses
+            or attempt >= self.max_retries
+            or not self.is_retryable(method, url)
+        ):
+            return None
+
+        with _retry_stats_lock:
+            if retry_stats["retries"] >= self.budget:
+                retry_stats["budget_exhausted"] = True
+                return None
+            retry_stats["retries"] += 1
+            status_key = str(status)
+            retry_stats["statuses"][status_key] = (
+                retry_stats["statuses"].get(status_key, 0) + 1
+            )
+
+        retry_after = self.parse_retry_after(info.get("retry-after"))
+        if retry_after is not None:
+            return min(retry_after, self.backoff_max)
+        return random.uniform(
+            0, min(self.backoff_max, self.backoff_base * 2**attempt)
+        )
+
+    @staticmethod
+    def parse_retry_after(value):
+        """
+        Retry-After is either delay in seconds or a HTTP date
+        """
+        if not value:
+            return None
+        value = str(value).strip()
+        if value.isdigit():
+            return int(value)
+        date = parsedate_tz(value)
+        if not date:
+            return None
+        return max(0, mktime_tz(date) - time.time())
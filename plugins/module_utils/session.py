@@ -0,0 +1,134 @@
+# This file is part of Ansible
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import hashlib
+import os
+import threading
+import time
+
+from ansible.module_utils.six.moves.http_cookiejar import LoadError, LWPCookieJar
+
+from ..module_utils.state_file import get_state_path
+
+
+class Session(object):
+    """
+    Session cookies captured from authenticated responses, which are sent
+    instead of basic auth credentials while session is alive. Cookies can
+    optionally be cached on disk, to reuse session across module runs.
+    """
+
+    # sessions idle for longer are considered expired
+    ttl = 15 * 60
+    # minimum interval between refreshing expiry of cached session
+    touch_interval = 60
+
+    def __init__(self, cache_file=None):
+        self.cache_file = cache_file
+        self.jar = LWPCookieJar(cache_file)
+        self.expires_at = 0
+        self._snapshot = ()
+        self._touched_at = 0
+        self._lock = threading.Lock()
+        if cache_file:
+            self._load()
+
+    def is_active(self):
+        if not len(self.jar):
+            return False
+        if time.time() > self.expires_at:
+            self.invalidate()
+            return False
+        return True
+
+    def refresh(self):
+        """
+        Capture cookies set by last response and extend session expiry
+        """
+        with self._lock:
+            now = time.time()
+            snapshot = self._get_snapshot()
+            if snapshot != self._snapshot:
+                self._snapshot = snapshot
+                self.expires_at = now + self.ttl
+                self._save()
+            elif snapshot:
+                self.expires_at = now + self.ttl
+                if self.cache_file and now - self._touched_at > self.touch_interval:
+                    self._touch(now)
+
+    def invalidate(self):
+        with self._lock:
+            self.jar.clear()
+            self._snapshot = ()
+            self.expires_at = 0
+            if self.cache_file and os.path.exists(self.cache_file):
+                os.remove(self.cache_file)
+
+    def _get_snapshot(self):
+        return tuple(sorted((c.domain, c.name, c.value) for c in self.jar))
+
+    def _load(self):
+        try:
+            mtime = os.path.getmtime(self.cache_file)
+            self.jar.load(ignore_discard=True, ignore_expires=False)
+        except (OSError, IOError, LoadError):
+            return
+        self._snapshot = self._get_snapshot()
+        self.expires_at = mtime + self.ttl
+        self._touched_at = mtime
+
+    def _save(self):
+        if not self.cache_file:
+            return
+        try:
+            # file is created with owner only permissions, symlinks are not
+            # followed so that cookies can't be written elsewhere
+            fd = os.open(
+                self.cache_file,
+                os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_NOFOLLOW", 0),
+                0o600,
+            )
+            with os.fdopen(fd, "w") as f:
+                # same format as of LWPCookieJar.save()
+                f.write("#LWP-Cookies-2.0\n")
+                f.write(self.jar.as_lwp_str(ignore_discard=True, ignore_expires=False))
+        except (OSError, IOError):
+            return
+        self._touched_at = time.time()
+
+    def _touch(self, now):
+        try:
+            os.utime(self.cache_file, (now, now))
+        except OSError:
+            return
+        self._touched_at = now
+
+
+# sessions per host and user for the module run
+sessions = {}
+
+
+def get_session(module):
+    """
+    Returns session of host and user of module, None if credentials are not given
+    """
+    params = module.params
+    if not params.get("nutanix_username") or not params.get("nutanix_password"):
+        return None
+    # password is not part of key, as cache file is named by its hash
+    key = "{0}:{1}:{2}".format(
+        params.get("nutanix_host"),
+        params.get("nutanix_port"),
+        params.get("nutanix_username"),
+    )
+    cache_file = None
+    if params.get("session_cache"):
+        name = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        cache_file = get_state_path("sessions", name)
+    if (key, cache_file) not in sessions:
+        sessions[(key, cache_file)] = Session(cache_file)
+    return sessions[(key, cache_file)]
@@ -0,0 +1,80 @@
+# This file is part of Ansible
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import json
+import os
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None  # state can't be shared across processes, it is kept in memory
+
+
+def get_state_path(*names):
+    """
+    Returns path of state file in directory of the user for this collection,
+    creating its parent directory if missing
+    """
+    path = os.path.join(os.path.expanduser("~"), ".ansible", "nutanix", *names)
+    directory = os.path.dirname(path)
+    if not os.path.isdir(directory):
+        try:
+            os.makedirs(directory, 0o700)
+        except OSError:
+            pass  # state file falls back to in-memory state
+    return path
+
+
+class StateFile(object):
+    """
+    Exclusively locked json state, which is written back on exit.
+    Falls back to given in-memory state where file locks are not supported.
+    """
+
+    def __init__(self, path, local_state):
+        self.path = path
+        self.local_state = local_state
+        self._fd = None
+
+    def __enter__(self):
+        if fcntl is None:
+            return self.local_state
+        try:
+            # symlinks are not followed, so writes can't be redirected
+            self._fd = os.open(
+                self.path,
+                os.O_RDWR | os.O_CREAT | getattr(os, "O_NOFOLLOW", 0),
+                0o600,
+            )
+        except OSError:
+            # state file is not accessible e.g. owned by other user or a symlink
+            return self.local_state
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        data = b""
+        while True:
+            chunk = os.read(self._fd, 65536)
+            if not chunk:
+                break
+            data += chunk
+        try:
+            self.state = json.loads(data.decode("utf-8")) if data else {}
+        except ValueError:
+            self.state = {}
+        return self.state
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self._fd is None:
+            return
+        try:
+            if exc_type is None:
+                data = json.dumps(self.state).encode("utf-8")
+                os.lseek(self._fd, 0, os.SEEK_SET)
+                os.ftruncate(self._fd, 0)
+                os.write(self._fd, data)
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+            self._fd = None
@@ -0,0 +1,397 @@
+# This file is part of Ansible
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import hashlib
+import mmap
+import os
+import ssl
+import threading
+import time
+
+from ..module_utils.state_file import StateFile, get_state_path
+
+MiB = 1 << 20
+
+
+class FileUpload(object):
+    """
+    File, or 'length' bytes of it from 'offset', as body of upload request.
+    It is read in large chunks when served through read(), or sent straight
+    to socket by send_to(), using sendfile for plain sockets and slices of
+    memory mapped file for TLS sockets, so file contents are not copied
+    through python objects. If 'hash_algorithm' is given, digest of contents
+    is computed while they are sent, from the same chunks. With 'reader',
+    chunks are taken from a SharedFileReader, which reads file once for
+    uploads of it to several targets.
+    """
+
+    default_chunk_size = 8 * MiB
+    # seconds between progress reports
+    progress_interval = 30
+
+    def __init__(
+        self,
+        filename,
+        chunk_size=None,
+        on_progress=None,
+        offset=0,
+        length=None,
+        hash_algorithm=None,
+        reader=None,
+    ):
+        self.filename = filename
+        self.reader = reader
+        if reader:
+            chunk_size = reader.chunk_size
+        self.chunk_size = chunk_size or self.default_chunk_size
+        self.on_progress = on_progress
+        self.offset = offset
+        if length is None:
+            length = os.path.getsize(filename) - offset
+        self.length = length
+        self.hash = hashlib.new(hash_algorithm) if hash_algorithm else None
+        self.bytes_sent = 0
+        self.zero_copy = False
+        self._file = None
+        self._start = None
+        self._last_progress = None
+
+    # http clients check for read func in body object
+    def read(self, size=None):
+        if self.reader:
+            self._started()
+            data = self.reader.read()
+            if data:
+                self._sent(len(data))
+            return data
+        if self._file is None:
+            self._file = open(self.filename, "rb")
+            self._file.seek(self.offset)
+            self._started()
+        # http clients ask for small blocks, larger chunks save calls per byte
+        data = self._file.read(min(self.chunk_size, self.length - self.bytes_sent))
+        if data:
+            if self.hash:
+                self.hash.update(data)
+            self._sent(len(data))
+        else:
+            self.close()
+        return data
+
+    def send_to(self, sock):
+        """
+        Send whole file to connected socket
+        """
+        self._started()
+        if self.reader:
+            data = self.reader.read()
+            while data:
+                sock.sendall(data)
+                self._sent(len(data))
+                data = self.reader.read()
+            return
+        with open(self.filename, "rb") as f:
+            # contents need to pass through user space to be hashed
+            sendfile = hasattr(os, "sendfile") and not self.hash
+            if sendfile and not isinstance(sock, ssl.SSLSocket):
+                self.zero_copy = True
+                while self.bytes_sent < self.length:
+                    count = min(self.chunk_size, self.length - self.bytes_sent)
+                    sent = sock.sendfile(f, self.offset + self.bytes_sent, count)
+                    if not sent:
+                        break
+                    self._sent(sent)
+            elif self.length:
+                # TLS and hashing need data in user space, avoid other copies
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                try:
+                    view = memoryview(mapped)
+                    try:
+                        while self.bytes_sent < self.length:
+                            start = self.offset + self.bytes_sent
+                            count = min(self.chunk_size, self.length - self.bytes_sent)
+                            with view[start : start + count] as chunk:
+                                if self.hash:
+                                    self.hash.update(chunk)
+                                sock.sendall(chunk)
+                            self._sent(count)
+                    finally:
+                        view.release()
+                finally:
+                    mapped.close()
+
+    def hexdigest(self):
+        """
+        Returns digest of contents, if all of them are sent
+        """
+        if self.bytes_sent < self.length:
+            return None
+        if self.reader:
+            return self.reader.hexdigest()
+        return self.hash.hexdigest() if self.hash else None
+
+    def close(self):
+        if self.reader:
+            self.reader.close()
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def report(self):
+        """
+        Returns bytes sent, throughput and estimated seconds to complete upload
+        """
+        duration = time.time() - self._start if self._start else 0
+        throughput = self.bytes_sent / duration if duration > 0 else None
+        eta = None
+        if self.bytes_sent >= self.length:
+            eta = 0
+        elif throughput:
+            eta = round((self.length - self.bytes_sent) / throughput, 1)
+        return {
+            "bytes_sent": self.bytes_sent,
+            "total_bytes": self.length,
+            "duration": round(duration, 3),
+            "throughput_mib_per_sec": (
+                round(throughput / MiB, 2) if throughput is not None else None
+            ),
+            "eta_seconds": eta,
+            "chunk_size": self.chunk_size,
+            "zero_copy": self.zero_copy,
+        }
+
+    def __len__(self):
+        return self.length
+
+    def _started(self):
+        if self._start is None:
+            self._start = self._last_progress = time.time()
+
+    def _sent(self, count):
+        self.bytes_sent += count
+        if not self.on_progress:
+            return
+        now = time.time()
+        if now - self._last_progress >= self.progress_interval:
+            self._last_progress = now
+            self.on_progress(self.report())
+
+
+class SharedFileReader(object):
+    """
+    Reads file once in chunks for concurrent uploads of it to several targets.
+    Each consumer returned by consumer() gets all chunks in order, a chunk is
+    dropped once every consumer has taken it. Consumers ahead by 'window'
+    chunks of the slowest one wait, which bounds memory to window chunks.
+    All consumers need to be created before any of them reads, and closed
+    when their upload finishes or fails, so that others are not held back.
+    """
+
+    window = 4
+
+    def __init__(self, filename, chunk_size=None, hash_algorithm=None):
+        self.filename = filename
+        self.chunk_size = chunk_size or FileUpload.default_chunk_size
+        self.hash = hashlib.new(hash_algorithm) if hash_algorithm else None
+        self.bytes_read = 0
+        self.size = os.path.getsize(filename)
+        self._file = open(filename, "rb")
+        self._condition = threading.Condition()
+        # chunk index to its data and next chunk index of each open consumer
+        self._chunks = {}
+        self._positions = {}
+        self._next_chunk = 0
+
+    def consumer(self):
+        consumer = _SharedFileConsumer(self)
+        with self._condition:
+            self._positions[consumer] = 0
+        return consumer
+
+    def hexdigest(self):
+        """
+        Returns digest of contents, if whole file is read
+        """
+        if not self.hash or self.bytes_read < self.size:
+            return None
+        return self.hash.hexdigest()
+
+    def _read(self, consumer):
+        with self._condition:
+            index = self._positions[consumer]
+            while index >= self._next_chunk and index - self._lowest() >= self.window:
+                self._condition.wait()
+            while self._next_chunk <= index:
+                data = self._file.read(self.chunk_size)
+                if self.hash:
+                    self.hash.update(data)
+                self.bytes_read += len(data)
+                self._chunks[self._next_chunk] = data
+                self._next_chunk += 1
+            data = self._chunks[index]
+            if data:
+                self._positions[consumer] = index + 1
+            self._prune()
+            return data
+
+    def _close(self, consumer):
+        with self._condition:
+            self._positions.pop(consumer, None)
+            self._prune()
+            if not self._positions and self._file:
+                self._file.close()
+                self._file = None
+
+    def _lowest(self):
+        if not self._positions:
+            return self._next_chunk
+        return min(self._positions.values())
+
+    def _prune(self):
+        lowest = self._lowest()
+        for index in [i for i in self._chunks if i < lowest]:
+            self._chunks.pop(index)
+        self._condition.notify_all()
+
+
+class _SharedFileConsumer(object):
+    def __init__(self, reader):
+        self.chunk_size = reader.chunk_size
+        self._reader = reader
+
+    def read(self):
+        return self._reader._read(self)
+
+    def hexdigest(self):
+        return self._reader.hexdigest()
+
+    def close(self):
+        self._reader._close(self)
+
+
+def get_checksum_sidecar(source, hash_algorithm):
+    return "{0}.{1}".format(source, hash_algorithm)
+
+
+def get_cached_checksum(source, hash_algorithm):
+    """
+    Returns digest of source from its sidecar file e.g. image.iso.sha256,
+    if sidecar is not older than source
+    """
+    sidecar = get_checksum_sidecar(source, hash_algorithm)
+    try:
+        if os.path.getmtime(sidecar) < os.path.getmtime(source):
+            return None
+        with open(sidecar) as f:
+            # same format as of sha256sum
+            digest = f.read().split()[0].lower()
+    except (OSError, IOError, IndexError):
+        return None
+    if len(digest) != hashlib.new(hash_algorithm).digest_size * 2:
+        return None
+    return digest
+
+
+def compute_checksum(source, hash_algorithm):
+    """
+    Returns digest of source, from its sidecar file if it is up to date or
+    else by reading whole file, which is cached in sidecar for later runs
+    """
+    digest = get_cached_checksum(source, hash_algorithm)
+    if digest:
+        return digest
+    upload = FileUpload(source, hash_algorithm=hash_algorithm)
+    try:
+        while upload.read():
+            pass
+    finally:
+        upload.close()
+    digest = upload.hexdigest()
+    cache_checksum(source, hash_algorithm, digest)
+    return digest
+
+
+def cache_checksum(source, hash_algorithm, digest):
+    sidecar = get_checksum_sidecar(source, hash_algorithm)
+    try:
+        with open(sidecar, "w") as f:
+            f.write("{0}  {1}\n".format(digest, os.path.basename(source)))
+    except (OSError, IOError):
+        pass  # e.g. directory of source is read only
+
+
+class UploadState(object):
+    """
+    Progress of uploads kept in a locked state file across module runs, so
+    that failed uploads can continue to the same target. Entries are valid
+    only while source file is unchanged and expire after 'ttl' seconds.
+    """
+
+    ttl = 7 * 24 * 60 * 60
+
+    def __init__(self, path):
+        self.path = path
+        self._local_state = {}
+        # parts of an upload are acknowledged from multiple threads
+        self._lock = threading.Lock()
+
+    def get(self, key, source=None):
+        """
+        Returns entry of key, if it is not expired and was saved for source
+        unchanged since, when source is given
+        """
+        with self._lock, StateFile(self.path, self._local_state) as state:
+            entry = state.get(key)
+        if not entry or entry["expires"] < time.time():
+            return None
+        if source and entry["source"] != self._get_source_id(source):
+            return None
+        return entry
+
+    def save(self, key, source, **values):
+        with self._lock, StateFile(self.path, self._local_state) as state:
+            self._prune(state)
+            entry = state.get(key) or {"parts": []}
+            entry.update(values)
+            entry["source"] = self._get_source_id(source)
+            entry["expires"] = time.time() + self.ttl
+            state[key] = entry
+        return entry
+
+    def add_part(self, key, offset):
+        """
+        Mark part of upload starting at offset as acknowledged by server
+        """
+        with self._lock, StateFile(self.path, self._local_state) as state:
+            entry = state.get(key)
+            if entry is not None and offset not in entry["parts"]:
+                entry["parts"].append(offset)
+
+    def remove(self, key):
+        with self._lock, StateFile(self.path, self._local_state) as state:
+            state.pop(key, None)
+
+    @staticmethod
+    def _get_source_id(source):
+        stat = os.stat(source)
+        return [os.path.abspath(source), stat.st_size, stat.st_mtime]
+
+    @staticmethod
+    def _prune(state):
+        now = time.time()
+        for key in [k for k, v in state.items() if v["expires"] < now]:
+            state.pop(key)
+
+
+# upload states per state file for the module run
+upload_states = {}
+
+
+def get_upload_state():
+    path = get_state_path("uploads.json")
+    if path not in upload_states:
+        upload_states[path] = UploadState(path)
+    return upload_states[path]
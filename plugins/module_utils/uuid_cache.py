@@ -0,0 +1,75 @@
+# This file is part of Ansible
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import time
+
+from ..module_utils.state_file import StateFile, get_state_path
+
+
+class UUIDCache(object):
+    """
+    Name to uuid resolutions keyed by host, kind, key and value, kept in
+    a locked state file shared by module processes and module runs.
+    Resolutions expire after 'ttl' seconds.
+    """
+
+    ttl = 300
+
+    def __init__(self, path):
+        self.path = path
+        self._local_state = {}
+
+    @staticmethod
+    def get_key(host, kind, key, value):
+        return "|".join([host, kind, key, str(value)])
+
+    def get(self, host, kind, key, value):
+        with StateFile(self.path, self._local_state) as state:
+            entry = state.get(self.get_key(host, kind, key, value))
+        if entry and entry["expires"] > time.time():
+            return entry["uuid"]
+        return None
+
+    def set(self, host, kind, key, value, uuid):
+        with StateFile(self.path, self._local_state) as state:
+            self._prune(state)
+            state[self.get_key(host, kind, key, value)] = {
+                "uuid": uuid,
+                "expires": time.time() + self.ttl,
+            }
+
+    def invalidate(self, host, kind=None, uuid=None):
+        """
+        Remove resolutions of given kind and/or to given uuid on host
+        """
+        with StateFile(self.path, self._local_state) as state:
+            for cache_key in list(state):
+                cache_host, cache_kind = cache_key.split("|", 2)[:2]
+                if cache_host != host:
+                    continue
+                if kind and cache_kind != kind:
+                    continue
+                if uuid and state[cache_key]["uuid"] != uuid:
+                    continue
+                del state[cache_key]
+
+    @staticmethod
+    def _prune(state):
+        now = time.time()
+        for cache_key in list(state):
+            if state[cache_key]["expires"] <= now:
+                del state[cache_key]
+
+
+# resolution caches per cache file for the module run
+uuid_caches = {}
+
+
+def get_uuid_cache():
+    path = get_state_path("uuid_cache.json")
+    if path not in uuid_caches:
+        uuid_caches[path] = UUIDCache(path)
+    return uuid_caches[path]
@@ -155,6 +155,7 @@ category_values:
 
 from ..module_utils import utils  # noqa: E402
 from ..module_utils.base_module import BaseModule  # noqa: E402
+from ..module_utils.prism.batch import Batch  # noqa: E402
 from ..module_utils.prism.categories import CategoryKey, CategoryValue  # noqa: E402
 
 
@@ -231,19 +232,24 @@ def create_categories(module, result):
         result["response"]["category_key"] = resp
     result["changed"] = True
 
-    # add category values
+    # add category values together using batch api
     if category_values_specs:
-        responses = []
+        batch = Batch(module)
         for value_spec in category_values_specs:
-            resp = _category_value.create(name, value_spec)
-            responses.append(resp)
+            endpoint = "{0}/{1}".format(name, value_spec["value"])
+            batch.add_create(
+                _category_value, data=value_spec, endpoint=endpoint, method="PUT"
+            )
+        responses = [r["response"] for r in batch.execute()]
         result["response"]["category_values"] = responses
 
 
 def delete_category_values(module, name, values):
     _category_value = CategoryValue(module)
+    batch = Batch(module)
     for value in values:
-        _category_value.delete(name, value)
+        batch.add_delete(_category_value, endpoint="{0}/{1}".format(name, value))
+    batch.execute()
 
 
 def delete_categories(module, result):
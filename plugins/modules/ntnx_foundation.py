@@ -924,6 +924,23 @@ options:
             - install script
         type: str
         required: false
+    progress_log:
+        description:
+            - Path of local file to append progress snapshots of imaging session to, while waiting for it
+            - Each line is a JSON object with progress and status of nodes & clusters, along with their new messages
+        type: path
+        required: false
+    stall_timeout:
+        description:
+            - Fail once a node being imaged makes no progress for given seconds, while it lags behind other nodes
+        type: int
+        required: false
+    fail_fast:
+        description:
+            - Fail as soon as imaging of any node fails, instead of waiting for imaging session to stop
+        type: bool
+        required: false
+        default: false
 extends_documentation_fragment:
       - nutanix.ncp.ntnx_foundation_base_module
       - nutanix.ncp.ntnx_operations
@@ -1212,6 +1229,9 @@ def get_module_spec():
         unc_password=dict(type="str", required=False, no_log=True),
         svm_rescue_args=dict(type="list", elements="str", required=False),
         install_script=dict(type="str", required=False),
+        progress_log=dict(type="path", required=False),
+        stall_timeout=dict(type="int", required=False),
+        fail_fast=dict(type="bool", required=False, default=False),
         #    timeout=dict(type="int", required=False, default=3600),
     )
 
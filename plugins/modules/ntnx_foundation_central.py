@@ -483,13 +483,28 @@ respone:
         "updated_timestamp": "2022-04-26T03:36:02.000-07:00",
         "workflow_type": "FOUNDATION_WORKFLOW"
 }
+progress:
+  description: Intermediate progress of imaging, recorded whenever it changed while waiting
+  returned: when nodes are imaged
+  type: list
+  sample: [
+        {
+            "time": 1650969362.0,
+            "progress": {
+                "aggregate_percent_complete": 40,
+                "cluster_creation_started": false,
+                "nodes": {
+                    "<node-uuid-1>": "Installing AOS",
+                    "<node-uuid-2>": "Installing AOS"
+                }
+            }
+        }
+  ]
 """
 
-import time  # noqa: E402
-
 from ..module_utils.base_module import BaseModule  # noqa: E402
 from ..module_utils.fc.imaged_clusters import ImagedCluster  # noqa: E402
-from ..module_utils.fc.imaged_nodes import ImagedNode  # noqa: E402
+from ..module_utils.fc.progress import ImagingProgress  # noqa: E402
 from ..module_utils.utils import remove_param_with_none_value  # noqa: E402
 
 
@@ -606,43 +621,24 @@ def imageNodes(module, result):
 
 
 def check_node_available(module, nodes, result):
-    av = ImagedNode(module)
-    for node in nodes:
-        node_detail = av.read(node["imaged_node_uuid"])
-        node_state = node_detail["node_state"]
-        if node_state != "STATE_AVAILABLE":
-            avial, err = wait_till_node_available(
-                module, node["imaged_node_uuid"], node_state
-            )
-            if err:
-                result["error"] = err
-                result["response"] = avial
-                module.fail_json(
-                    msg="Nodes not available or may be part of other cluster", **result
-                )
-
-
-def wait_till_node_available(module, node_uuid, node_state):
-    timeout = time.time() + 1800
-    delay = 60
-    img = ImagedNode(module)
-    while node_state != "STATE_AVAILABLE":
-        node_detail = img.read(node_uuid)
-        new_node_state = node_detail["node_state"]
-        if new_node_state != "STATE_AVAILABLE":
-            if time.time() > timeout:
-                return (None, "Timeout. Node is in {0}\n".format(new_node_state))
-            time.sleep(delay)
-        else:
-            node_state = new_node_state
-
-    return node_state, None
+    progress = ImagingProgress(module)
+    states, err = progress.wait_for_nodes_available(
+        [node["imaged_node_uuid"] for node in nodes]
+    )
+    if err:
+        result["error"] = err
+        result["response"] = states
+        module.fail_json(
+            msg="Nodes not available or may be part of other cluster", **result
+        )
 
 
 def wait_till_imaging(module, result):
     imaged_cluster_uuid = result["imaged_cluster_uuid"]
-    resp, err = wait_for_completion(module, imaged_cluster_uuid)
+    progress = ImagingProgress(module)
+    resp, err = progress.wait_for_completion(imaged_cluster_uuid)
     result["response"] = resp
+    result["progress"] = progress.history
     if err:
         result["error"] = err
         result["response"] = resp
@@ -650,67 +646,6 @@ def wait_till_imaging(module, result):
     result["changed"] = True
 
 
-def wait_for_completion(module, uuid):
-    state = ""
-    delay = 30
-    time.sleep(15 * 60)
-    timeout = time.time() + (3 * 60 * 60)
-    progress = ImagedCluster(module)
-    while state != "COMPLETED":
-        response = progress.read(uuid)
-        stopped = response["cluster_status"]["imaging_stopped"]
-        aggregate_percent_complete = response["cluster_status"][
-            "aggregate_percent_complete"
-        ]
-        if stopped:
-            if aggregate_percent_complete < 100:
-                status = _get_progress_error_status(response)
-                return response, status
-            state = "COMPLETED"
-        else:
-            state = "PENDING"
-            if time.time() > timeout:
-                return (
-                    None,
-                    "Failed to poll on image node progress. Reason: Timeout",
-                )
-            time.sleep(delay)
-    return response, None
-
-
-def _get_progress_error_status(progress):
-    return "Imaging stopped before completion.\nClusters: {0}\nNodes: {1}".format(
-        _get_cluster_progress_messages(
-            progress, "cluster_progress_details", "cluster_name"
-        ),
-        _get_node_progress_messages(
-            progress, "node_progress_details", "imaged_node_uuid"
-        ),
-    )
-
-
-def _get_cluster_progress_messages(progress, entity_type, entity_name):
-    res = ""
-    cluster = progress["cluster_status"][entity_type]
-    if cluster is not None:
-        if cluster.get(entity_name):
-            res += "cluster_name: {0}\n".format(cluster[entity_name])
-        if cluster.get("status"):
-            res += "status:\n{0}\n".format(cluster["status"])
-
-    return res
-
-
-def _get_node_progress_messages(progress, entity_type, entity_name):
-    res = ""
-    nodes = progress["cluster_status"][entity_type]
-    if nodes:
-        for c in nodes:
-            res += "node_uuid: {0}\n".format(c[entity_name])
-            res += "status:\n{0}\n".format(c["status"])
-    return res
-
-
 def deleteCluster(module, result):
     cluster_uuid = module.params.get("imaged_cluster_uuid")
     cluster = ImagedCluster(module)
@@ -31,6 +31,29 @@ options:
     type: str
     choices: [kvm, esx, hyperv, xen, nos]
     required: true
+  upload_chunk_size:
+    description:
+      - Size in MiB of chunks in which installer file is read and sent, between 1 and 64
+    type: int
+    required: false
+    default: 8
+  skip_existing:
+    description:
+      - Skip upload to foundation vms already having installer file of same C(filename) and contents
+      - Contents are compared by size and sha256 digest of C(source) recorded by earlier uploads of this
+        module with C(skip_existing), digest is cached in sidecar file e.g. C(installer.iso.sha256) next to C(source)
+      - Records of uploads are kept in C(~/.ansible/nutanix/uploads.json) and expire after 7 days
+      - If not set, C(source) is not hashed and uploads are not recorded
+    type: bool
+    required: false
+    default: false
+  additional_hosts:
+    description:
+      - Other foundation vms to which same installer file is uploaded, concurrently with C(nutanix_host)
+      - Installer file is read from disk once for all uploads
+    type: list
+    elements: str
+    required: false
 extends_documentation_fragment:
       - nutanix.ncp.ntnx_foundation_base_module
       - nutanix.ncp.ntnx_operations
@@ -50,6 +73,17 @@ EXAMPLES = r"""
     installer_type: esx
     timeout: 3600
 
+- name: Upload AOS package to foundation vms which do not have it yet
+  ntnx_foundation_image_upload:
+    nutanix_host: "{{ ip }}"
+    additional_hosts: "{{ other_ips }}"
+    state: present
+    source: "{{path}}"
+    filename: "nutanix_installer_package.tar.gz"
+    installer_type: nos
+    skip_existing: true
+    timeout: 3600
+
 - name: Delete Image with esx installer_type
   ntnx_foundation_image_upload:
     nutanix_host: "{{ ip }}"
@@ -59,10 +93,45 @@ EXAMPLES = r"""
 """
 
 RETURN = r"""
-
+upload:
+  description: Report of upload of installer file
+  returned: when installer file is uploaded
+  type: dict
+  sample: {
+            "bytes_sent": 5368709120,
+            "total_bytes": 5368709120,
+            "duration": 21.7,
+            "throughput_mib_per_sec": 235.94,
+            "eta_seconds": 0,
+            "chunk_size": 8388608,
+            "zero_copy": true
+        }
+hosts:
+  description:
+    - Result of upload to each foundation vm, C(nutanix_host) first
+    - C(skipped) is true if foundation vm already had installer file, as per C(skip_existing)
+  returned: when C(state) is present
+  type: list
+  sample: [
+            {
+                "host": "10.x.x.1",
+                "skipped": true,
+                "upload": null,
+                "error": null
+            },
+            {
+                "host": "10.x.x.2",
+                "skipped": false,
+                "upload": {"bytes_sent": 5368709120, "total_bytes": 5368709120},
+                "error": null
+            }
+        ]
 """
 from ..module_utils.foundation.base_module import FoundationBaseModule  # noqa: E402
-from ..module_utils.foundation.image_upload import Image  # noqa: E402
+from ..module_utils.foundation.image_upload import (  # noqa: E402
+    Image,
+    upload_image_to_hosts,
+)
 from ..module_utils.utils import remove_param_with_none_value  # noqa: E402
 
 
@@ -73,23 +142,44 @@ def get_module_spec():
             type="str", required=True, choices=["kvm", "esx", "hyperv", "xen", "nos"]
         ),
         source=dict(type="str", required=False),
+        upload_chunk_size=dict(type="int", required=False, default=8),
+        skip_existing=dict(type="bool", required=False, default=False),
+        additional_hosts=dict(type="list", elements="str", required=False),
     )
 
     return module_args
 
 
 def upload_image(module, result):
-    image = Image(module)
     if module.check_mode:
         result["response"] = module.params
         return
-    fname = module.params["filename"]
-    itype = module.params["installer_type"]
-    source = module.params["source"]
-    timeout = module.params["timeout"]
-    resp = image.upload_image(fname, itype, source, timeout=timeout)
-    result["changed"] = True
-    result["response"] = resp
+    hosts = [module.params["nutanix_host"]]
+    for host in module.params.get("additional_hosts") or []:
+        if host not in hosts:
+            hosts.append(host)
+    hosts_results = upload_image_to_hosts(
+        module,
+        hosts,
+        module.params["filename"],
+        module.params["installer_type"],
+        module.params["source"],
+        timeout=module.params["timeout"],
+        skip_existing=module.params["skip_existing"],
+    )
+    result["hosts"] = hosts_results
+    result["upload"] = hosts_results[0]["upload"]
+    result["response"] = hosts_results[0].pop("response", None)
+    for host_result in hosts_results[1:]:
+        host_result.pop("response", None)
+    result["changed"] = any(not r["skipped"] and not r["error"] for r in hosts_results)
+    failed = [r["host"] for r in hosts_results if r["error"]]
+    if failed:
+        result["error"] = dict(
+            (r["host"], r["error"]) for r in hosts_results if r["error"]
+        )
+        msg = "Failed uploading image to {0}".format(", ".join(failed))
+        module.fail_json(msg=msg, **result)
 
 
 def delete_image(module, result):
@@ -124,6 +124,43 @@ options:
                 description: checksum value
                 type: str
                 required: true
+    upload_chunk_size:
+        description:
+            - Size in MiB of chunks in which image at C(source_path) is read and sent, between 1 and 64
+            - Larger chunks need fewer calls per byte, which matters for images of tens of GB
+        type: int
+        required: false
+        default: 8
+    upload_parts:
+        description:
+            - Number of byte ranges of image at C(source_path) to upload in parallel, with C(Content-Range) headers
+            - Upload falls back to whole file if server rejects or ignores ranged writes to image file,
+              as checked after first part
+            - Not used when C(checksum) or C(compute_checksum) is given, as checksums are of whole file
+        type: int
+        required: false
+        default: 1
+    compute_checksum:
+        description:
+            - Algorithm of checksum of image at C(source_path) computed while it is uploaded
+            - Checksum is compared with one reported for image after upload and returned in C(checksum)
+            - Digest is cached in sidecar file e.g. C(image.iso.sha256) next to C(source_path), later uploads
+              of unchanged file skip hashing and send cached digest in checksum headers for verification
+            - Implies upload of whole file
+        type: str
+        required: false
+        choices:
+            - SHA_1
+            - SHA_256
+    resumable_upload:
+        description:
+            - Keep image and state of upload in C(~/.ansible/nutanix/uploads.json) if upload from C(source_path) fails
+            - Next run with same C(name) and unchanged C(source_path) continues upload to same image, sending only
+              parts which are not acknowledged yet in case of C(upload_parts)
+            - Image is deleted on failed upload otherwise
+        type: bool
+        required: false
+        default: false
 extends_documentation_fragment:
       - nutanix.ncp.ntnx_credentials
       - nutanix.ncp.ntnx_operations
@@ -304,6 +341,30 @@ image_uuid:
   returned: always
   type: str
   sample: "00000000-0000-0000-0000-000000000000"
+upload:
+  description: Report of upload of image contents from C(source_path)
+  returned: when C(source_path) is given
+  type: dict
+  sample: {
+            "bytes_sent": 42949672960,
+            "total_bytes": 42949672960,
+            "duration": 205.12,
+            "throughput_mib_per_sec": 199.68,
+            "eta_seconds": 0,
+            "chunk_size": 8388608,
+            "zero_copy": false
+        }
+checksum:
+  description:
+    - Checksum of image contents uploaded from C(source_path)
+    - C(verified) is null if image has no checksum of same algorithm to compare with
+  returned: when C(compute_checksum) is given
+  type: dict
+  sample: {
+            "checksum_algorithm": "SHA_256",
+            "checksum_value": "8b2d5a6e...",
+            "verified": true
+        }
 """
 
 from ..module_utils import utils  # noqa: E402
@@ -347,6 +408,10 @@ def get_module_spec():
         ),
         checksum=dict(type="dict", options=checksum, required=False),
         image_uuid=dict(type="str", required=False),
+        upload_chunk_size=dict(type="int", required=False, default=8),
+        upload_parts=dict(type="int", required=False, default=1),
+        compute_checksum=dict(type="str", required=False, choices=["SHA_1", "SHA_256"]),
+        resumable_upload=dict(type="bool", required=False, default=False),
     )
     return module_args
 
@@ -361,6 +426,19 @@ def create_image(module, result):
         result["response"] = spec
         return
 
+    source_path = module.params.get("source_path", "")
+    task = Task(module)
+
+    # continue unfinished upload of previous run to its image
+    if source_path and module.params.get("resumable_upload"):
+        image_uuid = Image(module, upload_image=True).get_resumable_upload(source_path)
+        resp = image.read(image_uuid, raise_error=False) if image_uuid else None
+        if resp and resp.get("metadata", {}).get("uuid") == image_uuid:
+            result["image_uuid"] = image_uuid
+            result["changed"] = True
+            upload_image(module, result, image_uuid)
+            return
+
     # create image
     resp = image.create(spec)
     image_uuid = resp["metadata"]["uuid"]
@@ -369,31 +447,13 @@ def create_image(module, result):
     result["changed"] = True
 
     # upload image if source_path is given
-    source_path = module.params.get("source_path", "")
-    task = Task(module)
-
     if source_path:
         # wait for image create to finish
         task.wait_for_completion(task_uuid)
+        upload_image(module, result, image_uuid)
+        return
 
-        # upload image contents
-        timeout = module.params.get("timeout", 600)
-        image_upload_obj = Image(module, upload_image=True)
-        resp = image_upload_obj.upload_image(
-            image_uuid, source_path, timeout, raise_error=False
-        )
-        error = resp.get("error")
-        if error:
-            # delete the image metadata from PC
-            image_upload_obj.delete(image_uuid)
-            task.wait_for_completion(task_uuid)
-            result["error"] = error
-            result["changed"] = False
-            result["response"] = None
-            module.fail_json(msg="Failed uploading image contents", **result)
-        resp = image_upload_obj.read(image_uuid)
-
-    elif module.params.get("wait"):
+    if module.params.get("wait"):
         task.wait_for_completion(task_uuid)
         # get the image
         resp = image.read(image_uuid)
@@ -401,6 +461,33 @@ def create_image(module, result):
     result["response"] = resp
 
 
+def upload_image(module, result, image_uuid):
+    source_path = module.params["source_path"]
+    timeout = module.params.get("timeout", 600)
+    image_upload_obj = Image(module, upload_image=True)
+    resp = image_upload_obj.upload_image(
+        image_uuid, source_path, timeout, raise_error=False
+    )
+    result["upload"] = image_upload_obj.upload_stats
+    if image_upload_obj.upload_checksum:
+        result["checksum"] = image_upload_obj.upload_checksum
+    error = resp.get("error")
+    if error:
+        result["error"] = error
+        result["response"] = None
+        if module.params.get("resumable_upload"):
+            msg = "Failed uploading image contents, run again to resume upload"
+            module.fail_json(msg=msg, **result)
+        # delete the image metadata from PC
+        resp = image_upload_obj.delete(image_uuid)
+        task_uuid = resp.get("status", {}).get("execution_context", {}).get("task_uuid")
+        if task_uuid:
+            Task(module).wait_for_completion(task_uuid)
+        result["changed"] = False
+        module.fail_json(msg="Failed uploading image contents", **result)
+    result["response"] = image_upload_obj.read(image_uuid)
+
+
 def update_image(module, result):
     image = Image(module)
     image_uuid = module.params.get("image_uuid")
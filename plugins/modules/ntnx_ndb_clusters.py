@@ -296,8 +296,6 @@ cluster_uuid:
   sample: "00000000-0000-0000-0000-000000000000"
 """
 
-import time  # noqa: E402
-
 from ..module_utils import utils  # noqa: E402
 from ..module_utils.ndb.base_module import NdbBaseModule  # noqa: E402
 from ..module_utils.ndb.clusters import Cluster  # noqa: E402
@@ -382,7 +380,6 @@ def create_cluster(module, result):
 
     if module.params.get("wait"):
         operations = Operation(module)
-        time.sleep(5)  # wait for ops to starts
         operations.wait_for_completion(ops_uuid)
         resp = cluster.read(cluster_uuid)
 
@@ -433,7 +430,6 @@ def delete_cluster(module, result):
 
     if module.params.get("wait"):
         operations = Operation(module)
-        time.sleep(2)  # to get operation ID functional
         resp = operations.wait_for_completion(ops_uuid, delay=5)
         result["response"] = resp
     result["changed"] = True
@@ -290,7 +290,6 @@ uuid:
   type: str
   sample: "00000000-0000-0000-0000-000000000000"
 """
-import time  # noqa: E402
 
 from ..module_utils.ndb.base_module import NdbBaseModule  # noqa: E402
 from ..module_utils.ndb.database_clones import DatabaseClone  # noqa: E402
@@ -335,7 +334,6 @@ def refresh_clone(module, result):
     if module.params.get("wait"):
         ops_uuid = resp["operationId"]
         operations = Operation(module)
-        time.sleep(5)  # to get operation ID functional
         operations.wait_for_completion(ops_uuid)
         resp = db_clone.read(uuid)
         result["response"] = resp
@@ -600,8 +600,6 @@ uuid:
   sample: "00000000-0000-0000-0000-000000000000"
 """
 
-import time  # noqa: E402
-
 from ..module_utils.ndb.base_module import NdbBaseModule  # noqa: E402
 from ..module_utils.ndb.database_clones import DatabaseClone  # noqa: E402
 from ..module_utils.ndb.db_server_vm import DBServerVM  # noqa: E402
@@ -803,7 +801,6 @@ def create_db_clone(module, result):
     if module.params.get("wait"):
         ops_uuid = resp["operationId"]
         operations = Operation(module)
-        time.sleep(5)  # to get operation ID functional
         operations.wait_for_completion(ops_uuid, delay=15)
         resp = db_clone.read(uuid)
         db_clone.format_response(resp)
@@ -913,7 +910,6 @@ def delete_db_clone(module, result):
 
     if module.params.get("wait"):
         ops_uuid = resp["operationId"]
-        time.sleep(5)  # to get operation ID functional
         operations = Operation(module)
         resp = operations.wait_for_completion(ops_uuid, delay=5)
 
@@ -99,9 +99,6 @@ response:
 
 """
 
-
-import time  # noqa: E402
-
 from ..module_utils.ndb.base_module import NdbBaseModule  # noqa: E402
 from ..module_utils.ndb.operations import Operation  # noqa: E402
 from ..module_utils.ndb.time_machines import TimeMachine  # noqa: E402
@@ -133,7 +130,6 @@ def log_catchup(module, result):
 
     if module.params.get("wait"):
         ops_uuid = resp["operationId"]
-        time.sleep(5)  # to get operation ID functional
         operations = Operation(module)
         resp = operations.wait_for_completion(ops_uuid)
         result["response"] = resp
@@ -118,7 +118,6 @@ response:
 }
 
 """
-import time  # noqa: E402
 
 from ..module_utils.ndb.base_module import NdbBaseModule  # noqa: E402
 from ..module_utils.ndb.database_instances import DatabaseInstance  # noqa: E402
@@ -154,7 +153,6 @@ def restore_database(module, result):
 
     if module.params.get("wait"):
         ops_uuid = resp["operationId"]
-        time.sleep(5)  # to get operation ID functional
         operations = Operation(module)
         resp = operations.wait_for_completion(ops_uuid)
         result["response"] = resp
@@ -231,7 +231,6 @@ snapshot_uuid:
   type: str
   sample: "00000000-0000-0000-0000-000000000000"
 """
-import time  # noqa: E402
 
 from ..module_utils.ndb.base_module import NdbBaseModule  # noqa: E402
 from ..module_utils.ndb.operations import Operation  # noqa: E402
@@ -287,7 +286,6 @@ def create_snapshot(module, result):
     if module.params.get("wait"):
         ops_uuid = resp["operationId"]
         operations = Operation(module)
-        time.sleep(3)
         operations.wait_for_completion(ops_uuid, delay=5)
 
         # get snapshot info after its finished
@@ -369,7 +367,6 @@ def delete_snapshot(module, result):
     if module.params.get("wait"):
         ops_uuid = resp["operationId"]
         operations = Operation(module)
-        time.sleep(3)  # to get ops ID functional
         resp = operations.wait_for_completion(ops_uuid, delay=2)
 
     result["response"] = resp
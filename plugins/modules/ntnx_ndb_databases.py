@@ -1035,7 +1035,6 @@ db_uuid:
   type: str
   sample: "be524e70-60ad-4a8c-a0ee-8d72f954d7e6"
 """
-import time  # noqa: E402
 from copy import deepcopy  # noqa: E402
 
 from ..module_utils.ndb.base_module import NdbBaseModule  # noqa: E402
@@ -1390,7 +1389,6 @@ def create_instance(module, result):
     if module.params.get("wait"):
         ops_uuid = resp["operationId"]
         operations = Operation(module)
-        time.sleep(5)  # to get operation ID functional
         operations.wait_for_completion(ops_uuid)
         query = {"detailed": True, "load-dbserver-cluster": True}
         resp = db_instance.read(db_uuid, query=query)
@@ -1502,7 +1500,6 @@ def delete_db_servers(module, result, database_info):
         resp = db_servers.delete(uuid=uuid, data=spec)
 
         ops_uuid = resp["operationId"]
-        time.sleep(5)  # to get operation ID functional
         operations = Operation(module)
         resp = operations.wait_for_completion(ops_uuid, delay=5)
 
@@ -1531,7 +1528,6 @@ def delete_instance(module, result):
 
     if module.params.get("wait"):
         ops_uuid = resp["operationId"]
-        time.sleep(5)  # to get operation ID functional
         operations = Operation(module)
         resp = operations.wait_for_completion(ops_uuid, delay=15)
         result["response"] = resp
@@ -449,7 +449,6 @@ uuid:
   sample: "be524e70-60ad-4a8c-a0ee-8d72f954d7e6"
 """
 
-import time  # noqa: E402
 from copy import deepcopy  # noqa: E402
 
 from ..module_utils.ndb.base_module import NdbBaseModule  # noqa: E402
@@ -588,7 +587,6 @@ def create_db_server(module, result):
     if module.params.get("wait"):
         ops_uuid = resp["operationId"]
         operations = Operation(module)
-        time.sleep(5)  # to get operation ID functional
         operations.wait_for_completion(ops_uuid)
         resp = db_servers.read(db_uuid)
         db_servers.format_response(resp)
@@ -693,7 +691,6 @@ def delete_db_server(module, result):
     if module.params.get("wait") and resp.get("operationId"):
         ops_uuid = resp["operationId"]
         operations = Operation(module)
-        time.sleep(5)  # to get operation ID functional
         resp = operations.wait_for_completion(ops_uuid, delay=5)
         result["response"] = resp
 
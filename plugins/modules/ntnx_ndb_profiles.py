@@ -786,8 +786,6 @@ version_uuid:
   sample: "be524e70-60ad-4a8c-a0ee-8d72f954d7e6"
 """
 
-import time  # noqa: E402
-
 from ..module_utils.ndb.base_module import NdbBaseModule  # noqa: E402
 from ..module_utils.ndb.operations import Operation  # noqa: E402
 from ..module_utils.ndb.profiles.profile_types import get_profile_type_obj  # noqa: E402
@@ -960,7 +958,6 @@ def create_profile_version(module, result, profile_uuid, profile_obj):
 
         ops_uuid = resp["operationId"]
         operations = Operation(module)
-        time.sleep(3)  # to get operation ID functional
         operations.wait_for_completion(ops_uuid, delay=10)
 
         result["response"]["version"] = profile_obj.get_profile_by_version(
@@ -1013,7 +1010,6 @@ def update_profile_version(module, result, profile_uuid, profile_obj):
 
         ops_uuid = resp["operationId"]
         operations = Operation(module)
-        time.sleep(3)  # to get operation ID functional
         operations.wait_for_completion(ops_uuid, delay=10)
 
         result["response"]["version"] = profile_obj.get_profile_by_version(
@@ -1100,7 +1096,6 @@ def create_profile(module, result):
 
         ops_uuid = resp["operationId"]
         operations = Operation(module)
-        time.sleep(3)  # to get operation ID functional
         operations.wait_for_completion(ops_uuid, delay=10)
 
         resp = _profile.get_profiles(uuid=uuid)
@@ -1160,7 +1155,6 @@ def update_profile(module, result):
 
             ops_uuid = resp["operationId"]
             operations = Operation(module)
-            time.sleep(3)  # to get operation ID functional
             operations.wait_for_completion(ops_uuid, delay=10)
 
             resp = _profile.get_profiles(uuid=uuid)
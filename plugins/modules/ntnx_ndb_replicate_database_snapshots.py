@@ -14,7 +14,7 @@ short_description: module for replicating database snapshots across clusters of
 version_added: 1.8.0
 description:
     - module for replicating snapshots across clusters of time machine
-    - replication to one cluster at a time is supported
+    - replication to multiple clusters is done with one operation per cluster, which are polled together
 options:
       expiry_days:
         description:
@@ -27,7 +27,7 @@ options:
       clusters:
         description:
             - cluster details where snapshot needs to be replicated
-            - currently, replication to only one cluster at once is supported
+            - snapshot is replicated to each cluster by separate operation
         type: list
         elements: dict
         required: true
@@ -62,7 +62,9 @@ EXAMPLES = r"""
 """
 RETURN = r"""
 response:
-  description: snapshot replication response
+  description:
+    - snapshot replication response
+    - with multiple clusters, response of each cluster keyed by cluster uuid
   returned: always
   type: dict
   sample: {
@@ -145,7 +147,6 @@ snapshot_uuid:
   type: str
   sample: "be524e70-60ad-4a8c-a0ee-8d72f954d7e6"
 """
-import time  # noqa: E402
 
 from ..module_utils.ndb.base_module import NdbBaseModule  # noqa: E402
 from ..module_utils.ndb.operations import Operation  # noqa: E402
@@ -153,7 +154,7 @@ from ..module_utils.ndb.snapshots import Snapshot  # noqa: E402
 from ..module_utils.utils import remove_param_with_none_value  # noqa: E402
 
 # Notes:
-# 1. Snapshot replication to one cluster at a time is supported currently
+# 1. NDB replicates snapshot to one cluster per request, so requests are sent per cluster
 
 
 def get_module_spec():
@@ -193,23 +194,33 @@ def replicate_snapshot(module, result):
 
     result["snapshot_uuid"] = snapshot_uuid
 
+    cluster_uuids = spec["nxClusterIds"]
+    specs = dict((uuid, dict(spec, nxClusterIds=[uuid])) for uuid in cluster_uuids)
+
     if module.check_mode:
-        result["response"] = spec
+        result["response"] = spec if len(cluster_uuids) == 1 else specs
         return
 
-    resp = _snapshot.replicate(
-        uuid=snapshot_uuid, time_machine_uuid=time_machine_uuid, data=spec
-    )
-    result["response"] = resp
+    responses = {}
+    for uuid in cluster_uuids:
+        responses[uuid] = _snapshot.replicate(
+            uuid=snapshot_uuid, time_machine_uuid=time_machine_uuid, data=specs[uuid]
+        )
+    result["changed"] = True
 
     if module.params.get("wait"):
-        ops_uuid = resp["operationId"]
+        # replications to all clusters are polled together
         operations = Operation(module)
-        time.sleep(3)
-        resp = operations.wait_for_completion(ops_uuid, delay=5)
-        result["response"] = resp
+        ops_responses = operations.wait_for_all(
+            [responses[uuid]["operationId"] for uuid in cluster_uuids], delay=5
+        )
+        for uuid in cluster_uuids:
+            responses[uuid] = ops_responses[responses[uuid]["operationId"]]
 
-    result["changed"] = True
+    if len(cluster_uuids) == 1:
+        result["response"] = responses[cluster_uuids[0]]
+    else:
+        result["response"] = responses
 
 
 def run_module():
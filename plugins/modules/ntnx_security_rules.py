@@ -40,6 +40,39 @@ options:
       - This is not recommended for production setup
     type: bool
     default: true
+  compression:
+    description:
+      - Set value to C(True) to request gzip/deflate compressed API responses
+    type: bool
+    default: false
+  max_retries:
+    description:
+      - Maximum number of retries of idempotent requests failed with transient errors
+    type: int
+    default: 3
+  rate_limit:
+    description:
+      - Maximum number of API requests per second sent to C(nutanix_host) by all module processes on this host
+    type: float
+  max_concurrent_requests:
+    description:
+      - Maximum number of API requests in flight to C(nutanix_host) by all module processes on this host
+    type: int
+  perf_trace:
+    description:
+      - Set value to C(True) to return timing and byte counts of API calls per endpoint in C(perf_trace)
+    type: bool
+    default: false
+  session_cache:
+    description:
+      - Set value to C(True) to cache session cookie on disk and reuse it across module runs
+    type: bool
+    default: false
+  bypass_cache:
+    description:
+      - Set value to C(True) to skip cached uuids of entity names and always lookup uuids from API
+    type: bool
+    default: false
   state:
     description:
       - Specify state of security_rule
@@ -0,0 +1,154 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2021, Prem Karat
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+DOCUMENTATION = r"""
+---
+module: ntnx_tasks_wait
+short_description: Wait for multiple prism central tasks to complete
+version_added: 1.10.0
+description:
+  - Wait for given tasks to complete, e.g. tasks of entities created asynchronously in a loop.
+  - All pending tasks are polled together using list calls filtered on their uuids.
+options:
+  task_uuids:
+    description:
+      - List of uuids of tasks to wait for
+    type: list
+    elements: str
+    required: true
+  timeout:
+    description:
+      - Max seconds to wait for tasks to complete
+      - Module fails if tasks are not complete by then
+    type: int
+    required: false
+  fail_on_task_failure:
+    description:
+      - Set value to C(False) to report failed tasks in C(failed_tasks) instead of failing module
+    type: bool
+    required: false
+    default: true
+extends_documentation_fragment:
+      - nutanix.ncp.ntnx_credentials
+author:
+ - Prem Karat (@premkarat)
+"""
+
+EXAMPLES = r"""
+- name: Clone VMs without waiting
+  nutanix.ncp.ntnx_vms_clone:
+    src_vm_uuid: "{{ vm_uuid }}"
+    name: "clone-{{ item }}"
+    wait: false
+  loop: "{{ range(100) | list }}"
+  register: clones
+
+- name: Wait for all clones
+  nutanix.ncp.ntnx_tasks_wait:
+    nutanix_host: "{{ ip }}"
+    nutanix_username: "{{ username }}"
+    nutanix_password: "{{ password }}"
+    validate_certs: false
+    task_uuids: "{{ clones.results | map(attribute='task_uuid') | list }}"
+    timeout: 1800
+"""
+
+RETURN = r"""
+response:
+  description: Last status of each task, by task uuid
+  returned: always
+  type: dict
+  sample: {
+      "6e5f2a88-0a8a-4a58-97f4-7e5c3d5f2a11": {
+          "uuid": "6e5f2a88-0a8a-4a58-97f4-7e5c3d5f2a11",
+          "status": "SUCCEEDED",
+          "percentage_complete": 100,
+          "operation_type": "VmClone",
+          "entity_reference_list": [
+              {"kind": "vm", "uuid": "b0f8a6a4-5d46-4c2f-8d9a-4e0c6c8f0f3e"}
+          ]
+      }
+  }
+failed_tasks:
+  description: Uuids of tasks which failed or were aborted
+  returned: always
+  type: list
+  sample: []
+polls:
+  description: Number of times pending tasks were polled
+  returned: always
+  type: int
+  sample: 6
+"""
+
+from ..module_utils.base_info_module import BaseInfoModule  # noqa: E402
+from ..module_utils.prism.tasks import Task  # noqa: E402
+
+
+def get_module_spec():
+    module_args = dict(
+        task_uuids=dict(type="list", elements="str", required=True),
+        timeout=dict(type="int"),
+        fail_on_task_failure=dict(type="bool", default=True),
+    )
+    return module_args
+
+
+def wait_for_tasks(module, result):
+    task = Task(module)
+    responses = task.wait_for_all(
+        module.params["task_uuids"],
+        raise_error=False,
+        timeout=module.params.get("timeout"),
+    )
+    result["response"] = responses
+    result["polls"] = task.polls
+
+    pending = [
+        uuid
+        for uuid in module.params["task_uuids"]
+        if responses.get(uuid, {}).get("status")
+        not in ("SUCCEEDED", "FAILED", "ABORTED")
+    ]
+    result["failed_tasks"] = [
+        uuid
+        for uuid, resp in responses.items()
+        if resp.get("status") in ("FAILED", "ABORTED")
+    ]
+    if pending:
+        result["error"] = "Tasks {0} are not complete".format(", ".join(pending))
+        module.fail_json(msg="Timed out waiting for tasks to complete", **result)
+    if result["failed_tasks"] and module.params["fail_on_task_failure"]:
+        result["error"] = "Tasks {0} failed".format(", ".join(result["failed_tasks"]))
+        module.fail_json(msg="Some of the tasks failed", **result)
+
+
+def run_module():
+    module = BaseInfoModule(
+        skip_info_args=True,
+        argument_spec=get_module_spec(),
+        supports_check_mode=True,
+    )
+    result = {
+        "changed": False,
+        "error": None,
+        "response": None,
+        "failed_tasks": [],
+        "polls": 0,
+    }
+    wait_for_tasks(module, result)
+    module.exit_json(**result)
+
+
+def main():
+    run_module()
+
+
+if __name__ == "__main__":
+    main()
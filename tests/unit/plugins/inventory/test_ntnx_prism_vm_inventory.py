@@ -0,0 +1,333 @@
+from __future__ import absolute_import, division, print_function
+
+import os
+import threading
+from copy import deepcopy
+
+import yaml
+from ansible import constants as C
+from ansible.errors import AnsibleError
+from ansible.inventory.data import InventoryData
+from ansible.parsing.dataloader import DataLoader
+from ansible.plugins.loader import fragment_loader
+from ansible.utils.plugin_docs import get_docstring
+from ansible_collections.nutanix.ncp.plugins.inventory import ntnx_prism_vm_inventory
+from ansible_collections.nutanix.ncp.plugins.module_utils.prism import vms
+from ansible_collections.nutanix.ncp.plugins.module_utils.prism.groups import Groups
+from ansible_collections.nutanix.ncp.tests.unit.compat import unittest
+from ansible_collections.nutanix.ncp.tests.unit.compat.mock import patch
+from ansible_collections.nutanix.ncp.tests.unit.plugins.modules.utils import (
+    set_temp_home,
+)
+
+__metaclass__ = type
+
+
+def get_plugin():
+    # options are registered from documentation as plugin loader does
+    plugin = ntnx_prism_vm_inventory.InventoryModule()
+    plugin._load_name = plugin.NAME
+    plugin._redirected_names = [plugin.NAME]
+    doc = get_docstring(ntnx_prism_vm_inventory.__file__, fragment_loader)[0]
+    C.config.initialize_plugin_configuration_definitions(
+        "inventory", plugin.NAME, doc["options"]
+    )
+    return plugin
+
+
+def _vm(name, uuid, ip, cluster="cluster1", modified="2023-06-12T09:39:20Z"):
+    return {
+        "metadata": {
+            "uuid": uuid,
+            "categories": {"env": "dev"},
+            "last_update_time": modified,
+        },
+        "status": {
+            "name": name,
+            "cluster_reference": {"name": cluster},
+            "resources": {
+                "power_state": "ON",
+                "num_sockets": 2,
+                "disk_list": [{"uuid": "disk"}],
+                "nic_list": [
+                    {
+                        "nic_type": "NORMAL_NIC",
+                        "ip_endpoint_list": [{"type": "ASSIGNED", "ip": ip}],
+                    }
+                ],
+            },
+        },
+    }
+
+
+def _values(vm, attribute):
+    resources = vm["status"]["resources"]
+    values = {
+        "vm_name": [vm["status"]["name"]],
+        "cluster_name": [vm["status"]["cluster_reference"]["name"]],
+        "ip_addresses": [
+            e["ip"] for n in resources["nic_list"] for e in n["ip_endpoint_list"]
+        ],
+        "power_state": [resources["power_state"]],
+    }.get(attribute, [])
+    return [{"values": values}] if values else []
+
+
+class InventoryTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = set_temp_home(self)
+        self.vms = [_vm("vm1", "uuid1", "10.0.0.1"), _vm("vm2", "uuid2", "10.0.0.2")]
+        self.list_calls = 0
+        self.listed = []
+        self.group_requests = []
+        self.pc_vms = {}
+
+        def list_entities(vm, data, page_length=None):
+            if "sort_attribute" not in data:
+                self.list_calls += 1
+                host = vm.module.params["nutanix_host"]
+                if host in self.pc_vms:
+                    # prism centrals are listed concurrently
+                    self.barrier.wait()
+                    return iter(deepcopy(self.pc_vms[host]))
+                return iter(deepcopy(self.vms))
+            return self._list_sorted()
+
+        def list_groups(groups, data, use_base_url=False):
+            self.group_requests.append(data)
+            offset = data["group_member_offset"]
+            entities = [
+                {
+                    "entity_id": v["metadata"]["uuid"],
+                    "data": [
+                        {"name": a["attribute"], "values": _values(v, a["attribute"])}
+                        for a in data["group_member_attributes"]
+                    ],
+                }
+                for v in self.vms[offset : offset + data["group_member_count"]]
+            ]
+            return {
+                "filtered_entity_count": len(self.vms),
+                "group_results": [{"entity_results": entities}],
+            }
+
+        for patcher in (
+            patch.object(vms.VM, "list_entities", list_entities),
+            patch.object(Groups, "list", list_groups),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _list_sorted(self):
+        for entity in sorted(
+            self.vms, key=lambda v: v["metadata"]["last_update_time"], reverse=True
+        ):
+            self.listed.append(entity["status"]["name"])
+            yield deepcopy(entity)
+
+    def _config(self, **options):
+        config = {
+            "plugin": "nutanix.ncp.ntnx_prism_vm_inventory",
+            "nutanix_hostname": "pc",
+            "nutanix_username": "admin",
+            "nutanix_password": "password",
+        }
+        config.update(options)
+        path = os.path.join(self.tmpdir, "nutanix.yml")
+        with open(path, "w") as f:
+            yaml.safe_dump(config, f)
+        return path
+
+    def _parse(self, path, cache=True):
+        inventory = InventoryData()
+        plugin = get_plugin()
+        plugin.parse(inventory, DataLoader(), path, cache=cache)
+        # as done by inventory manager after parse
+        plugin.update_cache_if_changed()
+        return inventory
+
+
+class TestInventoryCache(InventoryTestCase):
+    def _cached_config(self):
+        return self._config(
+            cache=True,
+            cache_plugin="jsonfile",
+            cache_connection=os.path.join(self.tmpdir, "cache"),
+            cache_timeout=3600,
+            keyed_groups=[{"key": "power_state", "prefix": "power"}],
+        )
+
+    def test_hosts(self):
+        inventory = self._parse(self._config())
+        host = inventory.get_host("vm1")
+        self.assertEqual(host.vars["ansible_host"], "10.0.0.1")
+        self.assertEqual(host.vars["uuid"], "uuid1")
+        self.assertEqual(host.vars["ntnx_categories"], {"env": "dev"})
+        self.assertEqual(host.vars["num_sockets"], 2)
+        self.assertNotIn("disk_list", host.vars)
+        self.assertIn("cluster1", inventory.groups)
+
+    def test_cached_hosts(self):
+        path = self._cached_config()
+        self._parse(path)
+        self.vms = []
+        inventory = self._parse(path)
+        self.assertEqual(self.list_calls, 1)
+        self.assertEqual(inventory.get_host("vm2").vars["ansible_host"], "10.0.0.2")
+        self.assertIn("power_ON", inventory.groups)
+
+        # pruned host data is cached, not API responses
+        cache_dir = os.path.join(self.tmpdir, "cache")
+        with open(os.path.join(cache_dir, os.listdir(cache_dir)[0])) as f:
+            cached = f.read()
+        self.assertNotIn("nic_list", cached)
+
+        # flush cache lists VMs again
+        inventory = self._parse(path, cache=False)
+        self.assertEqual(self.list_calls, 2)
+        self.assertIsNone(inventory.get_host("vm1"))
+
+    def test_cache_disabled(self):
+        path = self._config()
+        self._parse(path)
+        self._parse(path)
+        self.assertEqual(self.list_calls, 2)
+
+
+class TestIncrementalRefresh(InventoryTestCase):
+    def test_refresh_modified_vms(self):
+        path = self._config(incremental_refresh=True)
+        self._parse(path)
+        self.assertEqual(self.list_calls, 1)
+
+        # vm1 is modified, vm2 is deleted and vm3 is created
+        self.vms = [
+            _vm("vm1", "uuid1", "10.0.0.11", modified="2023-06-12T10:00:00Z"),
+            _vm("vm3", "uuid3", "10.0.0.3", modified="2023-06-12T10:05:00.5Z"),
+        ] + [
+            _vm(
+                "vm{0}".format(i),
+                "uuid{0}".format(i),
+                "ip",
+                modified="2023-06-01T00:00:00Z",
+            )
+            for i in range(4, 9)
+        ]
+        inventory = self._parse(path)
+        self.assertEqual(self.list_calls, 1)
+        # listing stops at first VM older than last refresh
+        self.assertEqual(self.listed, ["vm3", "vm1", "vm4"])
+        self.assertEqual(inventory.get_host("vm1").vars["ansible_host"], "10.0.0.11")
+        self.assertEqual(inventory.get_host("vm3").vars["ansible_host"], "10.0.0.3")
+        self.assertIsNone(inventory.get_host("vm2"))
+        # VMs not modified since last refresh are not listed
+        self.assertIsNone(inventory.get_host("vm4"))
+
+        # flush cache lists all VMs
+        inventory = self._parse(path, cache=False)
+        self.assertEqual(self.list_calls, 2)
+        self.assertIsNotNone(inventory.get_host("vm4"))
+
+    def test_unordered_listing(self):
+        path = self._config(incremental_refresh=True)
+        self._parse(path)
+        # VMs are listed in order of creation instead
+        self._list_sorted = lambda: iter(deepcopy(self.vms))
+        self.vms[1] = _vm("vm2", "uuid2", "10.0.0.2", modified="2023-06-12T10:00:00Z")
+        self._parse(path)
+        self.assertEqual(self.list_calls, 2)
+
+
+class TestGroupsBackend(InventoryTestCase):
+    def test_group_hosts(self):
+        self.vms.extend(
+            _vm("vm{0}".format(i), "uuid{0}".format(i), "10.0.1.{0}".format(i))
+            for i in range(3, 7)
+        )
+        # VMs listed without name are skipped, without cluster are ungrouped
+        self.vms.append(_vm(None, "uuid8", "10.0.1.8"))
+        self.vms.append(_vm("vm9", "uuid9", "10.0.1.9", cluster=None))
+        path = self._config(
+            backend="groups",
+            group_member_attributes=["power_state", "num_sockets"],
+            compose={"state": "power_state | lower"},
+            keyed_groups=[{"key": "power_state", "prefix": "power"}],
+        )
+        with patch.object(
+            ntnx_prism_vm_inventory.InventoryModule, "groups_page_length", 3
+        ):
+            inventory = self._parse(path)
+        self.assertEqual(self.list_calls, 0)
+        self.assertEqual(
+            [r["group_member_offset"] for r in self.group_requests], [0, 3, 6]
+        )
+        # only required and configured attributes are listed
+        self.assertEqual(
+            [a["attribute"] for a in self.group_requests[0]["group_member_attributes"]],
+            ["vm_name", "cluster_name", "ip_addresses", "power_state", "num_sockets"],
+        )
+        # controller VMs are filtered out
+        self.assertEqual(self.group_requests[0]["entity_type"], "mh_vm")
+        self.assertEqual(self.group_requests[0]["filter_criteria"], "is_cvm==0")
+        self.assertEqual(len(inventory.hosts), 7)
+        self.assertNotIn("None", inventory.hosts)
+        self.assertEqual(
+            [g.name for g in inventory.get_host("vm9").get_groups()], ["power_ON"]
+        )
+        host = inventory.get_host("vm1")
+        self.assertEqual(host.vars["ansible_host"], "10.0.0.1")
+        self.assertEqual(host.vars["uuid"], "uuid1")
+        self.assertEqual(host.vars["ip_addresses"], ["10.0.0.1"])
+        self.assertEqual(host.vars["power_state"], "ON")
+        self.assertIsNone(host.vars["num_sockets"])
+        self.assertEqual(host.vars["state"], "on")
+        self.assertIn("power_ON", inventory.groups)
+        self.assertIn("cluster1", inventory.groups)
+
+    def test_group_hosts_data(self):
+        # offset and length of data option apply to groups listing too
+        self.vms.extend(
+            _vm("vm{0}".format(i), "uuid{0}".format(i), "10.0.1.{0}".format(i))
+            for i in range(3, 9)
+        )
+        path = self._config(backend="groups", data={"offset": 2, "length": 4})
+        with patch.object(
+            ntnx_prism_vm_inventory.InventoryModule, "groups_page_length", 3
+        ):
+            inventory = self._parse(path)
+        self.assertEqual(
+            [r["group_member_offset"] for r in self.group_requests], [2, 5]
+        )
+        self.assertEqual(sorted(inventory.hosts), ["vm3", "vm4", "vm5", "vm6"])
+
+
+class TestMultiplePrismCentrals(InventoryTestCase):
+    def test_prism_centrals(self):
+        self.pc_vms = {
+            "pc1": [_vm("vm1", "uuid1", "10.0.0.1")],
+            "pc2": [_vm("vm1", "uuid3", "10.0.1.1"), _vm("vm2", "uuid2", "10.0.1.2")],
+        }
+        self.barrier = threading.Barrier(2, timeout=5)
+        path = self._config(
+            nutanix_hostname=None,
+            prism_centrals=[
+                {"nutanix_hostname": "pc1"},
+                {"name": "pc2", "nutanix_hostname": "pc2", "nutanix_password": "p2"},
+            ],
+        )
+        inventory = self._parse(path)
+        self.assertEqual(self.list_calls, 2)
+        self.assertEqual(sorted(inventory.hosts), ["pc1_vm1", "pc2_vm1", "vm2"])
+        host = inventory.get_host("pc1_vm1")
+        self.assertEqual(host.vars["name"], "vm1")
+        self.assertEqual(host.vars["ansible_host"], "10.0.0.1")
+        self.assertEqual(host.vars["prism_central"], "pc1")
+        self.assertEqual(
+            sorted(h.name for h in inventory.groups["pc2"].get_hosts()),
+            ["pc2_vm1", "vm2"],
+        )
+        self.assertEqual(inventory.get_host("vm2").vars["prism_central"], "pc2")
+
+    def test_missing_hostname(self):
+        with self.assertRaises(AnsibleError):
+            self._parse(self._config(nutanix_hostname=None))
@@ -0,0 +1,121 @@
+from __future__ import absolute_import, division, print_function
+
+import json
+
+from ansible_collections.nutanix.ncp.plugins.module_utils.prism.batch import Batch
+from ansible_collections.nutanix.ncp.plugins.module_utils.prism.categories import (
+    CategoryValue,
+)
+from ansible_collections.nutanix.ncp.plugins.module_utils.prism.vms import VM
+from ansible_collections.nutanix.ncp.tests.unit.compat import unittest
+from ansible_collections.nutanix.ncp.tests.unit.compat.mock import MagicMock
+from ansible_collections.nutanix.ncp.tests.unit.plugins.modules.utils import (
+    AnsibleFailJson,
+    set_temp_home,
+)
+
+__metaclass__ = type
+
+
+class Module:
+    def __init__(self):
+        self.params = {
+            "nutanix_host": "99.99.99.99",
+            "nutanix_port": "9440",
+            "nutanix_username": "username",
+            "nutanix_password": "password",
+            "load_params_without_defaults": False,
+        }
+
+    def jsonify(self, data):
+        return json.dumps(data)
+
+    def fail_json(self, **kwargs):
+        raise AnsibleFailJson(kwargs)
+
+
+def _batch_fetch_url(url, method, data=None, **kwargs):
+    """Mock batch api, failing requests to values named 'fail'"""
+    api_responses = []
+    for api_request in data["api_request_list"]:
+        path = api_request["path_and_params"]
+        if path.endswith("/fail"):
+            status, body = "404", json.dumps({"message": "not found"})
+        else:
+            status = "202"
+            body = {
+                "status": {"execution_context": {"task_uuid": "task-" + path}},
+                "request": api_request,
+            }
+        api_responses.append(
+            {"status": status, "api_response": body, "path_and_params": path}
+        )
+    return {"api_response_list": api_responses}
+
+
+class TestBatch(unittest.TestCase):
+    def setUp(self):
+        set_temp_home(self)
+
+        self.module = Module()
+        self.batch = Batch(self.module)
+        self.batch._fetch_url = MagicMock(side_effect=_batch_fetch_url)
+
+    def test_requests_sent_in_chunks(self):
+        value = CategoryValue(self.module)
+        for i in range(130):
+            self.batch.add_delete(value, endpoint="key/value{0}".format(i))
+        results = self.batch.execute()
+
+        self.assertEqual(self.batch._fetch_url.call_count, 3)
+        self.assertEqual(len(results), 130)
+        for i, result in enumerate(results):
+            path = "/api/nutanix/v3/categories/key/value{0}".format(i)
+            self.assertEqual(result["status_code"], 202)
+            self.assertEqual(result["task_uuid"], "task-" + path)
+            self.assertEqual(
+                result["response"]["request"],
+                {"operation": "DELETE", "path_and_params": path},
+            )
+        self.assertEqual(self.batch.requests, [])
+
+    def test_request_specs(self):
+        vm = VM(self.module)
+        self.batch.add_create(vm, data={"spec": {}})
+        self.batch.add_update(vm, data={"spec": {}}, uuid="uuid1")
+        self.batch.add_delete(vm, uuid="uuid2")
+        self.batch._fetch_url.side_effect = None
+        self.batch._fetch_url.return_value = {"api_response_list": []}
+        self.batch.execute(raise_error=False)
+
+        data = self.batch._fetch_url.call_args[1]["data"]
+        self.assertEqual(
+            data["api_request_list"],
+            [
+                {
+                    "operation": "POST",
+                    "path_and_params": "/api/nutanix/v3/vms",
+                    "body": {"spec": {}},
+                },
+                {
+                    "operation": "PUT",
+                    "path_and_params": "/api/nutanix/v3/vms/uuid1",
+                    "body": {"spec": {}},
+                },
+                {"operation": "DELETE", "path_and_params": "/api/nutanix/v3/vms/uuid2"},
+            ],
+        )
+
+    def test_failed_requests(self):
+        value = CategoryValue(self.module)
+        self.batch.add_delete(value, endpoint="key/value")
+        self.batch.add_delete(value, endpoint="key/fail")
+        results = self.batch.execute(raise_error=False)
+        self.assertEqual(results[1]["status_code"], 404)
+        self.assertEqual(results[1]["response"], {"message": "not found"})
+        self.assertIsNone(results[1]["task_uuid"])
+
+        self.batch.add_delete(value, endpoint="key/fail")
+        with self.assertRaises(AnsibleFailJson) as error:
+            self.batch.execute()
+        self.assertEqual(error.exception.args[0]["status_code"], 404)
@@ -0,0 +1,126 @@
+from __future__ import absolute_import, division, print_function
+
+import gzip
+import io
+import json
+import threading
+import zlib
+
+from ansible.module_utils.six.moves import BaseHTTPServer
+from ansible.module_utils.six.moves.http_cookiejar import CookieJar
+from ansible_collections.nutanix.ncp.plugins.module_utils.connection_pool import (
+    ConnectionPool,
+    DecompressingResponse,
+)
+from ansible_collections.nutanix.ncp.tests.unit.compat import unittest
+
+__metaclass__ = type
+
+
+class Handler(BaseHTTPServer.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        data = self.rfile.read(length)
+        self.server.client_ports.add(self.client_address[1])
+        self.server.cookies.append(self.headers.get("Cookie"))
+        status = 404 if self.path == "/missing" else 200
+        body = json.dumps({"path": self.path, "data": data.decode()}).encode()
+        self.server.accept_encodings.append(self.headers.get("Accept-Encoding"))
+        self.send_response(status)
+        if "gzip" in (self.headers.get("Accept-Encoding") or ""):
+            body = gzip.compress(body)
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Set-Cookie", "session=abc; Path=/")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestConnectionPool(unittest.TestCase):
+    def setUp(self):
+        self.server = BaseHTTPServer.HTTPServer(("127.0.0.1", 0), Handler)
+        self.server.client_ports = set()
+        self.server.cookies = []
+        self.server.accept_encodings = []
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+        self.url = "http://127.0.0.1:{0}".format(self.server.server_port)
+        self.pool = ConnectionPool()
+
+    def tearDown(self):
+        self.pool.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_connection_reused(self):
+        for i in range(3):
+            resp, info = self.pool.request(
+                self.url + "/list?page={0}".format(i), method="POST", data="{}"
+            )
+            self.assertEqual(info["status"], 200)
+            self.assertEqual(
+                json.loads(resp.read())["path"], "/list?page={0}".format(i)
+            )
+        self.assertEqual(len(self.server.client_ports), 1)
+
+    def test_error_body_in_info(self):
+        resp, info = self.pool.request(self.url + "/missing", method="POST", data="x")
+        self.assertIsNone(resp)
+        self.assertEqual(info["status"], 404)
+        self.assertEqual(json.loads(info["body"])["data"], "x")
+
+        # connection is still usable after error response
+        resp, info = self.pool.request(self.url + "/list", method="POST", data="{}")
+        self.assertEqual(info["status"], 200)
+        resp.read()
+        self.assertEqual(len(self.server.client_ports), 1)
+
+    def test_cookies(self):
+        cookies = CookieJar()
+        for i in range(2):
+            resp, info = self.pool.request(
+                self.url + "/list", method="POST", data="{}", cookies=cookies
+            )
+            resp.read()
+        self.assertEqual(self.server.cookies, [None, "session=abc"])
+
+    def test_connection_failure(self):
+        self.server.shutdown()
+        self.server.server_close()
+        resp, info = self.pool.request(self.url + "/list", method="POST", data="{}")
+        self.assertIsNone(resp)
+        self.assertEqual(info["status"], -1)
+        self.assertTrue(info["msg"].startswith("Request failed"))
+
+    def test_compression(self):
+        stats = {"compressed_bytes": 0, "decompressed_bytes": 0}
+        body = json.dumps({"entities": [{"name": "vm"}] * 1000}).encode()
+        for encoding, wbits in (("gzip", 31), ("deflate", 15), ("deflate", -15)):
+            compressor = zlib.compressobj(9, zlib.DEFLATED, wbits)
+            raw = io.BytesIO(compressor.compress(body) + compressor.flush())
+            resp = DecompressingResponse(raw, encoding, stats)
+            chunks = []
+            while True:
+                chunk = resp.read(1024)
+                if not chunk:
+                    break
+                self.assertLessEqual(len(chunk), 1024)
+                chunks.append(chunk)
+            self.assertEqual(b"".join(chunks), body)
+        self.assertEqual(stats["decompressed_bytes"], 3 * len(body))
+        self.assertLess(stats["compressed_bytes"], len(body) // 10)
+
+    def test_compressed_response(self):
+        resp, info = self.pool.request(
+            self.url + "/gzip", method="POST", data="{}", compression=True
+        )
+        self.assertEqual(json.loads(resp.read())["path"], "/gzip")
+        self.assertGreater(self.pool.stats["compressed_bytes"], 0)
+        self.assertEqual(self.server.accept_encodings, ["gzip, deflate"])
@@ -1,22 +1,31 @@
 from __future__ import absolute_import, division, print_function
 
+import io
 import json
 from base64 import b64encode
 
 from ansible.module_utils.six.moves.urllib.parse import urlparse
-from ansible_collections.nutanix.ncp.plugins.module_utils.entity import Entity
+from ansible_collections.nutanix.ncp.plugins.module_utils.entity import (
+    Entity,
+    last_fetch,
+)
+from ansible_collections.nutanix.ncp.plugins.module_utils.json_stream import (
+    JSONStreamDecoder,
+)
+from ansible_collections.nutanix.ncp.plugins.module_utils.pagination import page_sizers
 from ansible_collections.nutanix.ncp.tests.unit.plugins.modules.utils import (
     AnsibleExitJson,
     AnsibleFailJson,
     ModuleTestCase,
+    set_temp_home,
 )
 
 __metaclass__ = type
 
 try:
-    from unittest.mock import MagicMock
+    from unittest.mock import MagicMock, patch
 except Exception:
-    from mock import MagicMock
+    from mock import MagicMock, patch
 
 
 class Module:
@@ -70,15 +79,22 @@ def fail_json(*args, **kwargs):
 class TestEntity(ModuleTestCase):
     def setUp(self):
         self.module = Module()
-        Entity._fetch_url = MagicMock(side_effect=_fetch_url)
-        Entity._upload_file = MagicMock(side_effect=_upload_file)
-        Entity._get_default_spec = MagicMock(side_effect=lambda: {})
-        Entity.build_spec_methods = {
-            "test_param": lambda s, v: ({"test_param": v}, None)
-        }
+        entity_patcher = patch.multiple(
+            Entity,
+            create=True,
+            _fetch_url=MagicMock(side_effect=_fetch_url),
+            _upload_file=MagicMock(side_effect=_upload_file),
+            _get_default_spec=MagicMock(side_effect=lambda: {}),
+            build_spec_methods={"test_param": lambda s, v: ({"test_param": v}, None)},
+        )
+        entity_patcher.start()
+        self.addCleanup(entity_patcher.stop)
+        # keep uuid cache of tests out of user home
+        set_temp_home(self)
         self.entity = Entity(self.module, resource_type="/test")
         self.module.exit_json = MagicMock(side_effect=exit_json)
         self.module.fail_json = MagicMock(side_effect=fail_json)
+        page_sizers.clear()
 
     def test_create_action(self):
         data = {}
@@ -255,3 +271,149 @@ class TestEntity(ModuleTestCase):
         spec2 = {"k2": "v2", "k3": "v3", "k4": "v4"}
         expected = {"k2": "v2", "k3": "v3"}
         self.assertEqual(self.entity.unify_spec(spec1, spec2), expected)
+
+    def test_list_pages_concurrently(self):
+        entities = [{"metadata": {"uuid": str(i)}} for i in range(50)]
+
+        def paginated_fetch_url(url, method, data=None, **kwargs):
+            # fail requests without pagination to enforce fallback
+            if data.get("length") is None or data["length"] > 20:
+                return None
+            offset = data.get("offset", 0)
+            return {
+                "entities": entities[offset : offset + data["length"]],
+                "metadata": {"total_matches": len(entities)},
+            }
+
+        self.module.params["list_concurrency"] = 4
+        self.entity._fetch_url = MagicMock(side_effect=paginated_fetch_url)
+        result = self.entity.list({})
+        self.assertEqual(result["entities"], entities)
+        self.assertEqual(result["metadata"]["length"], 50)
+        self.assertEqual(result["metadata"]["offset"], 0)
+        # list without pagination, pages of 500, 250, 125, 62 and 31 fail
+        # then first page of 20 followed by two concurrent pages
+        self.assertEqual(self.entity._fetch_url.call_count, 9)
+
+        self.entity._fetch_url.reset_mock()
+        result = self.entity.list({"offset": 5, "length": 30})
+        self.assertEqual(result["entities"], entities[5:35])
+        self.assertEqual(result["metadata"]["length"], 30)
+
+    def test_list_entities(self):
+        entities = [
+            {"metadata": {"uuid": str(i)}, "spec": {"i": i % 2}} for i in range(45)
+        ]
+
+        def stream_fetch_url(url, method, data=None, **kwargs):
+            offset = data.get("offset", 0)
+            body = {
+                "entities": entities[offset : offset + data["length"]],
+                "metadata": {"total_matches": len(entities)},
+            }
+            return JSONStreamDecoder(io.BytesIO(json.dumps(body).encode("utf-8")))
+
+        self.entity._fetch_url = MagicMock(side_effect=stream_fetch_url)
+        result = list(self.entity.list_entities({"offset": 0}))
+        self.assertEqual(result, entities)
+        self.assertEqual(self.entity._fetch_url.call_count, 3)
+
+        result = list(self.entity.list_entities({"offset": 10, "length": 25}))
+        self.assertEqual(result, entities[10:35])
+
+        self.module.params["custom_filter"] = {"i": 1}
+        result = list(self.entity.list_entities({}))
+        self.assertEqual(result, entities[1::2])
+
+    def test_list_adaptive_page_size(self):
+        entities = [{"metadata": {"uuid": str(i)}} for i in range(1200)]
+        lengths = []
+
+        def paginated_fetch_url(url, method, data=None, **kwargs):
+            lengths.append(data.get("length"))
+            if data.get("length") is None or data["length"] > 300:
+                return None
+            offset = data.get("offset", 0)
+            return {
+                "entities": entities[offset : offset + min(data["length"], 200)],
+                "metadata": {"total_matches": len(entities)},
+            }
+
+        self.entity._fetch_url = MagicMock(side_effect=paginated_fetch_url)
+        result = self.entity.list({})
+        self.assertEqual(result["entities"], entities)
+        # 250 is capped to 200 by server, page length which failed is not retried
+        self.assertEqual(lengths, [None, 500, 250, 200, 200, 200, 200, 200])
+
+        # page size is remembered for the resource
+        lengths[:] = []
+        result = self.entity.list({"offset": 1000})
+        self.assertEqual(result["entities"], entities[1000:])
+        self.assertEqual(lengths, [None, 200])
+
+    def test_list_page_error_not_shrinked(self):
+        lengths = []
+        error = {"code": 400, "message_list": [{"message": "invalid filter"}]}
+
+        def failing_fetch_url(url, method, data=None, **kwargs):
+            lengths.append(data.get("length"))
+            if data.get("length") is None:
+                # listing all entities at once times out
+                last_fetch.status_code = -1
+                return None
+            last_fetch.status_code = 400
+            return error
+
+        self.entity._fetch_url = MagicMock(side_effect=failing_fetch_url)
+        # errors not caused by page length are reported without retries
+        self.assertEqual(self.entity.list({}, raise_error=False), error)
+        self.assertEqual(lengths, [None, 500])
+
+        lengths[:] = []
+        with self.assertRaises(AnsibleFailJson) as failure:
+            self.entity.list({})
+        self.assertEqual(lengths, [None, 500])
+        self.assertEqual(failure.exception.args[0]["status_code"], 400)
+        self.assertEqual(failure.exception.args[0]["response"], error)
+
+        # first error is reported once page length can't be shrinked any more
+        lengths[:] = []
+        statuses = [503, 504]
+
+        def unavailable_fetch_url(url, method, data=None, **kwargs):
+            lengths.append(data.get("length"))
+            last_fetch.status_code = statuses.pop(0) if statuses else -1
+            last_fetch.error = "Status {0}".format(last_fetch.status_code)
+
+        self.entity._fetch_url = MagicMock(side_effect=unavailable_fetch_url)
+        with self.assertRaises(AnsibleFailJson) as failure:
+            self.entity.list({})
+        self.assertEqual(lengths, [None, 500, 250, 125, 62, 31, 20])
+        self.assertEqual(failure.exception.args[0]["status_code"], 504)
+        self.assertEqual(failure.exception.args[0]["error"], "Status 504")
+
+    def test_list_page_length_error(self):
+        entities = [{"metadata": {"uuid": str(i)}} for i in range(250)]
+        lengths = []
+
+        def limited_fetch_url(url, method, data=None, **kwargs):
+            lengths.append(data.get("length"))
+            if data.get("length") is None:
+                last_fetch.status_code = -1
+                return None
+            if data["length"] > 100:
+                last_fetch.status_code = 422
+                return {"message_list": [{"message": "length must be <= 100"}]}
+            # total matches are not reported, pages are listed till empty one
+            offset = data.get("offset", 0)
+            last_fetch.status_code = 200
+            return {
+                "entities": entities[offset : offset + min(data["length"], 80)],
+                "metadata": {},
+            }
+
+        self.entity._fetch_url = MagicMock(side_effect=limited_fetch_url)
+        result = self.entity.list({})
+        self.assertEqual(result["entities"], entities)
+        # length grown back after fast page fails again, and is not tried again
+        self.assertEqual(lengths, [None, 500, 250, 125, 62, 124, 62, 62, 62, 62, 62])
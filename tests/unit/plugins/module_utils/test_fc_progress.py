@@ -0,0 +1,136 @@
+from __future__ import absolute_import, division, print_function
+
+from ansible_collections.nutanix.ncp.plugins.module_utils.fc.progress import (
+    ImagingProgress,
+)
+from ansible_collections.nutanix.ncp.tests.unit.compat import unittest
+from ansible_collections.nutanix.ncp.tests.unit.compat.mock import MagicMock, patch
+
+__metaclass__ = type
+
+
+class Module:
+    def __init__(self):
+        self.params = {
+            "nutanix_host": "99.99.99.99",
+            "nutanix_port": "9440",
+            "nutanix_username": "username",
+            "nutanix_password": "password",
+        }
+
+
+def _cluster(percent, stopped=False, nodes=None):
+    return {
+        "cluster_status": {
+            "aggregate_percent_complete": percent,
+            "imaging_stopped": stopped,
+            "cluster_creation_started": False,
+            "cluster_progress_details": None,
+            "node_progress_details": nodes or [],
+        }
+    }
+
+
+def _node(uuid, percent, status="Imaging", stopped=False):
+    return {
+        "imaged_node_uuid": uuid,
+        "percent_complete": percent,
+        "status": status,
+        "imaging_stopped": stopped,
+    }
+
+
+class TestImagingProgress(unittest.TestCase):
+    def setUp(self):
+        self.clock = [1000.0]
+        self.waits = []
+
+        def sleep(seconds):
+            self.waits.append(seconds)
+            self.clock[0] += seconds
+
+        for target, side_effect in (
+            ("time.time", lambda: self.clock[0]),
+            ("time.sleep", sleep),
+        ):
+            patcher = patch(target, side_effect=side_effect)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.progress = ImagingProgress(Module())
+
+    def test_polled_from_start(self):
+        self.progress.imaged_cluster.read = MagicMock(
+            side_effect=[
+                {"cluster_status": None},
+                _cluster(0),
+                _cluster(0),
+                _cluster(50),
+                _cluster(100, stopped=True),
+            ]
+        )
+        resp, err = self.progress.wait_for_completion("uuid")
+        self.assertIsNone(err)
+        self.assertEqual(self.progress.polls, 5)
+        # no initial sleep, status not being there yet is taken as not started
+        # and polls back off while progress stays put
+        self.assertEqual(self.waits, [5, 5, 7.5, 5])
+        self.assertEqual(
+            [
+                h["progress"]["aggregate_percent_complete"]
+                for h in self.progress.history
+            ],
+            [None, 0, 50, 100],
+        )
+
+    def test_failed_pre_checks(self):
+        failed = _node("node1", 0, status="Pre-checks failed", stopped=True)
+        self.progress.imaged_cluster.read = MagicMock(
+            side_effect=[_cluster(0), _cluster(0, nodes=[failed])]
+        )
+        resp, err = self.progress.wait_for_completion("uuid")
+        self.assertIn("Pre-checks failed", err)
+        self.assertLess(self.clock[0] - 1000, 10)
+
+    def test_nodes_available(self):
+        # node reads are sent together for pending nodes
+        states = {"node1": ["STATE_AVAILABLE"], "node2": ["STATE_IMAGING"] * 2}
+
+        def read(uuid):
+            state = states.get(uuid) and states[uuid].pop(0) or "STATE_AVAILABLE"
+            return {"imaged_node_uuid": uuid, "node_state": state}
+
+        self.progress.imaged_node.read = MagicMock(side_effect=read)
+        run_concurrently = self.progress.imaged_node.run_concurrently
+        self.progress.imaged_node.run_concurrently = MagicMock(
+            side_effect=run_concurrently
+        )
+        result, err = self.progress.wait_for_nodes_available(["node1", "node2"])
+        self.assertIsNone(err)
+        self.assertEqual(
+            result, {"node1": "STATE_AVAILABLE", "node2": "STATE_AVAILABLE"}
+        )
+        self.assertEqual(self.progress.imaged_node.read.call_count, 2 + 1 + 1)
+        self.assertEqual(
+            [
+                c[1]["workers"]
+                for c in self.progress.imaged_node.run_concurrently.call_args_list
+            ],
+            [2, 1, 1],
+        )
+
+        # threads are bounded however many nodes are pending
+        self.progress.max_poll_workers = 2
+        self.progress.imaged_node.run_concurrently.reset_mock()
+        result, err = self.progress.wait_for_nodes_available(["node1", "node2", "n3"])
+        self.assertIsNone(err)
+        self.assertEqual(
+            self.progress.imaged_node.run_concurrently.call_args[1]["workers"], 2
+        )
+
+    def test_nodes_not_available(self):
+        self.progress.imaged_node.read = MagicMock(
+            return_value={"node_state": "STATE_IMAGING"}
+        )
+        result, err = self.progress.wait_for_nodes_available(["node1"])
+        self.assertEqual(err, "Timeout. Nodes are in node1: STATE_IMAGING\n")
@@ -0,0 +1,53 @@
+from __future__ import absolute_import, division, print_function
+
+import io
+import json
+
+from ansible_collections.nutanix.ncp.plugins.module_utils.json_stream import (
+    JSONStreamDecoder,
+)
+from ansible_collections.nutanix.ncp.tests.unit.compat import unittest
+
+__metaclass__ = type
+
+
+class TestJSONStreamDecoder(unittest.TestCase):
+    def setUp(self):
+        self.response = {
+            "api_version": "3.1",
+            "metadata": {"total_matches": 3, "length": 3},
+            "entities": [
+                {"metadata": {"uuid": "1"}, "spec": {"name": 'vm-é"1'}},
+                {"metadata": {"uuid": "2"}, "spec": {"cores": 12345}},
+                {"metadata": {"uuid": "3"}, "spec": {"list": [1, 2, [3]]}},
+            ],
+            "trailer": 42,
+        }
+        self.body = json.dumps(self.response, indent=2).encode("utf-8")
+
+    def test_decode(self):
+        for chunk_size in (1, 7, 65536):
+            decoder = JSONStreamDecoder(io.BytesIO(self.body), chunk_size=chunk_size)
+            self.assertEqual(decoder.decode(), self.response)
+            self.assertEqual(decoder.bytes_read, len(self.body))
+
+    def test_iterate_entities(self):
+        decoder = JSONStreamDecoder(io.BytesIO(self.body), chunk_size=5)
+        entities = []
+        for entity in decoder:
+            entities.append(entity)
+            # buffer holds at most a chunk more than current entity
+            self.assertLess(len(decoder.unparsed_text()), 100)
+        self.assertEqual(entities, self.response["entities"])
+        self.assertEqual(decoder.envelope["metadata"]["total_matches"], 3)
+        self.assertEqual(decoder.envelope["trailer"], 42)
+
+    def test_top_level_array_and_scalars(self):
+        for doc in ([{"id": 1}, {"id": 2}], [], {}, "text", 1234, None):
+            body = io.BytesIO(json.dumps(doc).encode("utf-8"))
+            self.assertEqual(JSONStreamDecoder(body, chunk_size=2).decode(), doc)
+
+    def test_invalid_json(self):
+        for body in (b"", b"<html>error</html>", b'{"entities": [{"a": 1},'):
+            decoder = JSONStreamDecoder(io.BytesIO(body), chunk_size=4)
+            self.assertRaises(ValueError, decoder.decode)
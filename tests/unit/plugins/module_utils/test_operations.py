@@ -0,0 +1,150 @@
+from __future__ import absolute_import, division, print_function
+
+from ansible_collections.nutanix.ncp.plugins.module_utils.ndb.operations import (
+    Operation,
+)
+from ansible_collections.nutanix.ncp.tests.unit.compat import unittest
+from ansible_collections.nutanix.ncp.tests.unit.compat.mock import MagicMock, patch
+from ansible_collections.nutanix.ncp.tests.unit.plugins.modules.utils import (
+    AnsibleFailJson,
+)
+
+__metaclass__ = type
+
+
+class Module:
+    def __init__(self, **kwargs):
+        self.params = {
+            "server": "99.99.99.99",
+            "timeout": 35 * 60,
+        }
+        self.params.update(kwargs)
+
+    def fail_json(self, **kwargs):
+        raise AnsibleFailJson(kwargs)
+
+
+def _operation(status, percentage="0", steps=None):
+    return {
+        "status": status,
+        "percentageComplete": percentage,
+        "steps": steps or [],
+        "message": "operation message",
+    }
+
+
+class TestOperationWait(unittest.TestCase):
+    def setUp(self):
+        self.clock = [1000.0]
+        self.waits = []
+
+        def sleep(seconds):
+            self.waits.append(seconds)
+            self.clock[0] += seconds
+
+        for target, side_effect in (
+            ("time.time", lambda: self.clock[0]),
+            ("time.sleep", sleep),
+        ):
+            patcher = patch(target, side_effect=side_effect)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _operations(self, read, **params):
+        operations = Operation(Module(**params))
+        operations.read = MagicMock(side_effect=read)
+        return operations
+
+    def test_read_retried_till_operation_exists(self):
+        not_found = {"errorCode": "ERA-0", "message": "Operation not found"}
+        responses = [None, not_found, _operation("5", "100")]
+        operations = self._operations(responses)
+        resp = operations.wait_for_completion("uuid")
+        self.assertEqual(resp["status"], "5")
+        self.assertEqual(operations.polls, 3)
+        # no fixed sleep before operation is found
+        self.assertEqual(self.waits, [0.5, 0.75])
+
+    def test_backoff_without_progress(self):
+        responses = [_operation("1")] * 10 + [_operation("5", "100")]
+        operations = self._operations(responses)
+        operations.wait_for_completion("uuid", delay=5)
+        self.assertEqual(self.waits[:3], [1.5, 2.25, 3.375])
+        self.assertEqual(max(self.waits), 5)
+
+    def test_poll_as_per_progress(self):
+        def read(uuid, **kwargs):
+            # operation progresses 1% per second
+            percentage = min(100, int(self.clock[0] - 1000))
+            if percentage == 100:
+                return _operation("5", "100")
+            return _operation("1", str(percentage))
+
+        operations = self._operations(read)
+        operations.wait_for_completion("uuid")
+        # polls back off, and are scheduled earlier towards completion
+        self.assertGreater(max(self.waits), 10)
+        self.assertLess(self.waits[-1], 30)
+        self.assertLess(self.clock[0], 1100 + 15)
+        self.assertLess(operations.polls, 20)
+
+    def test_poll_as_per_steps(self):
+        def read(uuid, **kwargs):
+            # operation completes one of its ten steps per 10 seconds
+            completed = min(10, int(self.clock[0] - 1000) // 10)
+            steps = [{"status": "5"}] * completed + [{"status": "1"}] * (10 - completed)
+            resp = _operation("5" if completed == 10 else "1", steps=steps)
+            resp.pop("percentageComplete")
+            return resp
+
+        operations = self._operations(read)
+        operations.wait_for_completion("uuid")
+        self.assertLess(self.waits[-1], 30)
+        self.assertLess(self.clock[0], 1100 + 15)
+
+    def test_failed_operation(self):
+        operations = self._operations([_operation("1"), _operation("4")])
+        with self.assertRaises(AnsibleFailJson) as error:
+            operations.wait_for_completion("uuid")
+        self.assertEqual(error.exception.args[0]["msg"], "operation message")
+
+        operations = self._operations([_operation("4")])
+        resp = operations.wait_for_completion("uuid", raise_error=False)
+        self.assertEqual(resp["status"], "4")
+
+    def test_timeout(self):
+        operations = self._operations(
+            lambda uuid, **kwargs: _operation("1"), timeout=120
+        )
+        with self.assertRaises(AnsibleFailJson):
+            operations.wait_for_completion("uuid")
+        self.assertLess(self.clock[0], 1120 + 30)
+
+    def test_wait_for_all(self):
+        # operations complete after given number of reads
+        reads_left = {"op1": 1, "op2": 3, "op3": 0}
+
+        def read(uuid, **kwargs):
+            if reads_left[uuid]:
+                reads_left[uuid] -= 1
+                return _operation("1")
+            return _operation("5", "100")
+
+        operations = self._operations(read)
+        responses = operations.wait_for_all(["op1", "op2", "op3", "op1"])
+        self.assertEqual(sorted(responses), ["op1", "op2", "op3"])
+        self.assertTrue(all(r["status"] == "5" for r in responses.values()))
+        self.assertEqual(operations.polls, 4)
+        self.assertEqual(operations.read.call_count, 3 + 2 + 1 + 1)
+
+    def test_wait_for_all_failed(self):
+        def read(uuid, **kwargs):
+            return _operation("4" if uuid == "failed" else "5")
+
+        operations = self._operations(read)
+        with self.assertRaises(AnsibleFailJson) as error:
+            operations.wait_for_all(["op1", "failed"])
+        self.assertEqual(error.exception.args[0]["msg"], "1 of 2 operations failed")
+
+        responses = operations.wait_for_all(["failed"], raise_error=False)
+        self.assertEqual(responses["failed"]["status"], "4")
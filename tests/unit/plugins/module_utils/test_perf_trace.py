@@ -0,0 +1,112 @@
+from __future__ import absolute_import, division, print_function
+
+import io
+import json
+
+from ansible_collections.nutanix.ncp.plugins.module_utils import perf_trace
+from ansible_collections.nutanix.ncp.plugins.module_utils.entity import Entity
+from ansible_collections.nutanix.ncp.plugins.module_utils.perf_trace import (
+    PerfTracer,
+    add_request_stats,
+)
+from ansible_collections.nutanix.ncp.tests.unit.compat import unittest
+from ansible_collections.nutanix.ncp.tests.unit.compat.mock import MagicMock, patch
+
+__metaclass__ = type
+
+
+class Module:
+    def __init__(self, **params):
+        self.params = {
+            "nutanix_host": "99.99.99.99",
+            "nutanix_username": "username",
+            "nutanix_password": "password",
+        }
+        self.params.update(params)
+
+    def jsonify(self, data):
+        return json.dumps(data)
+
+
+class TestPerfTracer(unittest.TestCase):
+    def setUp(self):
+        self.tracer = PerfTracer()
+        patcher = patch.object(perf_trace, "perf_tracer", self.tracer)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        # entity module refers tracer of the module run
+        patcher = patch(
+            "ansible_collections.nutanix.ncp.plugins.module_utils.entity.perf_tracer",
+            self.tracer,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_url_template(self):
+        url = "https://1.1.1.1:9440/api/nutanix/v3/vms/4e0de7b5-35b4-4cd1-a2e5-9e5e76c0c9c2/export?x=1"
+        self.assertEqual(
+            PerfTracer.get_url_template(url), "/api/nutanix/v3/vms/{uuid}/export"
+        )
+        self.assertEqual(
+            PerfTracer.get_url_template("http://1.1.1.1/era/v0.9/ops/123"),
+            "/era/v0.9/ops/{id}",
+        )
+
+    def test_summary(self):
+        for latency, status in ((1.0, 200), (3.0, 200), (2.0, 503)):
+            record = self.tracer.start("GET", "https://h/api/vms/1", bytes_sent=10)
+            self.tracer.finish(record, status, bytes_received=100, retries=1)
+            record["latency"] = latency
+        self.tracer.start("GET", "https://h/api/vms/1")  # not finished
+
+        summary = self.tracer.summary()
+        self.assertEqual(summary["calls"], 3)
+        self.assertEqual(summary["total_latency"], 6.0)
+        self.assertEqual(summary["p95_latency"], 3.0)
+        self.assertEqual(
+            summary["endpoints"],
+            [
+                {
+                    "endpoint": "GET /api/vms/{id}",
+                    "calls": 3,
+                    "total_latency": 6.0,
+                    "p95_latency": 3.0,
+                    "bytes_sent": 30,
+                    "bytes_received": 300,
+                    "retries": 3,
+                    "statuses": {"200": 2, "503": 1},
+                }
+            ],
+        )
+
+    def test_entity_calls_traced(self):
+        body = b'{"entities": [{"a": 1}, {"a": 2}], "metadata": {"total_matches": 2}}'
+        entity = Entity(Module(perf_trace=True), resource_type="/vms")
+        entity._send_request = MagicMock(
+            side_effect=lambda *args, **kwargs: (io.BytesIO(body), {"status": 200})
+        )
+        entity.list({"length": 10})
+        list(entity.list_entities({}))
+        entity._send_request.side_effect = None
+        entity._send_request.return_value = (None, {"status": 404, "body": b"{}"})
+        entity.read("uuid", raise_error=False)
+
+        summary = add_request_stats({"perf_trace": True}, {})["perf_trace"]
+        self.assertEqual(summary["calls"], 3)
+        self.assertEqual(summary["bytes_received"], 2 * len(body) + 2)
+        endpoints = dict((e["endpoint"], e) for e in summary["endpoints"])
+        self.assertEqual(endpoints["POST /vms/list"]["calls"], 2)
+        self.assertEqual(
+            endpoints["POST /vms/list"]["bytes_sent"],
+            len('{"length": 10}') + len('{"offset": 0, "length": 20}'),
+        )
+        self.assertEqual(endpoints["GET /vms/uuid"]["statuses"], {"404": 1})
+
+    def test_not_traced_by_default(self):
+        entity = Entity(Module(), resource_type="/vms")
+        entity._send_request = MagicMock(
+            return_value=(io.BytesIO(b"{}"), {"status": 200})
+        )
+        entity.read("uuid")
+        self.assertEqual(self.tracer.records, [])
+        self.assertNotIn("perf_trace", add_request_stats({}, {}))
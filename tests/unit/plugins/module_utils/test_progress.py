@@ -0,0 +1,147 @@
+from __future__ import absolute_import, division, print_function
+
+import json
+import os
+import shutil
+import tempfile
+
+from ansible_collections.nutanix.ncp.plugins.module_utils.foundation.progress import (
+    Progress,
+)
+from ansible_collections.nutanix.ncp.tests.unit.compat import unittest
+from ansible_collections.nutanix.ncp.tests.unit.compat.mock import MagicMock, patch
+
+__metaclass__ = type
+
+
+class Module:
+    def __init__(self, **kwargs):
+        self.params = {
+            "nutanix_host": "99.99.99.99",
+            "nutanix_port": "8000",
+            "timeout": 60,
+        }
+        self.params.update(kwargs)
+
+
+def _progress(nodes, stopped=False):
+    return {
+        "session_id": "session",
+        "imaging_stopped": stopped,
+        "aggregate_percent_complete": sum(n["percent_complete"] for n in nodes)
+        // len(nodes),
+        "nodes": nodes,
+        "clusters": [],
+    }
+
+
+def _node(ip, percent, status="Running", messages=None):
+    return {
+        "cvm_ip": ip,
+        "percent_complete": percent,
+        "status": status,
+        "messages": messages or [],
+    }
+
+
+class TestProgressWait(unittest.TestCase):
+    def setUp(self):
+        self.clock = [1000.0]
+        self.waits = []
+
+        def sleep(seconds):
+            self.waits.append(seconds)
+            self.clock[0] += seconds
+
+        for target, side_effect in (
+            ("time.time", lambda: self.clock[0]),
+            ("time.sleep", sleep),
+        ):
+            patcher = patch(target, side_effect=side_effect)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+
+    def _progress(self, responses, **params):
+        progress = Progress(Module(**params))
+        progress.get = MagicMock(side_effect=responses)
+        return progress
+
+    def test_poll_as_per_progress(self):
+        responses = [_progress([_node("ip1", 0)])] * 4 + [
+            _progress([_node("ip1", 10)]),
+            _progress([_node("ip1", 20)]),
+            _progress([_node("ip1", 100)], stopped=True),
+        ]
+        progress = self._progress(responses)
+        resp, err = progress.wait_for_completion("session")
+        self.assertIsNone(err)
+        self.assertEqual(resp["aggregate_percent_complete"], 100)
+        self.assertEqual(progress.polls, 7)
+        # polls back off without progress and are frequent again once it moves
+        self.assertEqual(self.waits[:3], [7.5, 11.25, 16.875])
+        self.assertLess(self.waits[4], self.waits[3])
+        self.assertLess(self.waits[5], self.waits[4])
+
+    def test_stopped_before_completion(self):
+        node = _node("ip1", 50, messages=["error"])
+        progress = self._progress([_progress([node], stopped=True)])
+        resp, err = progress.wait_for_completion("session")
+        self.assertTrue(err.startswith("Imaging stopped before completion"))
+
+    def test_fail_fast(self):
+        failed = [_node("ip1", 30), _node("ip2", -1, status="Imaging failed")]
+        responses = [_progress([_node("ip1", 10), _node("ip2", 10)])] + [
+            _progress(failed)
+        ] * 100
+        progress = self._progress(responses, fail_fast=True)
+        resp, err = progress.wait_for_completion("session")
+        self.assertTrue(err.startswith("Imaging failed for nodes ip2"))
+        self.assertEqual(progress.polls, 2)
+
+        # without fail_fast, wait goes on till imaging stops
+        responses = [_progress(failed)] * 3 + [_progress(failed, stopped=True)]
+        progress = self._progress(responses)
+        resp, err = progress.wait_for_completion("session")
+        self.assertEqual(progress.polls, 4)
+
+    def test_stalled_node(self):
+        def get(uuid):
+            # ip1 progresses 1% per 10 seconds, ip2 is stuck at 10%
+            percent = min(99, 10 + int(self.clock[0] - 1000) // 10)
+            return _progress([_node("ip1", percent), _node("ip2", 10)])
+
+        progress = self._progress(get, stall_timeout=300)
+        resp, err = progress.wait_for_completion("session")
+        self.assertEqual(
+            err, "Imaging stalled for nodes ip2, no progress in 300 seconds"
+        )
+        self.assertLess(self.clock[0], 1000 + 300 + Progress.max_poll_interval)
+
+    def test_progress_log(self):
+        log_file = os.path.join(self.tmpdir, "progress.jsonl")
+        responses = [
+            _progress([_node("ip1", 0, messages=["started"])]),
+            _progress([_node("ip1", 50, messages=["started", "installing"])]),
+            _progress(
+                [_node("ip1", 100, messages=["started", "installing", "done"])],
+                stopped=True,
+            ),
+        ]
+        progress = self._progress(responses, progress_log=log_file)
+        progress.wait_for_completion("session")
+
+        with open(log_file) as f:
+            snapshots = [json.loads(line) for line in f]
+        self.assertEqual(len(snapshots), 3)
+        self.assertEqual(
+            [s["aggregate_percent_complete"] for s in snapshots], [0, 50, 100]
+        )
+        # only new messages are logged in each snapshot
+        self.assertEqual(
+            [s["nodes"][0]["messages"] for s in snapshots],
+            [["started"], ["installing"], ["done"]],
+        )
+        self.assertTrue(snapshots[-1]["imaging_stopped"])
@@ -0,0 +1,84 @@
+from __future__ import absolute_import, division, print_function
+
+import os
+import shutil
+import tempfile
+
+from ansible_collections.nutanix.ncp.plugins.module_utils.rate_limiter import (
+    RateLimiter,
+)
+from ansible_collections.nutanix.ncp.tests.unit.compat import unittest
+from ansible_collections.nutanix.ncp.tests.unit.compat.mock import patch
+
+__metaclass__ = type
+
+
+class TestRateLimiter(unittest.TestCase):
+    def setUp(self):
+        self.state_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.state_dir)
+
+        self.clock = [1000.0]
+        self.waits = []
+
+        def sleep(seconds):
+            self.waits.append(seconds)
+            self.clock[0] += seconds
+
+        for target, side_effect in (
+            ("time.time", lambda: self.clock[0]),
+            ("time.sleep", sleep),
+        ):
+            patcher = patch(target, side_effect=side_effect)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _limiter(self, **kwargs):
+        return RateLimiter("99.99.99.99:9440", state_dir=self.state_dir, **kwargs)
+
+    def test_rate_shared_across_limiters(self):
+        # limiters of two processes share tokens through state file
+        first, second = self._limiter(rate=2), self._limiter(rate=2)
+        first.acquire()
+        second.acquire()
+        self.assertEqual(self.waits, [])
+        first.acquire()
+        self.assertEqual(self.waits, [0.5])
+        second.acquire()
+        self.assertEqual(self.waits, [0.5, 0.5])
+
+    def test_max_in_flight(self):
+        first, second = self._limiter(max_in_flight=1), self._limiter(max_in_flight=1)
+        slot = first.acquire(timeout=10)
+        self.assertEqual(self.waits, [])
+        self.clock[0] += 5
+        first.release(slot)
+        second.acquire(timeout=10)
+        self.assertEqual(self.waits, [])
+
+        # slot of crashed process expires after timeout
+        first.acquire(timeout=10)
+        self.assertAlmostEqual(sum(self.waits), 10, delta=0.1)
+
+    def test_other_endpoint_not_limited(self):
+        self._limiter(rate=1).acquire()
+        RateLimiter("88.88.88.88:9440", rate=1, state_dir=self.state_dir).acquire()
+        self.assertEqual(self.waits, [])
+
+    def test_state_file_symlink_not_followed(self):
+        limiter = self._limiter(rate=2)
+        target = os.path.join(self.state_dir, "target")
+        os.symlink(target, limiter.state_file)
+        limiter.acquire()
+        limiter.acquire()
+        # state is kept in memory instead
+        self.assertFalse(os.path.exists(target))
+        self.assertEqual(limiter._local_state["tokens"], 0)
+
+    def test_default_state_dir(self):
+        with patch.dict(os.environ, {"HOME": self.state_dir}):
+            limiter = RateLimiter("99.99.99.99:9440", rate=2)
+        self.assertEqual(
+            os.path.dirname(limiter.state_file),
+            os.path.join(self.state_dir, ".ansible", "nutanix", "rate_limits"),
+        )
@@ -0,0 +1,113 @@
+from __future__ import absolute_import, division, print_function
+
+import io
+import json
+
+from ansible_collections.nutanix.ncp.plugins.module_utils import retry
+from ansible_collections.nutanix.ncp.plugins.module_utils.entity import Entity
+from ansible_collections.nutanix.ncp.plugins.module_utils.retry import RetryPolicy
+from ansible_collections.nutanix.ncp.tests.unit.compat import unittest
+from ansible_collections.nutanix.ncp.tests.unit.compat.mock import MagicMock, patch
+from ansible_collections.nutanix.ncp.tests.unit.plugins.modules.utils import (
+    set_temp_home,
+)
+
+__metaclass__ = type
+
+
+class Module:
+    def __init__(self, **params):
+        self.params = {
+            "nutanix_host": "99.99.99.99",
+            "nutanix_username": "username",
+            "nutanix_password": "password",
+        }
+        self.params.update(params)
+
+    def jsonify(self, data):
+        return json.dumps(data)
+
+
+class TestRetryPolicy(unittest.TestCase):
+    def setUp(self):
+        retry.retry_stats.update(retries=0, statuses={}, budget_exhausted=False)
+        self.url = "https://99.99.99.99:9440/api/nutanix/v3/vms"
+
+    def test_retryable_requests(self):
+        policy = RetryPolicy()
+        self.assertTrue(policy.is_retryable("GET", self.url + "/uuid"))
+        self.assertTrue(policy.is_retryable("POST", self.url + "/list"))
+        self.assertFalse(policy.is_retryable("POST", self.url))
+        self.assertFalse(policy.is_retryable("PUT", self.url + "/uuid"))
+        self.assertFalse(policy.is_retryable("DELETE", self.url + "/uuid"))
+
+    def test_get_delay(self):
+        policy = RetryPolicy(max_retries=2)
+        self.assertIsNone(policy.get_delay("GET", self.url, 0, {"status": 200}))
+        self.assertIsNone(policy.get_delay("GET", self.url, 0, {"status": 500}))
+        self.assertIsNone(policy.get_delay("PUT", self.url, 0, {"status": 503}))
+
+        for attempt in range(2):
+            delay = policy.get_delay("GET", self.url, attempt, {"status": 503})
+            self.assertTrue(0 <= delay <= 2**attempt)
+        self.assertIsNone(policy.get_delay("GET", self.url, 2, {"status": 503}))
+
+        delay = policy.get_delay(
+            "GET", self.url, 0, {"status": 429, "retry-after": "7"}
+        )
+        self.assertEqual(delay, 7)
+        self.assertEqual(retry.retry_stats["retries"], 3)
+        self.assertEqual(retry.retry_stats["statuses"], {"503": 2, "429": 1})
+
+    def test_retry_after_date(self):
+        delay = RetryPolicy.parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT")
+        self.assertEqual(delay, 0)
+        self.assertIsNone(RetryPolicy.parse_retry_after("soon"))
+
+    def test_budget(self):
+        policy = RetryPolicy()
+        policy.budget = 1
+        self.assertIsNotNone(policy.get_delay("GET", self.url, 0, {"status": -1}))
+        self.assertIsNone(policy.get_delay("GET", self.url, 0, {"status": -1}))
+        self.assertTrue(retry.retry_stats["budget_exhausted"])
+
+
+class TestEntityRetries(unittest.TestCase):
+    def setUp(self):
+        retry.retry_stats.update(retries=0, statuses={}, budget_exhausted=False)
+        # cached uuids are invalidated by create calls
+        set_temp_home(self)
+        self.mock_sleep = patch("time.sleep")
+        self.sleep = self.mock_sleep.start()
+        self.addCleanup(self.mock_sleep.stop)
+
+    def _responses(self, *statuses):
+        responses = []
+        for status in statuses:
+            if status == 200:
+                responses.append((io.BytesIO(b'{"entities": []}'), {"status": 200}))
+            else:
+                responses.append((None, {"status": status, "retry-after": "2"}))
+        return MagicMock(side_effect=responses)
+
+    def test_list_retried(self):
+        entity = Entity(Module(), resource_type="/vms")
+        entity._send_request = self._responses(503, 429, 200)
+        resp = entity.list({"length": 10})
+        self.assertEqual(resp, {"entities": []})
+        self.assertEqual(entity._send_request.call_count, 3)
+        self.sleep.assert_called_with(2)
+        self.assertEqual(retry.retry_stats["retries"], 2)
+
+    def test_create_not_retried(self):
+        entity = Entity(Module(), resource_type="/vms")
+        entity._send_request = self._responses(503, 200)
+        resp = entity.create({}, raise_error=False)
+        self.assertIsNone(resp)
+        self.assertEqual(entity._send_request.call_count, 1)
+
+    def test_max_retries(self):
+        entity = Entity(Module(max_retries=0), resource_type="/vms")
+        entity._send_request = self._responses(503, 200)
+        entity.read("uuid", raise_error=False)
+        self.assertEqual(entity._send_request.call_count, 1)
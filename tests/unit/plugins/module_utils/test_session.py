@@ -0,0 +1,177 @@
+from __future__ import absolute_import, division, print_function
+
+import hashlib
+import json
+import os
+import stat
+import threading
+import uuid
+
+from ansible.module_utils.six.moves import BaseHTTPServer
+from ansible_collections.nutanix.ncp.plugins.module_utils import session
+from ansible_collections.nutanix.ncp.plugins.module_utils.connection_pool import (
+    connection_pool,
+)
+from ansible_collections.nutanix.ncp.plugins.module_utils.entity import Entity
+from ansible_collections.nutanix.ncp.tests.unit.compat import unittest
+from ansible_collections.nutanix.ncp.tests.unit.plugins.modules.utils import (
+    set_temp_home,
+)
+
+__metaclass__ = type
+
+
+class Handler(BaseHTTPServer.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        token = None
+        for cookie in (self.headers.get("Cookie") or "").split(";"):
+            name, _, value = cookie.strip().partition("=")
+            if name == "NTNX_IGW_SESSION":
+                token = value
+        if self.headers.get("Authorization"):
+            self.server.auth.append("basic")
+            token = uuid.uuid4().hex
+            self.server.tokens.add(token)
+        elif token in self.server.tokens:
+            self.server.auth.append("cookie")
+        else:
+            self.server.auth.append(None)
+            self._respond(401, {"message": "Authentication required"})
+            return
+        self._respond(200, {"entities": []}, token)
+
+    def _respond(self, status, data, token=None):
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        if token:
+            self.send_header(
+                "Set-Cookie", "NTNX_IGW_SESSION={0}; Path=/; HttpOnly".format(token)
+            )
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class Module:
+    def __init__(self, port, **kwargs):
+        self.params = {
+            "nutanix_host": "127.0.0.1",
+            "nutanix_port": str(port),
+            "nutanix_username": "username",
+            "nutanix_password": "password",
+            "max_retries": 0,
+        }
+        self.params.update(kwargs)
+
+    def jsonify(self, data):
+        return json.dumps(data)
+
+
+class TestSession(unittest.TestCase):
+    def setUp(self):
+        self.server = BaseHTTPServer.HTTPServer(("127.0.0.1", 0), Handler)
+        self.server.auth = []
+        self.server.tokens = set()
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+
+        self.home = set_temp_home(self)
+        session.sessions.clear()
+
+    def tearDown(self):
+        connection_pool.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _entity(self, **kwargs):
+        module = Module(self.server.server_port, **kwargs)
+        return Entity(module, resource_type="/vms", scheme="http")
+
+    def test_session_cookie_reused(self):
+        entity = self._entity()
+        for _ in range(3):
+            self.assertEqual(entity.read(), {"entities": []})
+        self.assertEqual(self.server.auth, ["basic", "cookie", "cookie"])
+
+        # entities of same host and user share session
+        self._entity().read()
+        self.assertEqual(self.server.auth[-1], "cookie")
+
+    def test_fallback_to_basic_auth(self):
+        entity = self._entity()
+        entity.read()
+        # session expired on server
+        self.server.tokens.clear()
+        self.assertEqual(entity.read(), {"entities": []})
+        entity.read()
+        self.assertEqual(self.server.auth, ["basic", None, "basic", "cookie"])
+
+    def test_session_expiry(self):
+        entity = self._entity()
+        entity.read()
+        entity.session.expires_at = 0
+        entity.read()
+        self.assertEqual(self.server.auth, ["basic", "basic"])
+
+    def test_session_cache(self):
+        self._entity(session_cache=True).read()
+        cache_files = os.listdir(os.path.join(self.home, ".ansible/nutanix/sessions"))
+        self.assertEqual(len(cache_files), 1)
+        cache_file = os.path.join(
+            self.home, ".ansible/nutanix/sessions", cache_files[0]
+        )
+        self.assertEqual(stat.S_IMODE(os.stat(cache_file).st_mode), 0o600)
+        # file is named by host, port and user, password is not hashed into it
+        key = "127.0.0.1:{0}:username".format(self.server.server_port)
+        self.assertEqual(
+            cache_files[0], hashlib.sha256(key.encode("utf-8")).hexdigest()
+        )
+
+        # session is loaded from cache by next module run
+        session.sessions.clear()
+        self._entity(session_cache=True).read()
+        self.assertEqual(self.server.auth, ["basic", "cookie"])
+
+        # cached session of other user is not used
+        session.sessions.clear()
+        self._entity(session_cache=True, nutanix_username="other").read()
+        self.assertEqual(self.server.auth[-1], "basic")
+
+        # expired cached session is not used
+        session.sessions.clear()
+        os.utime(cache_file, (0, 0))
+        self._entity(session_cache=True).read()
+        self.assertEqual(self.server.auth[-1], "basic")
+
+    def test_session_cache_symlink_not_followed(self):
+        self._entity(session_cache=True).read()
+        directory = os.path.join(self.home, ".ansible/nutanix/sessions")
+        cache_file = os.path.join(directory, os.listdir(directory)[0])
+        target = os.path.join(self.home, "target")
+        os.remove(cache_file)
+        os.symlink(target, cache_file)
+
+        session.sessions.clear()
+        self._entity(session_cache=True).read()
+        self.assertEqual(self.server.auth[-1], "basic")
+        self.assertFalse(os.path.exists(target))
+
+    def test_rejected_cached_session_replaced(self):
+        self._entity(session_cache=True).read()
+        self.server.tokens.clear()
+        session.sessions.clear()
+        entity = self._entity(session_cache=True)
+        entity.read()
+        self.assertEqual(self.server.auth, ["basic", None, "basic"])
+
+        # new session is cached
+        session.sessions.clear()
+        self._entity(session_cache=True).read()
+        self.assertEqual(self.server.auth[-1], "cookie")
@@ -0,0 +1,47 @@
+from __future__ import absolute_import, division, print_function
+
+import json
+import os
+
+from ansible_collections.nutanix.ncp.plugins.module_utils.state_file import (
+    StateFile,
+    get_state_path,
+)
+from ansible_collections.nutanix.ncp.tests.unit.compat import unittest
+from ansible_collections.nutanix.ncp.tests.unit.plugins.modules.utils import (
+    set_temp_home,
+)
+
+__metaclass__ = type
+
+
+class TestStateFile(unittest.TestCase):
+    def setUp(self):
+        self.home = set_temp_home(self)
+
+    def test_get_state_path(self):
+        path = get_state_path("inventory", "pc.json")
+        directory = os.path.join(self.home, ".ansible", "nutanix", "inventory")
+        self.assertEqual(path, os.path.join(directory, "pc.json"))
+        self.assertTrue(os.path.isdir(directory))
+        self.assertEqual(os.stat(directory).st_mode & 0o777, 0o700)
+
+    def test_state_written_back(self):
+        path = get_state_path("state.json")
+        with StateFile(path, {}) as state:
+            state["key"] = "value"
+        with open(path) as f:
+            self.assertEqual(json.load(f), {"key": "value"})
+        self.assertEqual(os.stat(path).st_mode & 0o777, 0o600)
+        with StateFile(path, {}) as state:
+            self.assertEqual(state, {"key": "value"})
+
+    def test_symlink_not_followed(self):
+        path = get_state_path("state.json")
+        target = os.path.join(self.home, "target")
+        os.symlink(target, path)
+        local_state = {}
+        with StateFile(path, local_state) as state:
+            state["key"] = "value"
+        self.assertFalse(os.path.exists(target))
+        self.assertEqual(local_state, {"key": "value"})
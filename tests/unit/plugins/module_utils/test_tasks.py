@@ -0,0 +1,180 @@
+from __future__ import absolute_import, division, print_function
+
+from ansible_collections.nutanix.ncp.plugins.module_utils.perf_trace import perf_tracer
+from ansible_collections.nutanix.ncp.plugins.module_utils.prism.tasks import Task
+from ansible_collections.nutanix.ncp.tests.unit.compat import unittest
+from ansible_collections.nutanix.ncp.tests.unit.compat.mock import MagicMock, patch
+from ansible_collections.nutanix.ncp.tests.unit.plugins.modules.utils import (
+    AnsibleFailJson,
+)
+
+__metaclass__ = type
+
+
+class Module:
+    def __init__(self, **kwargs):
+        self.params = {"nutanix_host": "99.99.99.99", "nutanix_port": "9440"}
+        self.params.update(kwargs)
+
+    def fail_json(self, **kwargs):
+        raise AnsibleFailJson(kwargs)
+
+
+class TestTaskWait(unittest.TestCase):
+    def setUp(self):
+        self.clock = [1000.0]
+        self.waits = []
+
+        def sleep(seconds):
+            self.waits.append(seconds)
+            self.clock[0] += seconds
+
+        for target, side_effect in (
+            ("time.time", lambda: self.clock[0]),
+            ("time.sleep", sleep),
+        ):
+            patcher = patch(target, side_effect=side_effect)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _task(self, responses, **params):
+        task = Task(Module(**params))
+        task.read = MagicMock(side_effect=responses)
+        return task
+
+    def test_short_task(self):
+        task = self._task([{"status": "SUCCEEDED"}])
+        resp = task.wait_for_completion("uuid")
+        self.assertEqual(resp, {"status": "SUCCEEDED"})
+        self.assertEqual(task.polls, 1)
+        self.assertEqual(self.waits, [0.25])
+
+    def test_backoff(self):
+        responses = [{"status": "RUNNING"}] * 20 + [{"status": "SUCCEEDED"}]
+        task = self._task(responses)
+        task.wait_for_completion("uuid")
+        self.assertEqual(task.polls, 21)
+        self.assertEqual(self.waits[:3], [0.25, 0.375, 0.5625])
+        self.assertEqual(self.waits[-1], Task.max_poll_interval)
+
+    def test_poll_as_per_progress(self):
+        def read(uuid, **kwargs):
+            # task progresses 1% per second
+            percentage = min(100, int(self.clock[0] - 1000))
+            if percentage == 100:
+                return {"status": "SUCCEEDED", "percentage_complete": 100}
+            return {"status": "RUNNING", "percentage_complete": percentage}
+
+        task = self._task(read)
+        task.wait_for_completion("uuid")
+        # polls back off, and are scheduled earlier towards completion
+        self.assertEqual(max(self.waits), Task.max_poll_interval)
+        self.assertLess(self.waits[-1], Task.max_poll_interval)
+        self.assertLess(self.clock[0], 1100 + Task.max_poll_interval / 2.0)
+        self.assertLess(task.polls, 20)
+
+    def test_failed_task(self):
+        failed = {"status": "FAILED", "error_detail": "error", "error_code": 400}
+        task = self._task([{"status": "RUNNING"}, failed])
+        with self.assertRaises(AnsibleFailJson) as error:
+            task.wait_for_completion("uuid")
+        self.assertEqual(error.exception.args[0]["msg"], "error")
+
+        task = self._task([failed])
+        self.assertEqual(task.wait_for_completion("uuid", raise_error=False), failed)
+
+    def test_timeout(self):
+        task = self._task(lambda uuid, **kwargs: {"status": "RUNNING"})
+        with self.assertRaises(AnsibleFailJson):
+            task.wait_for_completion("uuid", timeout=60)
+        self.assertEqual(self.clock[0], 1060)
+
+        resp = task.wait_for_completion("uuid", raise_error=False, timeout=60)
+        self.assertEqual(resp, {"status": "RUNNING"})
+
+    def test_polls_traced(self):
+        perf_tracer.waits = []
+        task = self._task([{"status": "RUNNING"}, {"status": "SUCCEEDED"}])
+        task.module.params["perf_trace"] = True
+        task.wait_for_completion("uuid")
+        self.assertEqual(perf_tracer.summary()["waits"]["polls"], 2)
+
+
+class TestTaskWaitForAll(unittest.TestCase):
+    def setUp(self):
+        patcher = patch("time.sleep")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        # tasks complete after given number of polls
+        self.polls_left = dict(("task{0}".format(i), i % 4) for i in range(250))
+        self.polls_left["failed"] = 1
+
+    def _list(self, data=None, **kwargs):
+        entities = []
+        for condition in data["filter"].split(","):
+            uuid = condition.split("==")[1]
+            status = "RUNNING"
+            if not self.polls_left[uuid]:
+                status = "FAILED" if uuid == "failed" else "SUCCEEDED"
+            self.polls_left[uuid] = max(0, self.polls_left[uuid] - 1)
+            entities.append({"uuid": uuid, "status": status})
+        return {"entities": entities}
+
+    def test_wait_for_all(self):
+        task = Task(Module())
+        with patch(
+            "ansible_collections.nutanix.ncp.plugins.module_utils.entity.Entity.list",
+            side_effect=self._list,
+        ) as mock_list:
+            uuids = ["task{0}".format(i) for i in range(250)]
+            responses = task.wait_for_all(uuids)
+
+        self.assertEqual(len(responses), 250)
+        self.assertTrue(all(r["status"] == "SUCCEEDED" for r in responses.values()))
+        self.assertEqual(task.polls, 4)
+        # 3 list calls per poll while all tasks are pending, fewer later
+        self.assertEqual(mock_list.call_count, 3 + 2 + 2 + 1)
+
+    def test_failed_task(self):
+        task = Task(Module())
+        with patch(
+            "ansible_collections.nutanix.ncp.plugins.module_utils.entity.Entity.list",
+            side_effect=self._list,
+        ):
+            with self.assertRaises(AnsibleFailJson) as error:
+                task.wait_for_all(["task1", "failed"])
+            self.assertEqual(error.exception.args[0]["msg"], "1 of 2 tasks failed")
+
+            responses = task.wait_for_all(["failed"], raise_error=False)
+            self.assertEqual(responses["failed"]["status"], "FAILED")
+
+    def test_timeout(self):
+        task = Task(Module())
+        clock = [1000]
+
+        def time():
+            clock[0] += 1
+            return clock[0]
+
+        with patch(
+            "ansible_collections.nutanix.ncp.plugins.module_utils.entity.Entity.list",
+            side_effect=self._list,
+        ), patch("time.time", side_effect=time):
+            with self.assertRaises(AnsibleFailJson) as error:
+                task.wait_for_all(["task3", "task4", "task4"], timeout=1)
+        # total counts each requested task once
+        self.assertEqual(
+            error.exception.args[0]["msg"],
+            "Timed out waiting for 1 of 2 tasks to complete",
+        )
+
+    def test_unlisted_tasks_read(self):
+        task = Task(Module())
+        task.read = MagicMock(return_value={"status": "SUCCEEDED"})
+        with patch(
+            "ansible_collections.nutanix.ncp.plugins.module_utils.entity.Entity.list",
+            return_value={"entities": [{"uuid": "other", "status": "RUNNING"}]},
+        ):
+            responses = task.wait_for_all(["task1"])
+        self.assertEqual(responses, {"task1": {"uuid": "task1", "status": "SUCCEEDED"}})
@@ -0,0 +1,437 @@
+from __future__ import absolute_import, division, print_function
+
+import hashlib
+import json
+import os
+import ssl
+import threading
+
+from ansible.module_utils.six.moves import BaseHTTPServer, socketserver
+from ansible_collections.nutanix.ncp.plugins.module_utils import upload
+from ansible_collections.nutanix.ncp.plugins.module_utils.connection_pool import (
+    connection_pool,
+)
+from ansible_collections.nutanix.ncp.plugins.module_utils.entity import Entity
+from ansible_collections.nutanix.ncp.plugins.module_utils.foundation.image_upload import (
+    upload_image_to_hosts,
+)
+from ansible_collections.nutanix.ncp.plugins.module_utils.prism.images import Image
+from ansible_collections.nutanix.ncp.plugins.module_utils.upload import (
+    FileUpload,
+    MiB,
+    SharedFileReader,
+)
+from ansible_collections.nutanix.ncp.tests.unit.compat import unittest
+from ansible_collections.nutanix.ncp.tests.unit.compat.mock import MagicMock
+from ansible_collections.nutanix.ncp.tests.unit.plugins.modules.utils import (
+    AnsibleFailJson,
+    set_temp_home,
+)
+
+__metaclass__ = type
+
+
+class Handler(BaseHTTPServer.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        # enumeration of files uploaded to foundation
+        body = json.dumps(self.server.listing).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        self.server.requests.append(self.path)
+        length = int(self.headers["Content-Length"])
+        digest = hashlib.sha256()
+        while length:
+            data = self.rfile.read(min(length, 65536))
+            digest.update(data)
+            length -= len(data)
+        body = json.dumps({"sha256": digest.hexdigest()}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_PUT(self):
+        length = int(self.headers["Content-Length"])
+        data = self.rfile.read(length)
+        content_range = self.headers.get("Content-Range")
+        if not content_range:
+            self.server.requests.append("whole")
+            self.server.contents[:] = data
+            return self._respond(200)
+        if not self.server.ranged:
+            return self._respond(416)
+        offset = int(content_range.split()[1].split("-")[0])
+        self.server.requests.append(offset)
+        if self.server.ranged == "ignored":
+            # part is taken as whole image
+            self.server.contents[:] = data
+            return self._respond(200)
+        if offset in self.server.failing_offsets:
+            self.server.failing_offsets.remove(offset)
+            return self._respond(500)
+        if offset in self.server.dropped_offsets:
+            # connection is closed without response
+            self.server.dropped_offsets.remove(offset)
+            self.close_connection = True
+            return
+        # image is allocated with total size of ranges
+        contents = self.server.contents
+        size = int(content_range.split("/")[1])
+        if len(contents) < size:
+            contents.extend(b"\0" * (size - len(contents)))
+        contents[offset : offset + length] = data
+        self._respond(200)
+
+    def _respond(self, status):
+        self.send_response(status)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+class Server(socketserver.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    # parts of uploads are sent over concurrent connections
+    daemon_threads = True
+
+
+class Module:
+    def __init__(self, port, **kwargs):
+        self.params = {
+            "nutanix_host": "127.0.0.1",
+            "nutanix_port": str(port),
+            "max_retries": 0,
+            "name": "image",
+        }
+        self.params.update(kwargs)
+
+    def fail_json(self, **kwargs):
+        raise AnsibleFailJson(kwargs)
+
+
+class UploadTestCase(unittest.TestCase):
+    def setUp(self):
+        self.server = self._start_server("127.0.0.1", 0)
+
+        self.home = set_temp_home(self)
+        upload.upload_states.clear()
+
+        self.source = os.path.join(self.home, "image.iso")
+        with open(self.source, "wb") as f:
+            f.write(os.urandom(3 * MiB + 123))
+        with open(self.source, "rb") as f:
+            self.sha256 = hashlib.sha256(f.read()).hexdigest()
+
+    def _start_server(self, host, port):
+        server = Server((host, port), Handler)
+        server.requests = []
+        server.contents = bytearray()
+        server.ranged = True
+        server.failing_offsets = []
+        server.dropped_offsets = []
+        server.listing = []
+        thread = threading.Thread(target=server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        return server
+
+    def tearDown(self):
+        connection_pool.close()
+
+
+class TestUpload(UploadTestCase):
+    def _entity(self, **kwargs):
+        module = Module(self.server.server_port, **kwargs)
+        return Entity(module, resource_type="/upload", scheme="http")
+
+    def test_upload_with_sendfile(self):
+        entity = self._entity(upload_chunk_size=1)
+        resp = entity.upload(self.source)
+        self.assertEqual(resp, {"sha256": self.sha256})
+        stats = entity.upload_stats
+        self.assertEqual(stats["bytes_sent"], 3 * MiB + 123)
+        self.assertEqual(stats["eta_seconds"], 0)
+        self.assertEqual(stats["chunk_size"], MiB)
+        self.assertEqual(stats["zero_copy"], hasattr(os, "sendfile"))
+
+    def test_upload_through_read(self):
+        # bodies are read when requests go through fetch_url e.g. via proxy
+        upload = FileUpload(self.source, chunk_size=MiB)
+        chunks = []
+        while True:
+            chunk = upload.read(8192)
+            if not chunk:
+                break
+            chunks.append(chunk)
+        self.assertEqual([len(c) for c in chunks], [MiB, MiB, MiB, 123])
+        data = b"".join(chunks)
+        self.assertEqual(hashlib.sha256(data).hexdigest(), self.sha256)
+        self.assertEqual(upload.report()["bytes_sent"], len(data))
+
+    def test_send_to_tls_socket(self):
+        sent = []
+        sock = MagicMock(spec=ssl.SSLSocket)
+        sock.sendall.side_effect = lambda view: sent.append(bytes(view))
+        upload = FileUpload(self.source, chunk_size=2 * MiB)
+        upload.send_to(sock)
+        self.assertEqual([len(c) for c in sent], [2 * MiB, MiB + 123])
+        self.assertEqual(hashlib.sha256(b"".join(sent)).hexdigest(), self.sha256)
+        self.assertFalse(upload.report()["zero_copy"])
+
+    def test_invalid_chunk_size(self):
+        entity = self._entity(upload_chunk_size=128)
+        with self.assertRaises(AnsibleFailJson):
+            entity.upload(self.source)
+
+
+class TestImageUpload(UploadTestCase):
+    def _image(self, **kwargs):
+        module = Module(self.server.server_port, **kwargs)
+        image = Image(module, upload_image=True)
+        image.base_url = image.base_url.replace("https://", "http://")
+        image.read = MagicMock(
+            side_effect=lambda *args, **kwargs: {
+                "status": {"resources": {"size_bytes": len(self.server.contents)}}
+            }
+        )
+        return image
+
+    def _uploaded(self):
+        return hashlib.sha256(bytes(self.server.contents)).hexdigest()
+
+    def test_upload_in_parts(self):
+        image = self._image(upload_parts=4)
+        resp = image.upload_image("uuid", self.source)
+        self.assertEqual(resp["status_code"], 200)
+        self.assertEqual(sorted(self.server.requests), [0, MiB, 2 * MiB, 3 * MiB])
+        self.assertEqual(self._uploaded(), self.sha256)
+        self.assertEqual(image.upload_stats["parts"], 4)
+        self.assertEqual(image.upload_stats["bytes_sent"], 3 * MiB + 123)
+
+    def test_fallback_to_whole_file(self):
+        self.server.ranged = False
+        image = self._image(upload_parts=4)
+        resp = image.upload_image("uuid", self.source)
+        self.assertEqual(resp["status_code"], 200)
+        self.assertEqual(self.server.requests, ["whole"])
+        self.assertEqual(self._uploaded(), self.sha256)
+
+    def test_fallback_on_ignored_range(self):
+        self.server.ranged = "ignored"
+        image = self._image(upload_parts=4, resumable_upload=True)
+        resp = image.upload_image("uuid", self.source)
+        self.assertEqual(resp["status_code"], 200)
+        # ignored range is detected by first part, before others are sent
+        self.assertEqual(self.server.requests, [0, "whole"])
+        self.assertEqual(self._uploaded(), self.sha256)
+        self.assertIsNone(image.get_resumable_upload(self.source))
+
+    def test_upload_state_only_if_resumable(self):
+        self.server.failing_offsets = [2 * MiB]
+        image = self._image(upload_parts=4)
+        resp = image.upload_image("uuid", self.source, raise_error=False)
+        self.assertEqual(resp["status_code"], 500)
+        self.assertFalse(os.path.exists(upload.get_upload_state().path))
+        self.assertIsNone(image.get_resumable_upload(self.source))
+
+    def test_resume_failed_upload(self):
+        self.server.failing_offsets = [2 * MiB]
+        image = self._image(upload_parts=4, resumable_upload=True)
+        resp = image.upload_image("uuid", self.source, raise_error=False)
+        self.assertEqual(resp["status_code"], 500)
+        self.assertEqual(image.get_resumable_upload(self.source), "uuid")
+
+        # next run sends only the failed part
+        self.server.requests = []
+        image = self._image(upload_parts=4, resumable_upload=True)
+        resp = image.upload_image("uuid", self.source)
+        self.assertEqual(self.server.requests, [2 * MiB])
+        self.assertEqual(self._uploaded(), self.sha256)
+        self.assertIsNone(image.get_resumable_upload(self.source))
+
+    def test_resume_with_single_part(self):
+        self.server.failing_offsets = [MiB, 3 * MiB]
+        image = self._image(upload_parts=4, resumable_upload=True)
+        image.upload_image("uuid", self.source, raise_error=False)
+
+        # acknowledged parts are skipped though upload is not in parts any more
+        self.server.requests = []
+        image = self._image(upload_parts=1, resumable_upload=True)
+        resp = image.upload_image("uuid", self.source)
+        self.assertEqual(resp["status_code"], 200)
+        self.assertEqual(self.server.requests, [MiB, 3 * MiB])
+        self.assertEqual(self._uploaded(), self.sha256)
+
+    def test_resume_dropped_part(self):
+        self.server.dropped_offsets = [MiB]
+        image = self._image(upload_parts=4, resumable_upload=True)
+        resp = image.upload_image("uuid", self.source, raise_error=False)
+        self.assertEqual(resp["status_code"], -1)
+        self.assertTrue(resp["error"])
+        self.assertEqual(image.get_resumable_upload(self.source), "uuid")
+
+        # part which did not reach server is not taken as uploaded
+        self.server.requests = []
+        image = self._image(upload_parts=4, resumable_upload=True)
+        image.upload_image("uuid", self.source)
+        self.assertEqual(self.server.requests, [MiB])
+        self.assertEqual(self._uploaded(), self.sha256)
+
+    def test_changed_source_uploaded_again(self):
+        self.server.failing_offsets = [0]
+        image = self._image(upload_parts=4, resumable_upload=True)
+        image.upload_image("uuid", self.source, raise_error=False)
+        os.utime(self.source, (0, 0))
+        self.assertIsNone(image.get_resumable_upload(self.source))
+
+
+class TestChecksum(UploadTestCase):
+    def _image(self, checksum=None, **kwargs):
+        module = Module(self.server.server_port, **kwargs)
+        image = Image(module, upload_image=True)
+        image.base_url = image.base_url.replace("https://", "http://")
+        resources = {"size_bytes": 3 * MiB + 123}
+        if checksum:
+            resources["checksum"] = {
+                "checksum_algorithm": "SHA_256",
+                "checksum_value": checksum,
+            }
+        image.read = MagicMock(return_value={"status": {"resources": resources}})
+        return image
+
+    def test_hash_while_sending(self):
+        upload = FileUpload(self.source, chunk_size=MiB, hash_algorithm="sha256")
+        while upload.read(8192):
+            pass
+        self.assertEqual(upload.hexdigest(), self.sha256)
+
+        # sendfile bypasses user space, so hashed contents are sent from mmap
+        sock = MagicMock()
+        upload = FileUpload(self.source, chunk_size=MiB, hash_algorithm="sha1")
+        upload.send_to(sock)
+        self.assertFalse(sock.sendfile.called)
+        with open(self.source, "rb") as f:
+            self.assertEqual(upload.hexdigest(), hashlib.sha1(f.read()).hexdigest())
+
+    def test_verify_and_cache_checksum(self):
+        image = self._image(self.sha256, compute_checksum="SHA_256", upload_parts=4)
+        resp = image.upload_image("uuid", self.source)
+        self.assertEqual(resp["status_code"], 200)
+        # hashing needs whole file to be sent in order
+        self.assertEqual(self.server.requests, ["whole"])
+        self.assertEqual(
+            image.upload_checksum,
+            {
+                "checksum_algorithm": "SHA_256",
+                "checksum_value": self.sha256,
+                "verified": True,
+            },
+        )
+        self.assertEqual(upload.get_cached_checksum(self.source, "sha256"), self.sha256)
+
+        # cached digest is sent in checksum headers for prism to verify
+        image = self._image(compute_checksum="SHA_256", source_path=self.source)
+        self.assertEqual(image.headers["X-Nutanix-Checksum-Bytes"], self.sha256)
+        image.upload_image("uuid", self.source)
+        self.assertTrue(image.upload_checksum["verified"])
+        self.assertIsNone(image.upload_digest)
+
+        # sidecar older than source is stale
+        os.utime(self.source, None)
+        sidecar = upload.get_checksum_sidecar(self.source, "sha256")
+        os.utime(sidecar, (0, 0))
+        self.assertIsNone(upload.get_cached_checksum(self.source, "sha256"))
+
+    def test_checksum_mismatch(self):
+        image = self._image("0" * 64, compute_checksum="SHA_256")
+        resp = image.upload_image("uuid", self.source, raise_error=False)
+        self.assertEqual(resp["status_code"], 409)
+        self.assertIsNone(image.upload_checksum)
+        self.assertIsNone(upload.get_cached_checksum(self.source, "sha256"))
+
+
+class TestFoundationUpload(UploadTestCase):
+    def test_shared_reader(self):
+        reader = SharedFileReader(self.source, chunk_size=MiB, hash_algorithm="sha256")
+        fast, slow = reader.consumer(), reader.consumer()
+        received = []
+
+        def consume():
+            chunks = []
+            data = fast.read()
+            while data:
+                chunks.append(data)
+                data = fast.read()
+            fast.close()
+            received.append(b"".join(chunks))
+
+        thread = threading.Thread(target=consume)
+        thread.start()
+        chunks = []
+        data = slow.read()
+        while data:
+            # chunks not yet taken by slow consumer are kept, within window
+            self.assertLessEqual(len(reader._chunks), reader.window)
+            chunks.append(data)
+            data = slow.read()
+        slow.close()
+        thread.join()
+        self.assertEqual(hashlib.sha256(received[0]).hexdigest(), self.sha256)
+        self.assertEqual(hashlib.sha256(b"".join(chunks)).hexdigest(), self.sha256)
+        self.assertEqual(reader.bytes_read, 3 * MiB + 123)
+        self.assertEqual(reader.hexdigest(), self.sha256)
+        self.assertIsNone(reader._file)
+
+    def test_upload_to_hosts(self):
+        other = self._start_server("127.0.0.2", self.server.server_port)
+        module = Module(self.server.server_port, upload_chunk_size=1)
+        hosts = ["127.0.0.1", "127.0.0.2"]
+
+        # uploads are neither hashed nor recorded unless they can be skipped later
+        results = upload_image_to_hosts(
+            module, hosts[:1], "aos.tar", "nos", self.source
+        )
+        self.assertIsNone(results[0]["error"])
+        self.assertEqual(results[0]["upload"]["zero_copy"], hasattr(os, "sendfile"))
+        self.assertIsNone(upload.get_cached_checksum(self.source, "sha256"))
+        self.assertFalse(os.path.exists(upload.get_upload_state().path))
+
+        results = upload_image_to_hosts(
+            module, hosts, "aos.tar", "nos", self.source, skip_existing=True
+        )
+        for result in results:
+            self.assertFalse(result["skipped"])
+            self.assertIsNone(result["error"])
+            self.assertEqual(result["response"], {"sha256": self.sha256})
+            self.assertEqual(result["upload"]["bytes_sent"], 3 * MiB + 123)
+        self.assertEqual(upload.get_cached_checksum(self.source, "sha256"), self.sha256)
+
+        # hosts listing file of recorded size and digest are skipped
+        self.server.listing = ["aos.tar"]
+        other.listing = ["other.tar"]
+        self.server.requests, other.requests = [], []
+        results = upload_image_to_hosts(
+            module, hosts, "aos.tar", "nos", self.source, skip_existing=True
+        )
+        self.assertEqual([r["skipped"] for r in results], [True, False])
+        self.assertEqual(self.server.requests, [])
+        self.assertEqual(len(other.requests), 1)
+
+        # changed contents are uploaded again
+        with open(self.source, "ab") as f:
+            f.write(b"changed")
+        results = upload_image_to_hosts(
+            module, hosts[:1], "aos.tar", "nos", self.source, skip_existing=True
+        )
+        self.assertFalse(results[0]["skipped"])
@@ -0,0 +1,154 @@
+from __future__ import absolute_import, division, print_function
+
+import io
+import json
+import os
+
+from ansible_collections.nutanix.ncp.plugins.module_utils.entity import Entity
+from ansible_collections.nutanix.ncp.plugins.module_utils.json_stream import (
+    JSONStreamDecoder,
+)
+from ansible_collections.nutanix.ncp.plugins.module_utils.prism.groups import Groups
+from ansible_collections.nutanix.ncp.plugins.module_utils.uuid_cache import UUIDCache
+from ansible_collections.nutanix.ncp.tests.unit.compat import unittest
+from ansible_collections.nutanix.ncp.tests.unit.compat.mock import MagicMock, patch
+from ansible_collections.nutanix.ncp.tests.unit.plugins.modules.utils import (
+    set_temp_home,
+)
+
+__metaclass__ = type
+
+
+class Module:
+    def __init__(self, **kwargs):
+        self.params = {
+            "nutanix_host": "99.99.99.99",
+            "nutanix_port": "9440",
+            "nutanix_username": "username",
+            "nutanix_password": "password",
+        }
+        self.params.update(kwargs)
+
+    def jsonify(self, data):
+        return json.dumps(data)
+
+
+def _list_response(name, uuid):
+    return {
+        "entities": [{"spec": {"name": name}, "metadata": {"uuid": uuid}}],
+        "metadata": {"total_matches": 1},
+    }
+
+
+class TestUUIDCache(unittest.TestCase):
+    def setUp(self):
+        self.home = set_temp_home(self)
+
+        self.clock = [1000.0]
+        time_patcher = patch("time.time", side_effect=lambda: self.clock[0])
+        time_patcher.start()
+        self.addCleanup(time_patcher.stop)
+
+    def test_cache(self):
+        path = os.path.join(self.home, "cache.json")
+        cache = UUIDCache(path)
+        cache.set("host:9440", "/vms", "name", "vm1", "uuid1")
+        cache.set("host:9440", "/images", "name", "img1", "uuid2")
+
+        # cache is shared through file
+        other = UUIDCache(path)
+        self.assertEqual(other.get("host:9440", "/vms", "name", "vm1"), "uuid1")
+        self.assertIsNone(other.get("other:9440", "/vms", "name", "vm1"))
+        self.assertIsNone(other.get("host:9440", "/images", "name", "vm1"))
+
+        other.invalidate("host:9440", kind="/vms")
+        self.assertIsNone(cache.get("host:9440", "/vms", "name", "vm1"))
+        self.assertEqual(cache.get("host:9440", "/images", "name", "img1"), "uuid2")
+
+        cache.invalidate("host:9440", uuid="uuid2")
+        self.assertIsNone(cache.get("host:9440", "/images", "name", "img1"))
+
+    def test_expiry(self):
+        cache = UUIDCache(os.path.join(self.home, "cache.json"))
+        cache.set("host:9440", "/vms", "name", "vm1", "uuid1")
+        self.clock[0] += cache.ttl + 1
+        self.assertIsNone(cache.get("host:9440", "/vms", "name", "vm1"))
+
+    def test_entity_get_uuid(self):
+        entity = Entity(Module(), resource_type="/vms")
+        entity._fetch_url = MagicMock(return_value=_list_response("vm1", "uuid1"))
+        self.assertEqual(entity.get_uuid("vm1"), "uuid1")
+
+        # lookups of other module runs are served from cache
+        entity = Entity(Module(), resource_type="/vms")
+        entity._fetch_url = MagicMock(return_value=_list_response("vm1", "uuid1"))
+        self.assertEqual(entity.get_uuid("vm1"), "uuid1")
+        entity._fetch_url.assert_not_called()
+
+        entity = Entity(Module(bypass_cache=True), resource_type="/vms")
+        entity._fetch_url = MagicMock(return_value=_list_response("vm1", "uuid3"))
+        self.assertEqual(entity.get_uuid("vm1"), "uuid3")
+        entity._fetch_url.assert_called_once()
+
+    def test_entity_invalidation(self):
+        entity = Entity(Module(), resource_type="/vms")
+        entity._fetch_url = MagicMock(return_value=_list_response("vm1", "uuid1"))
+        entity.get_uuid("vm1")
+
+        entity.delete("uuid1")
+        entity._fetch_url.reset_mock()
+        entity.get_uuid("vm1")
+        self.assertEqual(entity._fetch_url.call_count, 1)
+
+        entity.create({"spec": {"name": "vm1"}})
+        entity._fetch_url.reset_mock()
+        entity.get_uuid("vm1")
+        self.assertEqual(entity._fetch_url.call_count, 1)
+
+    def test_groups_get_uuid(self):
+        groups = Groups(Module())
+        groups._fetch_url = MagicMock(
+            return_value={"group_results": [{"entity_results": [{"entity_id": "u"}]}]}
+        )
+        self.assertEqual(groups.get_uuid("dvs", entity_type="distributed_vs"), "u")
+        self.assertEqual(groups.get_uuid("dvs", entity_type="distributed_vs"), "u")
+        self.assertEqual(groups._fetch_url.call_count, 1)
+
+        # lookups of other entity types are not mixed
+        groups.get_uuid("dvs", entity_type="other")
+        self.assertEqual(groups._fetch_url.call_count, 2)
+
+    def test_entity_get_uuids(self):
+        existing = dict(("name{0}".format(i), "uuid{0}".format(i)) for i in range(100))
+
+        def filtered_fetch_url(url, method, data=None, **kwargs):
+            names = [f.split("==")[1] for f in data["filter"].split(",")]
+            entities = [
+                {"status": {"name": name}, "metadata": {"uuid": existing[name]}}
+                for name in names
+                if name in existing
+            ]
+            body = {"entities": entities, "metadata": {"total_matches": len(entities)}}
+            return JSONStreamDecoder(io.BytesIO(json.dumps(body).encode("utf-8")))
+
+        entity = Entity(Module(), resource_type="/permissions")
+        entity._fetch_url = MagicMock(side_effect=filtered_fetch_url)
+        names = ["name{0}".format(i) for i in range(90, 110)] + ["name5", "name5"]
+        name_uuid_map, missing = entity.get_uuids(names)
+        self.assertEqual(entity._fetch_url.call_count, 1)
+        self.assertEqual(len(name_uuid_map), 11)
+        self.assertEqual(name_uuid_map["name5"], "uuid5")
+        self.assertEqual(missing, ["name{0}".format(i) for i in range(100, 110)])
+
+        # names are OR-ed in batches
+        entity._fetch_url.reset_mock()
+        names = ["name{0}".format(i) for i in range(20, 80)]
+        name_uuid_map, missing = entity.get_uuids(names)
+        self.assertEqual(entity._fetch_url.call_count, 2)
+        self.assertEqual(len(name_uuid_map), 60)
+        self.assertEqual(missing, [])
+
+        # resolved names are cached
+        entity._fetch_url.reset_mock()
+        entity.get_uuids(["name5", "name50"])
+        entity._fetch_url.assert_not_called()
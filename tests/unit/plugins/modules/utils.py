@@ -3,6 +3,9 @@ from __future__ import absolute_import, division, print_function
 __metaclass__ = type
 
 import json
+import os
+import shutil
+import tempfile
 
 from ansible.module_utils import basic
 from ansible.module_utils._text import to_bytes
@@ -10,6 +13,16 @@ from ansible_collections.nutanix.ncp.tests.unit.compat import unittest
 from ansible_collections.nutanix.ncp.tests.unit.compat.mock import patch
 
 
+def set_temp_home(test_case):
+    """Point HOME at a temporary directory removed after ``test_case``."""
+    home = tempfile.mkdtemp()
+    test_case.addCleanup(shutil.rmtree, home)
+    patcher = patch.dict(os.environ, {"HOME": home})
+    patcher.start()
+    test_case.addCleanup(patcher.stop)
+    return home
+
+
 def set_module_args(args):
     if "_ansible_remote_tmp" not in args:
         args["_ansible_remote_tmp"] = "/tmp"